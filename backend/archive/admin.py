@@ -0,0 +1,49 @@
+from django.contrib import admin
+from .models import (
+    ArchivedAssignment, ArchivedAssignmentAttachment, ArchivedAssignmentGroup,
+    ArchivedSubmission, ArchivedSubmissionAttachment
+)
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """Архив изменяется только архивацией и восстановлением."""
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class ArchivedAssignmentAttachmentInline(admin.TabularInline):
+    model = ArchivedAssignmentAttachment
+    extra = 0
+    can_delete = False
+
+
+class ArchivedAssignmentGroupInline(admin.TabularInline):
+    model = ArchivedAssignmentGroup
+    extra = 0
+    can_delete = False
+
+
+@admin.register(ArchivedAssignment)
+class ArchivedAssignmentAdmin(ReadOnlyAdmin):
+    list_display = ('title', 'created_by', 'status', 'deadline', 'term', 'archived_at')
+    list_filter = ('term', 'status')
+    search_fields = ('title', 'description')
+    inlines = [ArchivedAssignmentAttachmentInline, ArchivedAssignmentGroupInline]
+
+
+class ArchivedSubmissionAttachmentInline(admin.TabularInline):
+    model = ArchivedSubmissionAttachment
+    extra = 0
+    can_delete = False
+
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(ReadOnlyAdmin):
+    list_display = ('assignment', 'student', 'status', 'points', 'submitted_at', 'is_late')
+    list_filter = ('status', 'is_late', 'assignment__term')
+    search_fields = ('assignment__title', 'student__user__username', 'comment')
+    inlines = [ArchivedSubmissionAttachmentInline]
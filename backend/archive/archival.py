@@ -0,0 +1,269 @@
+"""
+Перенос заданий прошедших учебных периодов в архив и восстановление.
+
+Учебный период начинается в даты ARCHIVE_TERM_STARTS (по умолчанию 1 сентября
+и 1 февраля) и обозначается месяцем начала: '2025-09'. Задание относится к
+периоду своего последнего дедлайна (с учётом индивидуальных дедлайнов групп)
+и архивируется, когда с конца периода прошло ARCHIVE_AFTER_DAYS дней.
+
+Задание переносится вместе с назначениями, ответами и вложениями: строки
+перемещаются в таблицы archive одним запросом на таблицу, поэтому рабочие
+таблицы и их индексы содержат только текущие данные. Восстановление выполняет
+обратный перенос. Файлы вложений не перемещаются.
+
+Перенос блокирует строки заданий и их назначений: пока он идёт, к заданиям
+нельзя добавить назначения и ответы или изменить их дедлайны. Под блокировкой
+задания проверяются повторно, и уже неподходящие (дедлайн продлён, задание
+восстановлено параллельно) пропускаются.
+
+Перенос записывается в журнал изменений (удаление и создание строк) и
+меняет версии закешированных данных групп и ответов (core.versioning).
+"""
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from assignments.models import (
+    Assignment, AssignmentAttachment, AssignmentGroup,
+    Submission, SubmissionAttachment
+)
+from core.models import ChangeLogEntry, record_changes
+from core.versioning import bump_versions
+from .models import (
+    ArchivedAssignment, ArchivedAssignmentAttachment, ArchivedAssignmentGroup,
+    ArchivedSubmission, ArchivedSubmissionAttachment
+)
+
+# Рабочая таблица, архивная таблица и путь к заданию; родительские таблицы
+# раньше дочерних (ограничения внешних ключей проверяются при фиксации)
+TABLES = [
+    (Assignment, ArchivedAssignment, 'pk'),
+    (AssignmentAttachment, ArchivedAssignmentAttachment, 'assignment_id'),
+    (AssignmentGroup, ArchivedAssignmentGroup, 'assignment_id'),
+    (Submission, ArchivedSubmission, 'assignment_id'),
+    (SubmissionAttachment, ArchivedSubmissionAttachment, 'submission__assignment_id'),
+]
+
+Term = namedtuple('Term', ['label', 'start', 'end'])
+
+
+def _term_starts():
+    starts = []
+    for value in settings.ARCHIVE_TERM_STARTS.split(','):
+        month, day = value.strip().split('-')
+        starts.append((int(month), int(day)))
+    return sorted(starts)
+
+
+def _as_datetime(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_term(moment):
+    """Учебный период, которому принадлежит момент времени."""
+    day = timezone.localdate(moment)
+    starts = [
+        date(year, month, start_day)
+        for year in (day.year - 1, day.year, day.year + 1)
+        for month, start_day in _term_starts()
+    ]
+    start = max(start for start in starts if start <= day)
+    end = min(start for start in starts if start > day)
+    return Term(f'{start:%Y-%m}', _as_datetime(start), _as_datetime(end))
+
+
+def parse_term(label):
+    """Учебный период по обозначению 'ГГГГ-ММ'; ValueError для неверного обозначения."""
+    try:
+        year, month = (int(part) for part in label.split('-'))
+        start_day = dict(_term_starts())[month]
+    except (KeyError, ValueError):
+        raise ValueError(f'Неизвестный учебный период: {label}')
+    return get_term(_as_datetime(date(year, month, start_day)))
+
+
+def archive_cutoff(now=None):
+    """Задания с последним дедлайном раньше этого момента можно архивировать."""
+    now = now or timezone.now()
+    return get_term(now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)).start
+
+
+def _archivable(queryset, now=None):
+    return queryset.annotate(
+        last_deadline=Greatest(
+            'deadline', Coalesce(Max('assignment_groups__effective_deadline'), 'deadline')
+        ),
+    ).filter(last_deadline__lt=archive_cutoff(now))
+
+
+def find_archivable(term=None, now=None):
+    """
+    Задания прошедших периодов, готовые к архивации: {обозначение периода: [id]}.
+
+    term ограничивает выборку одним периодом.
+    """
+    queryset = _archivable(Assignment.objects.all(), now)
+    if term is not None:
+        queryset = queryset.filter(last_deadline__gte=term.start, last_deadline__lt=term.end)
+
+    terms = defaultdict(list)
+    for pk, last_deadline in queryset.order_by('pk').values_list('pk', 'last_deadline'):
+        terms[get_term(last_deadline).label].append(pk)
+    return dict(terms)
+
+
+def archive(assignment_ids, term_label):
+    """
+    Переносит задания с назначениями, ответами и вложениями в архив.
+
+    Задания, которые к моменту переноса уже нельзя архивировать, остаются
+    в рабочих таблицах.
+    """
+    using = router.db_for_write(ArchivedAssignment)
+    extra = {'term': term_label, 'archived_at': timezone.now()}
+    with transaction.atomic(using=using):
+        locked = _lock(Assignment, assignment_ids, using)
+        _lock(AssignmentGroup, assignment_ids, using, path='assignment_id')
+        assignment_ids = list(
+            _archivable(Assignment.objects.using(using).filter(pk__in=locked))
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        changed = _changed_rows(assignment_ids, using)
+        counts = {}
+        # Дочерние строки раньше родительских: путь к заданию проходит через родителя
+        for live, archived, path in reversed(TABLES):
+            counts[live._meta.label] = _move(
+                live, archived, path, assignment_ids, using,
+                extra=extra if archived is ArchivedAssignment else None,
+            )
+        _record(changed, ChangeLogEntry.DELETE, using)
+    return {live._meta.label: counts[live._meta.label] for live, _, _ in TABLES}
+
+
+def restore(assignment_ids):
+    """
+    Возвращает архивные задания с назначениями, ответами и вложениями в
+    рабочие таблицы.
+
+    Время изменения восстановленных строк обновляется, а журнал изменений
+    получает записи об их создании, чтобы клиенты ленты синхронизации
+    (assignments.sync) получили их снова. Задания, уже восстановленные
+    параллельно, пропускаются.
+    """
+    using = router.db_for_write(Assignment)
+    with transaction.atomic(using=using):
+        assignment_ids = _lock(ArchivedAssignment, assignment_ids, using)
+        _lock(ArchivedAssignmentGroup, assignment_ids, using, path='assignment_id')
+        counts = {}
+        for live, archived, path in reversed(TABLES):
+            counts[live._meta.label] = _move(archived, live, path, assignment_ids, using)
+        now = timezone.now()
+        Assignment.objects.using(using).filter(pk__in=assignment_ids).update(updated_at=now)
+        for model in (AssignmentGroup, Submission):
+            model.objects.using(using).filter(assignment_id__in=assignment_ids).update(updated_at=now)
+        _record(_changed_rows(assignment_ids, using), ChangeLogEntry.CREATE, using)
+    return {live._meta.label: counts[live._meta.label] for live, _, _ in TABLES}
+
+
+def _lock(model, assignment_ids, using, path='pk'):
+    """Блокирует строки заданий до конца транзакции и возвращает id заданий, которые ещё есть."""
+    return sorted(set(
+        model.objects.using(using).select_for_update().filter(**{f'{path}__in': assignment_ids})
+        .order_by('pk').values_list(path, flat=True)
+    ))
+
+
+def _move(source, target, path, assignment_ids, using, extra=None):
+    """
+    Перемещает строки заданий из source в target.
+
+    В PostgreSQL строки удаляются и вставляются одним запросом
+    (WITH moved AS (DELETE ... RETURNING *) INSERT ... SELECT FROM moved):
+    в target попадают ровно удалённые строки в версии, которую видело
+    удаление. В остальных базах запись блокирует всю базу до конца
+    транзакции, и копирование с последующим удалением равнозначно.
+    """
+    if not assignment_ids:
+        return 0
+    fields = [field for field in target._meta.concrete_fields if field.name not in (extra or {})]
+    queryset = source.objects.using(using).filter(**{f'{path}__in': assignment_ids})
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        count = _copy(source, target, fields, queryset, using, extra)
+        # Без загрузки строк и сигналов: журнал и версии обновляются явно
+        queryset._raw_delete(using)
+        return count
+
+    quote = connection.ops.quote_name
+    keys, params = queryset.order_by().values('pk').query.get_compiler(using).as_sql()
+    columns = [field.column for field in fields] + [
+        target._meta.get_field(name).column for name in (extra or {})
+    ]
+    values = [quote(source._meta.get_field(field.name).column) for field in fields]
+    values += ['%s'] * len(extra or {})
+    sql = (
+        'WITH moved AS (DELETE FROM {source} WHERE {pk} IN ({keys}) RETURNING *) '
+        'INSERT INTO {target} ({columns}) SELECT {values} FROM moved'
+    ).format(
+        source=quote(source._meta.db_table),
+        pk=quote(source._meta.pk.column),
+        keys=keys,
+        target=quote(target._meta.db_table),
+        columns=', '.join(quote(column) for column in columns),
+        values=', '.join(values),
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, (*params, *(extra or {}).values()))
+        return cursor.rowcount
+
+
+def _copy(source, target, fields, queryset, using, extra=None):
+    """Копирует строки queryset из source в target одним INSERT ... SELECT."""
+    if extra:
+        queryset = queryset.annotate(**{
+            name: Value(value, output_field=target._meta.get_field(name))
+            for name, value in extra.items()
+        })
+    queryset = queryset.order_by().values_list(
+        *(field.attname for field in fields), *(extra or {})
+    )
+    sql, params = queryset.query.get_compiler(using).as_sql()
+
+    connection = connections[using]
+    columns = [field.column for field in fields] + [
+        target._meta.get_field(name).column for name in (extra or {})
+    ]
+    insert = 'INSERT INTO {table} ({columns}) {select}'.format(
+        table=connection.ops.quote_name(target._meta.db_table),
+        columns=', '.join(connection.ops.quote_name(column) for column in columns),
+        select=sql,
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(insert, params)
+        return cursor.rowcount
+
+
+def _changed_rows(assignment_ids, using):
+    """Строки рабочих таблиц, которые записываются в журнал изменений и меняют версии."""
+    return (
+        list(Assignment.objects.using(using).filter(pk__in=assignment_ids).only('id', 'created_by_id')),
+        list(AssignmentGroup.objects.using(using).filter(assignment_id__in=assignment_ids)
+             .only('id', 'group_id', 'assignment_id')),
+        list(Submission.objects.using(using).filter(assignment_id__in=assignment_ids)
+             .only('id', 'student_id', 'assignment_id')),
+    )
+
+
+def _record(changed, action, using):
+    assignments, assignment_groups, submissions = changed
+    record_changes([*assignments, *assignment_groups, *submissions], action, using=using)
+    keys = {('group', row.group_id) for row in assignment_groups}
+    for row in submissions:
+        keys.add(('student_submissions', row.student_id))
+        keys.add(('assignment_submissions', row.assignment_id))
+    bump_versions(keys, using=using)
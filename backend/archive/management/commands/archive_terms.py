@@ -0,0 +1,44 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from archive import archival
+
+
+class Command(BaseCommand):
+    help = (
+        'Moves assignments of terms that ended more than ARCHIVE_AFTER_DAYS ago, with their '
+        'assignment groups, submissions and attachments, into the archive tables'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', help='Archive only this term, e.g. 2025-09')
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Assignments moved per transaction (default: 100)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be archived')
+
+    def handle(self, *args, **options):
+        term = None
+        if options['term']:
+            try:
+                term = archival.parse_term(options['term'])
+            except ValueError as e:
+                raise CommandError(str(e))
+
+        terms = archival.find_archivable(term)
+        if not terms:
+            self.stdout.write('Nothing to archive')
+            return
+
+        batch_size = options['batch_size']
+        for label, assignment_ids in sorted(terms.items()):
+            if options['dry_run']:
+                self.stdout.write(f'{label}: {len(assignment_ids)} assignments would be archived')
+                continue
+            totals = Counter()
+            for start in range(0, len(assignment_ids), batch_size):
+                totals.update(archival.archive(assignment_ids[start:start + batch_size], label))
+            rows = ', '.join(f'{model}={count}' for model, count in totals.items())
+            self.stdout.write(self.style.SUCCESS(f'{label}: archived {rows}'))
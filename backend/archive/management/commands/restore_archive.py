@@ -0,0 +1,38 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from archive import archival
+from archive.models import ArchivedAssignment
+
+
+class Command(BaseCommand):
+    help = 'Moves archived assignments with their submissions and attachments back into the live tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--term', help='Restore every assignment of this term, e.g. 2025-09')
+        parser.add_argument('--assignment', type=int, nargs='+', default=[], help='Assignment ids')
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Assignments moved per transaction (default: 100)',
+        )
+
+    def handle(self, *args, **options):
+        if not (options['term'] or options['assignment']):
+            raise CommandError('Specify --term or --assignment')
+
+        queryset = ArchivedAssignment.objects.order_by('pk')
+        if options['term']:
+            queryset = queryset.filter(term=options['term'])
+        if options['assignment']:
+            queryset = queryset.filter(pk__in=options['assignment'])
+        assignment_ids = list(queryset.values_list('pk', flat=True))
+        if not assignment_ids:
+            raise CommandError('No matching archived assignments')
+
+        batch_size = options['batch_size']
+        totals = Counter()
+        for start in range(0, len(assignment_ids), batch_size):
+            totals.update(archival.restore(assignment_ids[start:start + batch_size]))
+        rows = ', '.join(f'{model}={count}' for model, count in totals.items())
+        self.stdout.write(self.style.SUCCESS(f'Restored {rows}'))
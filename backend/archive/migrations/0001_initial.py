@@ -0,0 +1,126 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('groups', '0003_groupmembership_updated_at'),
+        ('authentication', '0004_user_name_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAssignment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255, verbose_name='Название задания')),
+                ('description', models.TextField(verbose_name='Описание задания')),
+                ('created_at', models.DateTimeField(verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('status', models.CharField(choices=[('draft', 'Черновик'), ('published', 'Опубликовано'), ('archived', 'Архивировано')], max_length=10, verbose_name='Статус')),
+                ('deadline', models.DateTimeField(verbose_name='Срок сдачи')),
+                ('max_points', models.PositiveIntegerField(verbose_name='Максимальное количество баллов')),
+                ('allow_late_submissions', models.BooleanField(verbose_name='Разрешить сдачу после дедлайна')),
+                ('late_penalty_percentage', models.PositiveIntegerField(verbose_name='Процент штрафа за позднюю сдачу')),
+                ('term', models.CharField(max_length=7, verbose_name='Учебный период')),
+                ('archived_at', models.DateTimeField(verbose_name='Дата архивации')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_assignments', to='authentication.teacherprofile', verbose_name='Создатель')),
+            ],
+            options={
+                'verbose_name': 'Архивное задание',
+                'verbose_name_plural': 'Архивные задания',
+                'ordering': ['-deadline'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubmission',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('submitted_at', models.DateTimeField(verbose_name='Дата отправки')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий')),
+                ('status', models.CharField(choices=[('submitted', 'Отправлено'), ('graded', 'Оценено'), ('returned', 'Возвращено на доработку')], max_length=10, verbose_name='Статус')),
+                ('points', models.PositiveIntegerField(blank=True, null=True, verbose_name='Оценка')),
+                ('is_late', models.BooleanField(verbose_name='Сдано после дедлайна')),
+                ('feedback', models.TextField(blank=True, verbose_name='Обратная связь от преподавателя')),
+                ('graded_at', models.DateTimeField(blank=True, null=True, verbose_name='Дата оценивания')),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='submissions', to='archive.archivedassignment', verbose_name='Задание')),
+                ('graded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='authentication.teacherprofile', verbose_name='Оценил')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_submissions', to='authentication.studentprofile', verbose_name='Студент')),
+            ],
+            options={
+                'verbose_name': 'Архивный ответ',
+                'verbose_name_plural': 'Архивные ответы',
+                'ordering': ['-submitted_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedSubmissionAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='submissions/attachments/', verbose_name='Файл')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('uploaded_at', models.DateTimeField(verbose_name='Дата загрузки')),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='archive.archivedsubmission', verbose_name='Ответ')),
+            ],
+            options={
+                'verbose_name': 'Вложение архивного ответа',
+                'verbose_name_plural': 'Вложения архивных ответов',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAssignmentGroup',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_at', models.DateTimeField(verbose_name='Дата назначения')),
+                ('custom_deadline', models.DateTimeField(blank=True, null=True, verbose_name='Индивидуальный дедлайн')),
+                ('effective_deadline', models.DateTimeField(verbose_name='Действующий дедлайн')),
+                ('updated_at', models.DateTimeField(verbose_name='Дата обновления')),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignment_groups', to='archive.archivedassignment', verbose_name='Задание')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_assignment_groups', to='groups.group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Назначение архивного задания',
+                'verbose_name_plural': 'Назначения архивных заданий',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAssignmentAttachment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(upload_to='assignments/attachments/', verbose_name='Файл')),
+                ('filename', models.CharField(max_length=255, verbose_name='Имя файла')),
+                ('uploaded_at', models.DateTimeField(verbose_name='Дата загрузки')),
+                ('assignment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachments', to='archive.archivedassignment', verbose_name='Задание')),
+            ],
+            options={
+                'verbose_name': 'Вложение архивного задания',
+                'verbose_name_plural': 'Вложения архивных заданий',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedsubmission',
+            index=models.Index(fields=['student', 'submitted_at'], name='archived_sub_student_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedsubmission',
+            unique_together={('assignment', 'student')},
+        ),
+        migrations.AddIndex(
+            model_name='archivedassignmentgroup',
+            index=models.Index(fields=['group', 'assignment'], name='archived_group_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='archivedassignmentgroup',
+            unique_together={('assignment', 'group')},
+        ),
+        migrations.AddIndex(
+            model_name='archivedassignment',
+            index=models.Index(fields=['term', 'deadline'], name='archived_term_idx'),
+        ),
+    ]
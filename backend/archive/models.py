@@ -0,0 +1,166 @@
+"""
+Архив заданий прошедших учебных периодов (см. archive.archival).
+
+Таблицы повторяют таблицы заданий, назначений, ответов и вложений: строки
+переносятся с теми же идентификаторами и значениями полей, поэтому
+восстановление возвращает их в рабочие таблицы без изменений. Время создания
+и изменения не заполняются автоматически - хранятся исходные значения.
+"""
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+from authentication.models import TeacherProfile, StudentProfile
+from assignments.models import Assignment, Submission
+from groups.models import Group
+
+
+class ArchivedAssignment(models.Model):
+    """Задание прошедшего учебного периода."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    title = models.CharField(max_length=255, verbose_name=_('Название задания'))
+    description = models.TextField(verbose_name=_('Описание задания'))
+    created_by = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.CASCADE,
+        related_name='archived_assignments',
+        verbose_name=_('Создатель')
+    )
+    created_at = models.DateTimeField(verbose_name=_('Дата создания'))
+    updated_at = models.DateTimeField(verbose_name=_('Дата обновления'))
+    status = models.CharField(max_length=10, choices=Assignment.STATUS_CHOICES, verbose_name=_('Статус'))
+    deadline = models.DateTimeField(verbose_name=_('Срок сдачи'))
+    max_points = models.PositiveIntegerField(verbose_name=_('Максимальное количество баллов'))
+    allow_late_submissions = models.BooleanField(verbose_name=_('Разрешить сдачу после дедлайна'))
+    late_penalty_percentage = models.PositiveIntegerField(verbose_name=_('Процент штрафа за позднюю сдачу'))
+    # Учебный период последнего из дедлайнов задания, например '2025-09'
+    term = models.CharField(max_length=7, verbose_name=_('Учебный период'))
+    archived_at = models.DateTimeField(verbose_name=_('Дата архивации'))
+
+    class Meta:
+        verbose_name = _('Архивное задание')
+        verbose_name_plural = _('Архивные задания')
+        ordering = ['-deadline']
+        indexes = [
+            models.Index(fields=['term', 'deadline'], name='archived_term_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.term})"
+
+
+class ArchivedAssignmentAttachment(models.Model):
+    """Вложение архивного задания. Файл остаётся на прежнем месте."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    assignment = models.ForeignKey(
+        ArchivedAssignment,
+        on_delete=models.CASCADE,
+        related_name='attachments',
+        verbose_name=_('Задание')
+    )
+    file = models.FileField(upload_to='assignments/attachments/', verbose_name=_('Файл'))
+    filename = models.CharField(max_length=255, verbose_name=_('Имя файла'))
+    uploaded_at = models.DateTimeField(verbose_name=_('Дата загрузки'))
+
+    class Meta:
+        verbose_name = _('Вложение архивного задания')
+        verbose_name_plural = _('Вложения архивных заданий')
+
+    def __str__(self):
+        return self.filename
+
+
+class ArchivedAssignmentGroup(models.Model):
+    """Назначение архивного задания группе."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    assignment = models.ForeignKey(
+        ArchivedAssignment,
+        on_delete=models.CASCADE,
+        related_name='assignment_groups',
+        verbose_name=_('Задание')
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='archived_assignment_groups',
+        verbose_name=_('Группа')
+    )
+    assigned_at = models.DateTimeField(verbose_name=_('Дата назначения'))
+    custom_deadline = models.DateTimeField(null=True, blank=True, verbose_name=_('Индивидуальный дедлайн'))
+    effective_deadline = models.DateTimeField(verbose_name=_('Действующий дедлайн'))
+    updated_at = models.DateTimeField(verbose_name=_('Дата обновления'))
+
+    class Meta:
+        verbose_name = _('Назначение архивного задания')
+        verbose_name_plural = _('Назначения архивных заданий')
+        unique_together = ['assignment', 'group']
+        indexes = [
+            models.Index(fields=['group', 'assignment'], name='archived_group_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.assignment_id} - {self.group_id}"
+
+
+class ArchivedSubmission(models.Model):
+    """Ответ на архивное задание."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    assignment = models.ForeignKey(
+        ArchivedAssignment,
+        on_delete=models.CASCADE,
+        related_name='submissions',
+        verbose_name=_('Задание')
+    )
+    student = models.ForeignKey(
+        StudentProfile,
+        on_delete=models.CASCADE,
+        related_name='archived_submissions',
+        verbose_name=_('Студент')
+    )
+    submitted_at = models.DateTimeField(verbose_name=_('Дата отправки'))
+    updated_at = models.DateTimeField(verbose_name=_('Дата обновления'))
+    comment = models.TextField(blank=True, verbose_name=_('Комментарий'))
+    status = models.CharField(max_length=10, choices=Submission.STATUS_CHOICES, verbose_name=_('Статус'))
+    points = models.PositiveIntegerField(null=True, blank=True, verbose_name=_('Оценка'))
+    is_late = models.BooleanField(verbose_name=_('Сдано после дедлайна'))
+    feedback = models.TextField(blank=True, verbose_name=_('Обратная связь от преподавателя'))
+    graded_by = models.ForeignKey(
+        TeacherProfile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name=_('Оценил')
+    )
+    graded_at = models.DateTimeField(null=True, blank=True, verbose_name=_('Дата оценивания'))
+
+    class Meta:
+        verbose_name = _('Архивный ответ')
+        verbose_name_plural = _('Архивные ответы')
+        ordering = ['-submitted_at']
+        unique_together = ['assignment', 'student']
+        indexes = [
+            models.Index(fields=['student', 'submitted_at'], name='archived_sub_student_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.assignment_id}"
+
+
+class ArchivedSubmissionAttachment(models.Model):
+    """Вложение архивного ответа. Файл остаётся на прежнем месте."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='ID')
+    submission = models.ForeignKey(
+        ArchivedSubmission,
+        on_delete=models.CASCADE,
+        related_name='attachments',
+        verbose_name=_('Ответ')
+    )
+    file = models.FileField(upload_to='submissions/attachments/', verbose_name=_('Файл'))
+    filename = models.CharField(max_length=255, verbose_name=_('Имя файла'))
+    uploaded_at = models.DateTimeField(verbose_name=_('Дата загрузки'))
+
+    class Meta:
+        verbose_name = _('Вложение архивного ответа')
+        verbose_name_plural = _('Вложения архивных ответов')
+
+    def __str__(self):
+        return self.filename
@@ -0,0 +1,78 @@
+from rest_framework import serializers
+
+from authentication.serializers import StudentProfileSerializer, TeacherProfileSerializer
+from core.fieldsets import SparseFieldsetMixin
+from core.serializers import CompiledListSerializer
+from .models import (
+    ArchivedAssignment, ArchivedAssignmentAttachment, ArchivedAssignmentGroup,
+    ArchivedSubmission, ArchivedSubmissionAttachment
+)
+
+
+class ArchivedAssignmentAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор для вложений архивных заданий."""
+    class Meta:
+        model = ArchivedAssignmentAttachment
+        list_serializer_class = CompiledListSerializer
+        fields = ['id', 'file', 'filename', 'uploaded_at']
+        read_only_fields = fields
+
+
+class ArchivedAssignmentGroupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор для назначений архивных заданий группам."""
+    group_id = serializers.PrimaryKeyRelatedField(source='group', read_only=True)
+    group_name = serializers.CharField(source='group.name', read_only=True)
+
+    class Meta:
+        model = ArchivedAssignmentGroup
+        list_serializer_class = CompiledListSerializer
+        fields = ['id', 'group_id', 'group_name', 'assigned_at', 'custom_deadline', 'effective_deadline']
+        read_only_fields = fields
+
+
+class ArchivedAssignmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор для архивных заданий."""
+    created_by = TeacherProfileSerializer(read_only=True)
+    attachments = ArchivedAssignmentAttachmentSerializer(many=True, read_only=True)
+    groups = ArchivedAssignmentGroupSerializer(source='assignment_groups', many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedAssignment
+        list_serializer_class = CompiledListSerializer
+        fields = [
+            'id', 'title', 'description', 'created_by',
+            'created_at', 'updated_at', 'status', 'deadline',
+            'max_points', 'allow_late_submissions', 'late_penalty_percentage',
+            'term', 'archived_at', 'attachments', 'groups'
+        ]
+        read_only_fields = fields
+
+
+class ArchivedSubmissionAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор для вложений архивных ответов."""
+    class Meta:
+        model = ArchivedSubmissionAttachment
+        list_serializer_class = CompiledListSerializer
+        fields = ['id', 'file', 'filename', 'uploaded_at']
+        read_only_fields = fields
+
+
+class ArchivedSubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор для архивных ответов."""
+    assignment_id = serializers.PrimaryKeyRelatedField(source='assignment', read_only=True)
+    assignment_title = serializers.CharField(source='assignment.title', read_only=True)
+    term = serializers.CharField(source='assignment.term', read_only=True)
+    student = StudentProfileSerializer(read_only=True)
+    graded_by = TeacherProfileSerializer(read_only=True)
+    attachments = ArchivedSubmissionAttachmentSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = ArchivedSubmission
+        list_serializer_class = CompiledListSerializer
+        fields = [
+            'id', 'assignment_id', 'assignment_title', 'term', 'student',
+            'submitted_at', 'updated_at', 'comment', 'status',
+            'points', 'is_late', 'feedback', 'graded_by',
+            'graded_at', 'attachments'
+        ]
+        read_only_fields = fields
@@ -0,0 +1,19 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ArchivedAssignmentViewSet, ArchivedSubmissionViewSet
+
+
+# Create a custom router that doesn't enforce trailing slashes
+class NoTrailingSlashRouter(DefaultRouter):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.trailing_slash = ""
+
+
+router = NoTrailingSlashRouter()
+router.register(r'assignments', ArchivedAssignmentViewSet, basename='archived-assignment')
+router.register(r'submissions', ArchivedSubmissionViewSet, basename='archived-submission')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
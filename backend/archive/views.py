@@ -0,0 +1,138 @@
+from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+from django.db.models import Count, Q
+
+from assignments.models import Assignment
+from assignments.serializers import AssignmentSerializer
+from core.access import get_access_context
+from core.fieldsets import SparseFieldsetViewMixin, optimize_queryset
+from . import archival
+from .models import ArchivedAssignment, ArchivedAssignmentGroup, ArchivedSubmission
+from .serializers import ArchivedAssignmentSerializer, ArchivedSubmissionSerializer
+
+
+def _group_assignment_ids(group_ids):
+    return ArchivedAssignmentGroup.objects.filter(group_id__in=group_ids).values('assignment_id')
+
+
+class ArchivedAssignmentViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API архива заданий прошедших учебных периодов (только чтение).
+
+    Фильтры: ?term= (например, 2025-09), ?group_id=.
+    """
+    serializer_class = ArchivedAssignmentSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['deadline', 'archived_at', 'title']
+    ordering = ['-deadline']
+
+    def get_queryset(self):
+        """
+        Преподаватели видят свои задания и задания своих групп.
+        Студенты - опубликованные задания своих групп и задания, на которые отвечали.
+        """
+        access = get_access_context(self.request)
+
+        if access.teacher_profile:
+            queryset = ArchivedAssignment.objects.filter(
+                Q(created_by_id=access.teacher_profile_id) |
+                Q(pk__in=_group_assignment_ids(access.teaching_group_ids))
+            )
+
+        elif access.student_profile:
+            queryset = ArchivedAssignment.objects.filter(
+                Q(pk__in=_group_assignment_ids(access.student_group_ids), status=Assignment.STATUS_PUBLISHED) |
+                Q(pk__in=ArchivedSubmission.objects.filter(
+                    student_id=access.student_profile_id
+                ).values('assignment_id'))
+            )
+
+        else:
+            return ArchivedAssignment.objects.none()
+
+        term = self.request.query_params.get('term')
+        if term:
+            queryset = queryset.filter(term=term)
+
+        group_id = self.request.query_params.get('group_id')
+        if group_id:
+            queryset = queryset.filter(pk__in=_group_assignment_ids([group_id]))
+
+        return self.optimize_queryset(queryset)
+
+    @action(detail=False, methods=['get'])
+    def terms(self, request):
+        """Учебные периоды архива с числом доступных пользователю заданий."""
+        rows = (
+            self.filter_queryset(self.get_queryset()).order_by()
+            .values('term').annotate(assignment_count=Count('id')).order_by('-term')
+        )
+        return Response(list(rows))
+
+    @action(detail=True, methods=['get'], serializer_class=ArchivedSubmissionSerializer)
+    def submissions(self, request, pk=None):
+        """Ответы на архивное задание: все для преподавателя, свой для студента."""
+        access = get_access_context(request)
+        assignment = self.get_object()
+
+        shape = self.get_field_shape()
+        submissions = optimize_queryset(
+            ArchivedSubmission.objects.filter(assignment=assignment),
+            ArchivedSubmissionSerializer(field_shape=shape)
+        )
+        if access.student_profile and not access.teacher_profile:
+            submissions = submissions.filter(student_id=access.student_profile_id)
+        serializer = ArchivedSubmissionSerializer(submissions, many=True, field_shape=shape)
+        return Response(serializer.data)
+
+    @action(detail=True, methods=['post'], serializer_class=AssignmentSerializer)
+    def restore(self, request, pk=None):
+        """Возвращает задание с назначениями и ответами из архива в рабочие таблицы."""
+        access = get_access_context(request)
+        assignment = self.get_object()
+        if assignment.created_by_id != access.teacher_profile_id:
+            raise PermissionDenied("Восстановить задание может только его создатель.")
+
+        archival.restore([assignment.pk])
+        restored = Assignment.objects.get(pk=assignment.pk)
+        return Response(AssignmentSerializer(restored, context=self.get_serializer_context()).data)
+
+
+class ArchivedSubmissionViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API архивных ответов (только чтение).
+
+    Фильтры: ?term=, ?assignment_id=.
+    """
+    serializer_class = ArchivedSubmissionSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        access = get_access_context(self.request)
+
+        if access.teacher_profile:
+            # Ответы на задания преподавателя и задания его групп
+            queryset = ArchivedSubmission.objects.filter(
+                Q(assignment__created_by_id=access.teacher_profile_id) |
+                Q(assignment_id__in=_group_assignment_ids(access.teaching_group_ids))
+            )
+
+        elif access.student_profile:
+            queryset = ArchivedSubmission.objects.filter(student_id=access.student_profile_id)
+
+        else:
+            return ArchivedSubmission.objects.none()
+
+        term = self.request.query_params.get('term')
+        if term:
+            queryset = queryset.filter(assignment__term=term)
+
+        assignment_id = self.request.query_params.get('assignment_id')
+        if assignment_id:
+            queryset = queryset.filter(assignment_id=assignment_id)
+
+        return self.optimize_queryset(queryset)
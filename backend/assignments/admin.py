@@ -73,7 +73,7 @@ class SubmissionAdmin(admin.ModelAdmin):
 
 @admin.register(AssignmentGroup)
 class AssignmentGroupAdmin(admin.ModelAdmin):
-    list_display = ('assignment', 'group', 'assigned_at', 'custom_deadline')
+    list_display = ('assignment', 'group', 'assigned_at', 'custom_deadline', 'effective_deadline')
     list_filter = ('assigned_at',)
     search_fields = ('assignment__title', 'group__name')
     readonly_fields = ('assigned_at', 'effective_deadline')
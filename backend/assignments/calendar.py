@@ -0,0 +1,237 @@
+"""
+Календарь дедлайнов в формате iCalendar (RFC 5545).
+
+Каждый пользователь получает подписанную ссылку на .ics-файл с дедлайнами
+опубликованных заданий своих групп. Календарные клиенты опрашивают ссылку
+каждые несколько минут, поэтому готовый календарь хранится в кеше вместе с
+версиями данных, из которых он собран (core.versioning):
+
+- ('student', id) / ('teacher', id) - состав групп пользователя;
+- ('group', id) - задания группы, их дедлайны и название группы.
+
+Если версии не изменились, ответ отдаётся из кеша без запросов к БД. Иначе
+календарь собирается заново, но события пересчитываются только для групп,
+версия которых изменилась: события группы кешируются отдельно.
+"""
+import hashlib
+import time
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+from rest_framework.renderers import BaseRenderer
+
+from authentication.authentication import tokens_valid_after
+from core.versioning import get_versions
+from groups.models import GroupMembership, GroupTeacher
+from .models import Assignment, AssignmentGroup
+
+User = get_user_model()
+
+FEED_TOKEN_SALT = 'assignments.calendar'
+FEED_CACHE_KEY = 'calendar:feed:{user_id}'
+EVENTS_CACHE_KEY = 'calendar:events:{group_id}:{version}'
+PRODID = '-//Deadline Mate//Deadlines//RU'
+# Максимальная длина описания задания в событии
+DESCRIPTION_LIMIT = 500
+
+
+class ICalendarRenderer(BaseRenderer):
+    media_type = 'text/calendar'
+    format = 'ics'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return data
+
+
+def make_feed_token(user_id):
+    """
+    Возвращает подписанный токен ссылки на календарь.
+
+    Токен содержит время выпуска и перестаёт действовать вместе с JWT-токенами
+    пользователя (смена пароля, блокировка, удаление).
+    """
+    return signing.Signer(salt=FEED_TOKEN_SALT).sign_object({'u': user_id, 'i': int(time.time())})
+
+
+def read_feed_token(token):
+    """Возвращает id пользователя из действующего токена или None."""
+    try:
+        payload = signing.Signer(salt=FEED_TOKEN_SALT).unsign_object(token)
+        user_id, issued_at = payload['u'], payload['i']
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+    if issued_at < tokens_valid_after(user_id):
+        return None
+    return user_id
+
+
+def get_feed(user_id):
+    """
+    Возвращает {'body', 'etag', 'versions'} календаря пользователя.
+
+    None, если пользователь не найден или не является студентом/преподавателем.
+    """
+    feed = cache.get(FEED_CACHE_KEY.format(user_id=user_id))
+    if feed is not None and get_versions(feed['versions']) == feed['versions']:
+        return feed
+    return build_feed(user_id)
+
+
+def build_feed(user_id):
+    """Собирает календарь пользователя и сохраняет его в кеше."""
+    owner = _feed_owner(user_id)
+    if owner is None:
+        return None
+
+    # Версии читаются до запросов: изменение, сделанное во время сборки,
+    # сменит версию, и следующий запрос соберёт календарь заново
+    versions = get_versions([owner])
+    scope, profile_id = owner
+    if scope == 'student':
+        memberships = GroupMembership.objects.filter(student_id=profile_id, is_active=True)
+    else:
+        memberships = GroupTeacher.objects.filter(teacher_id=profile_id, is_active=True)
+    group_ids = sorted(memberships.values_list('group_id', flat=True))
+    group_versions = get_versions([('group', group_id) for group_id in group_ids])
+    versions.update(group_versions)
+
+    events = _group_events({group_id: version for (_, group_id), version in group_versions.items()})
+    body = _render_calendar(events)
+    feed = {
+        'body': body,
+        'etag': '"%s"' % hashlib.md5(body.encode('utf-8')).hexdigest(),
+        'versions': versions,
+    }
+    cache.set(FEED_CACHE_KEY.format(user_id=user_id), feed, settings.CALENDAR_FEED_CACHE_TIMEOUT)
+    return feed
+
+
+def _feed_owner(user_id):
+    """Ключ версии состава групп пользователя: ('student', id) или ('teacher', id)."""
+    row = User.objects.filter(pk=user_id, is_active=True).values(
+        'role', 'student_profile__id', 'teacher_profile__id'
+    ).first()
+    if row is None:
+        return None
+    if row['role'] == User.ROLE_STUDENT and row['student_profile__id']:
+        return ('student', row['student_profile__id'])
+    if row['role'] == User.ROLE_TEACHER and row['teacher_profile__id']:
+        return ('teacher', row['teacher_profile__id'])
+    return None
+
+
+def _group_events(group_versions):
+    """
+    Возвращает события всех групп: [(assignment_id, dtstart, текст VEVENT)].
+
+    События группы кешируются под её версией, из БД загружаются только группы,
+    для которых в кеше нет событий текущей версии.
+    """
+    keys = {
+        EVENTS_CACHE_KEY.format(group_id=group_id, version=version): group_id
+        for group_id, version in group_versions.items()
+    }
+    cached = cache.get_many(list(keys))
+    missing = [group_id for key, group_id in keys.items() if key not in cached]
+
+    if missing:
+        built = {group_id: [] for group_id in missing}
+        assignment_groups = AssignmentGroup.objects.filter(
+            group_id__in=missing,
+            assignment__status=Assignment.STATUS_PUBLISHED,
+        ).select_related('assignment', 'group').order_by('assignment_id')
+        for assignment_group in assignment_groups:
+            built[assignment_group.group_id].append(_render_event(assignment_group))
+        fresh = {
+            EVENTS_CACHE_KEY.format(group_id=group_id, version=group_versions[group_id]): events
+            for group_id, events in built.items()
+        }
+        cache.set_many(fresh, settings.CALENDAR_FEED_CACHE_TIMEOUT)
+        cached.update(fresh)
+
+    events = []
+    for group_events in cached.values():
+        events.extend(group_events)
+    return events
+
+
+def _render_event(assignment_group):
+    assignment = assignment_group.assignment
+    dtstart = _format_datetime(assignment_group.effective_deadline)
+    description = assignment.description
+    if len(description) > DESCRIPTION_LIMIT:
+        description = description[:DESCRIPTION_LIMIT].rstrip() + '…'
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:assignment-{assignment.pk}@deadline-mate',
+        f'DTSTAMP:{_format_datetime(assignment.updated_at)}',
+        f'DTSTART:{dtstart}',
+        f'DTEND:{dtstart}',
+        f'SUMMARY:{_escape(assignment.title)}',
+        f'DESCRIPTION:{_escape(assignment_group.group.name)}\\n\\n{_escape(description)}',
+        f'CATEGORIES:{_escape(assignment_group.group.name)}',
+        'END:VEVENT',
+    ]
+    return (assignment.pk, dtstart, '\r\n'.join(_fold(line) for line in lines))
+
+
+def _render_calendar(events):
+    """
+    Собирает VCALENDAR из событий групп.
+
+    Задание, назначенное нескольким группам пользователя, попадает в календарь
+    один раз - с самым ранним дедлайном.
+    """
+    earliest = {}
+    for assignment_id, dtstart, text in events:
+        current = earliest.get(assignment_id)
+        if current is None or dtstart < current[0]:
+            earliest[assignment_id] = (dtstart, text)
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        'X-WR-CALNAME:Deadline Mate',
+    ]
+    ordered = sorted((dtstart, assignment_id, text) for assignment_id, (dtstart, text) in earliest.items())
+    lines.extend(text for _, _, text in ordered)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(lines) + '\r\n'
+
+
+def _format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def _fold(line, limit=75):
+    """Переносит строку длиннее 75 октетов (RFC 5545, 3.1), не разрывая символы UTF-8."""
+    if len(line.encode('utf-8')) <= limit:
+        return line
+    parts = []
+    current, size = '', 0
+    for char in line:
+        char_size = len(char.encode('utf-8'))
+        if size + char_size > limit:
+            parts.append(current)
+            # Строка продолжения начинается с пробела
+            current, size = ' ', 1
+        current += char
+        size += char_size
+    parts.append(current)
+    return '\r\n'.join(parts)
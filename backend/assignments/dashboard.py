@@ -0,0 +1,199 @@
+"""
+Сводка для главного экрана.
+
+Студент получает свои группы, ближайшие дедлайны с состоянием своих ответов,
+число просроченных заданий и счётчики ответов по статусам. Преподаватель -
+группы с числом студентов, ближайшие дедлайны с числом ответов и заданиями,
+ожидающими проверки. Сводка строится фиксированным числом запросов (пять),
+независимо от числа групп и заданий.
+
+Готовая сводка хранится в кеше вместе с версиями данных (core.versioning):
+
+- ('student', id) / ('teacher', id) - состав групп пользователя;
+- ('group', id) - задания группы и их дедлайны, название группы;
+- ('group_members', id) - состав студентов группы (для преподавателя);
+- ('student_submissions', id) - ответы студента;
+- ('assignment_submissions', id) - ответы на задание (для преподавателя).
+
+Кроме того, сводка перестраивается, когда наступает ближайший из показанных
+дедлайнов: задание перестаёт быть предстоящим. Как и версии, сводки должны
+храниться в кеше, общем для всех процессов (проверка core.E003).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+from rest_framework.fields import DateTimeField
+
+from core.versioning import get_versions
+from groups.models import Group, GroupTeacher
+from .models import Assignment, AssignmentGroup, Submission
+
+DASHBOARD_CACHE_KEY = 'dashboard:{scope}:{profile_id}'
+# Число предстоящих заданий и заданий на проверку в сводке
+UPCOMING_LIMIT = 10
+TO_GRADE_LIMIT = 10
+
+_datetime_field = DateTimeField()
+
+
+def get_dashboard(scope, profile_id):
+    """Возвращает сводку студента (scope='student') или преподавателя (scope='teacher')."""
+    entry = cache.get(DASHBOARD_CACHE_KEY.format(scope=scope, profile_id=profile_id))
+    if (
+        entry is not None
+        and (entry['valid_until'] is None or timezone.now() < entry['valid_until'])
+        and get_versions(entry['versions']) == entry['versions']
+    ):
+        return entry['data']
+    return build_dashboard(scope, profile_id)
+
+
+def build_dashboard(scope, profile_id):
+    """Собирает сводку и сохраняет её в кеше."""
+    builder = _build_student if scope == 'student' else _build_teacher
+    data, versions, valid_until = builder(profile_id)
+    cache.set(
+        DASHBOARD_CACHE_KEY.format(scope=scope, profile_id=profile_id),
+        {'data': data, 'versions': versions, 'valid_until': valid_until},
+        settings.DASHBOARD_CACHE_TIMEOUT,
+    )
+    return data
+
+
+def _build_student(student_id):
+    # Версии читаются до запросов (см. assignments.calendar.build_feed)
+    versions = get_versions([('student', student_id), ('student_submissions', student_id)])
+    groups = list(
+        Group.objects.filter(
+            memberships__student_id=student_id, memberships__is_active=True, is_active=True,
+        ).order_by('name').values('id', 'name', 'code')
+    )
+    group_ids = [group['id'] for group in groups]
+    versions.update(get_versions([('group', group_id) for group_id in group_ids]))
+
+    now = timezone.now()
+    published = AssignmentGroup.objects.filter(
+        group_id__in=group_ids, assignment__status=Assignment.STATUS_PUBLISHED,
+    )
+    upcoming = _upcoming(published, now)
+    submissions = {
+        row.pop('assignment_id'): row
+        for row in Submission.objects.filter(
+            student_id=student_id, assignment_id__in=[item['id'] for item in upcoming],
+        ).values('assignment_id', 'id', 'status', 'points', 'is_late')
+    }
+    for item in upcoming:
+        item['submission'] = submissions.get(item['id'])
+
+    overdue_count = published.filter(effective_deadline__lte=now).exclude(
+        assignment__submissions__student_id=student_id,
+    ).values('assignment_id').distinct().count()
+    counts = dict(
+        Submission.objects.filter(student_id=student_id)
+        .values_list('status').annotate(count=Count('id')).order_by()
+    )
+
+    data = {
+        'role': 'student',
+        'groups': groups,
+        'upcoming': [_represent_upcoming(item) for item in upcoming],
+        'overdue_count': overdue_count,
+        'submission_counts': {
+            status: counts.get(status, 0) for status, _ in Submission.STATUS_CHOICES
+        },
+    }
+    return data, versions, _valid_until(upcoming)
+
+
+def _build_teacher(teacher_id):
+    versions = get_versions([('teacher', teacher_id)])
+    groups = list(
+        Group.objects.filter(
+            id__in=GroupTeacher.objects.filter(teacher_id=teacher_id, is_active=True).values('group_id'),
+            is_active=True,
+        ).annotate(
+            member_count=Count('memberships', filter=Q(memberships__is_active=True)),
+        ).order_by('name').values('id', 'name', 'code', 'member_count')
+    )
+    group_ids = [group['id'] for group in groups]
+    assignment_groups = AssignmentGroup.objects.filter(group_id__in=group_ids)
+    assignment_ids = sorted(set(assignment_groups.values_list('assignment_id', flat=True)))
+    versions.update(get_versions(
+        [('group', group_id) for group_id in group_ids]
+        + [('group_members', group_id) for group_id in group_ids]
+        + [('assignment_submissions', assignment_id) for assignment_id in assignment_ids]
+    ))
+
+    upcoming = _upcoming(
+        assignment_groups.filter(assignment__status=Assignment.STATUS_PUBLISHED), timezone.now(),
+    )
+    # Одна выборка даёт и счётчики ответов предстоящих заданий, и задания на проверку
+    submission_counts = list(
+        Submission.objects.filter(assignment_id__in=assignment_ids)
+        .values('assignment_id', 'assignment__title')
+        .annotate(
+            submission_count=Count('id'),
+            ungraded_count=Count('id', filter=Q(status=Submission.STATUS_SUBMITTED)),
+            oldest_submitted_at=Min('submitted_at', filter=Q(status=Submission.STATUS_SUBMITTED)),
+        ).order_by()
+    )
+    counts = {row['assignment_id']: row for row in submission_counts}
+    for item in upcoming:
+        row = counts.get(item['id'], {})
+        item['submission_count'] = row.get('submission_count', 0)
+        item['ungraded_count'] = row.get('ungraded_count', 0)
+
+    to_grade = sorted(
+        (row for row in submission_counts if row['ungraded_count']),
+        key=lambda row: (row['oldest_submitted_at'], row['assignment_id']),
+    )
+    data = {
+        'role': 'teacher',
+        'groups': groups,
+        'upcoming': [_represent_upcoming(item) for item in upcoming],
+        'to_grade': [
+            {
+                'id': row['assignment_id'],
+                'title': row['assignment__title'],
+                'ungraded_count': row['ungraded_count'],
+                'oldest_submitted_at': _datetime_field.to_representation(row['oldest_submitted_at']),
+            }
+            for row in to_grade[:TO_GRADE_LIMIT]
+        ],
+        'ungraded_count': sum(row['ungraded_count'] for row in to_grade),
+    }
+    return data, versions, _valid_until(upcoming)
+
+
+def _upcoming(assignment_groups, now):
+    """
+    Ближайшие задания с ещё не наступившим дедлайном.
+
+    Задание нескольких групп пользователя попадает в список один раз - с самым
+    ранним из предстоящих дедлайнов.
+    """
+    rows = (
+        assignment_groups.filter(effective_deadline__gt=now)
+        .values('assignment_id', 'assignment__title', 'assignment__max_points')
+        .annotate(deadline=Min('effective_deadline'))
+        .order_by('deadline', 'assignment_id')[:UPCOMING_LIMIT]
+    )
+    return [
+        {
+            'id': row['assignment_id'],
+            'title': row['assignment__title'],
+            'max_points': row['assignment__max_points'],
+            'deadline': row['deadline'],
+        }
+        for row in rows
+    ]
+
+
+def _represent_upcoming(item):
+    return dict(item, deadline=_datetime_field.to_representation(item['deadline']))
+
+
+def _valid_until(upcoming):
+    """Сводка устаревает, когда наступает первый из показанных дедлайнов."""
+    return upcoming[0]['deadline'] if upcoming else None
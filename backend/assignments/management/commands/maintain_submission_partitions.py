@@ -0,0 +1,86 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from assignments import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Maintains submission partitions: creates monthly range partitions ahead of time, '
+        'drops old empty ones (e.g. after archiving) and reports partition sizes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=settings.SUBMISSION_PARTITION_MONTHS_AHEAD,
+            help='Range partitions kept ahead of the current month '
+                 '(default: SUBMISSION_PARTITION_MONTHS_AHEAD)',
+        )
+        parser.add_argument(
+            '--drop-empty-before', metavar='YYYY-MM',
+            help='Drop empty range partitions for months before this one',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='Print the SQL without executing it')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not partitioning.is_supported(connection):
+            raise CommandError(f'Table partitioning is not supported on {connection.vendor}')
+        scheme = partitioning.get_scheme(connection)
+        if scheme is None:
+            raise CommandError('The submissions table is not partitioned; run partition_submissions first')
+
+        if scheme == partitioning.RANGE:
+            statements = self._create_sql(connection, options['months_ahead'])
+            if options['drop_empty_before']:
+                statements += self._drop_sql(connection, options['drop_empty_before'])
+            if options['dry_run']:
+                for sql in statements:
+                    self.stdout.write(f'{sql};')
+                return
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        self.stdout.write(f'Submissions partitioned by {scheme}:')
+        for name, bound, rows in partitioning.get_partitions(connection):
+            self.stdout.write(f'  {name}: {bound}, ~{max(rows, 0)} rows')
+
+    def _create_sql(self, connection, months_ahead):
+        existing = {name for name, _, _ in partitioning.get_partitions(connection)}
+        current = partitioning.month_start(timezone.now())
+        statements = []
+        for offset in range(months_ahead + 1):
+            start = partitioning.add_months(current, offset)
+            if partitioning.month_partition_name(start) not in existing:
+                statements += partitioning.add_month_partition_sql(connection, start)
+                self.stdout.write(f'Creating {partitioning.month_partition_name(start)}')
+        return statements
+
+    def _drop_sql(self, connection, month):
+        try:
+            cutoff = datetime.strptime(month, '%Y-%m').replace(tzinfo=dt_timezone.utc)
+        except ValueError:
+            raise CommandError(f'Invalid month: {month}')
+        qn = connection.ops.quote_name
+        statements = []
+        with connection.cursor() as cursor:
+            for name, _, _ in partitioning.get_partitions(connection):
+                try:
+                    start = datetime.strptime(name[-7:], '%Y_%m').replace(tzinfo=dt_timezone.utc)
+                except ValueError:
+                    continue
+                if name != partitioning.month_partition_name(start) or start >= cutoff:
+                    continue
+                cursor.execute(f'SELECT EXISTS (SELECT 1 FROM {qn(name)})')
+                if cursor.fetchone()[0]:
+                    self.stdout.write(f'Keeping {name}: not empty, archive its assignments first')
+                    continue
+                statements.append(f'DROP TABLE {qn(name)}')
+                self.stdout.write(f'Dropping {name}')
+        return statements
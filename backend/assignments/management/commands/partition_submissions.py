@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from assignments import partitioning
+
+
+class Command(BaseCommand):
+    help = (
+        'Converts the submissions table into a PostgreSQL partitioned table (hash on assignment_id '
+        'or monthly ranges on submitted_at), copying existing rows; --revert converts it back'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scheme', choices=partitioning.SCHEMES, default=partitioning.HASH)
+        parser.add_argument(
+            '--partitions', type=int, default=settings.SUBMISSION_HASH_PARTITIONS,
+            help='Number of hash partitions (default: SUBMISSION_HASH_PARTITIONS)',
+        )
+        parser.add_argument(
+            '--months-ahead', type=int, default=settings.SUBMISSION_PARTITION_MONTHS_AHEAD,
+            help='Range partitions created ahead of the current month '
+                 '(default: SUBMISSION_PARTITION_MONTHS_AHEAD)',
+        )
+        parser.add_argument('--revert', action='store_true', help='Convert back to a regular table')
+        parser.add_argument('--dry-run', action='store_true', help='Print the SQL without executing it')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not partitioning.is_supported(connection):
+            raise CommandError(f'Table partitioning is not supported on {connection.vendor}')
+        current = partitioning.get_scheme(connection)
+        if options['revert'] and current is None:
+            raise CommandError('The submissions table is not partitioned')
+        if options['partitions'] < 1:
+            raise CommandError('--partitions must be positive')
+
+        scheme = None if options['revert'] else options['scheme']
+        arguments = (connection, scheme, options['partitions'], options['months_ahead'])
+        if options['dry_run']:
+            for sql in partitioning.conversion_sql(*arguments):
+                self.stdout.write(f'{sql};')
+            return
+
+        partitioning.convert(*arguments)
+        if scheme is None:
+            self.stdout.write(self.style.SUCCESS('Submissions table converted to a regular table'))
+            return
+        partitions = partitioning.get_partitions(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f'Submissions table partitioned by {scheme} into {len(partitions)} partitions'
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:10
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_effective_deadline(apps, schema_editor):
+    Assignment = apps.get_model('assignments', 'Assignment')
+    AssignmentGroup = apps.get_model('assignments', 'AssignmentGroup')
+    deadline = Assignment.objects.filter(pk=OuterRef('assignment_id')).values('deadline')[:1]
+    AssignmentGroup.objects.using(schema_editor.connection.alias).update(
+        effective_deadline=Coalesce('custom_deadline', Subquery(deadline))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmentgroup',
+            name='effective_deadline',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Действующий дедлайн'),
+        ),
+        migrations.RunPython(fill_effective_deadline, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='assignmentgroup',
+            name='effective_deadline',
+            field=models.DateTimeField(editable=False, verbose_name='Действующий дедлайн'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentgroup',
+            index=models.Index(fields=['effective_deadline', 'group'], name='assignment_group_deadline_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assignments', '0002_assignmentgroup_effective_deadline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assignmentgroup',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата обновления'),
+        ),
+        migrations.AddIndex(
+            model_name='assignment',
+            index=models.Index(fields=['updated_at'], name='assignment_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignmentgroup',
+            index=models.Index(fields=['updated_at'], name='assignment_group_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='submission',
+            index=models.Index(fields=['updated_at'], name='submission_updated_idx'),
+        ),
+    ]
@@ -1,12 +1,18 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from authentication.models import TeacherProfile, StudentProfile
+from core.models import ChangeLogEntry, ChangeLoggedModel, record_changes
+from core.versioning import bump_versions
 from groups.models import Group
 
 
-class Assignment(models.Model):
+class Assignment(ChangeLoggedModel):
     """Модель для учебных заданий."""
+    change_log_code = 1
+
     STATUS_DRAFT = 'draft'
     STATUS_PUBLISHED = 'published'
     STATUS_ARCHIVED = 'archived'
@@ -52,10 +58,58 @@ class Assignment(models.Model):
         verbose_name = _('Задание')
         verbose_name_plural = _('Задания')
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='assignment_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Дедлайн и статус на момент загрузки: при их изменении save() обновляет
+        # действующие дедлайны назначений без индивидуального срока и время
+        # изменения назначений
+        instance._loaded_deadline = instance.__dict__.get('deadline')
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
+    def change_log_scope(self):
+        return {'teacher_id': self.created_by_id}
+    
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        using = kwargs.get('using') or router.db_for_write(Assignment, instance=self)
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            if adding:
+                return
+            
+            deadline_changed = (update_fields is None or 'deadline' in update_fields) and (
+                getattr(self, '_loaded_deadline', None) != self.deadline
+            )
+            # Назначения появляются у студентов и исчезают вместе с публикацией
+            # задания: лента изменений (assignments.sync) должна их отдать
+            status_changed = (update_fields is None or 'status' in update_fields) and (
+                getattr(self, '_loaded_status', None) != self.status
+            )
+            if not (deadline_changed or status_changed):
+                return
+            
+            assignment_groups = AssignmentGroup.objects.using(using).filter(assignment_id=self.pk)
+            touched = assignment_groups
+            if deadline_changed:
+                touched = assignment_groups.filter(custom_deadline__isnull=True)
+                touched.update(effective_deadline=self.deadline, updated_at=timezone.now())
+                self._loaded_deadline = self.deadline
+            if status_changed:
+                touched = assignment_groups
+                touched.update(updated_at=timezone.now())
+                self._loaded_status = self.status
+            record_changes(touched.only('id', 'group_id', 'assignment_id'), ChangeLogEntry.UPDATE, using=using)
+    
     @property
     def is_deadline_expired(self):
         """Проверяет, истек ли срок сдачи задания."""
@@ -94,8 +148,10 @@ class AssignmentAttachment(models.Model):
         return f"{self.filename} - {self.assignment.title}"
 
 
-class AssignmentGroup(models.Model):
+class AssignmentGroup(ChangeLoggedModel):
     """Модель связи заданий с группами."""
+    change_log_code = 2
+
     assignment = models.ForeignKey(
         Assignment,
         on_delete=models.CASCADE,
@@ -110,23 +166,38 @@ class AssignmentGroup(models.Model):
     )
     assigned_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата назначения'))
     custom_deadline = models.DateTimeField(null=True, blank=True, verbose_name=_('Индивидуальный дедлайн'))
+    # Индивидуальный дедлайн или дедлайн задания. Хранится в таблице, чтобы
+    # ближайшие дедлайны групп выбирались по индексу, а не вычислялись в Python
+    effective_deadline = models.DateTimeField(editable=False, verbose_name=_('Действующий дедлайн'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Дата обновления'))
 
     class Meta:
         verbose_name = _('Назначение задания группе')
         verbose_name_plural = _('Назначения заданий группам')
         unique_together = ['assignment', 'group']
+        indexes = [
+            models.Index(fields=['effective_deadline', 'group'], name='assignment_group_deadline_idx'),
+            models.Index(fields=['updated_at'], name='assignment_group_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.assignment.title} - {self.group.name}"
     
-    @property
-    def effective_deadline(self):
-        """Возвращает действующий дедлайн для группы."""
-        return self.custom_deadline or self.assignment.deadline
+    def change_log_scope(self):
+        return {'group_id': self.group_id, 'assignment_id': self.assignment_id}
+    
+    def save(self, *args, **kwargs):
+        self.effective_deadline = self.custom_deadline or self.assignment.deadline
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'custom_deadline' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'effective_deadline'}
+        super().save(*args, **kwargs)
 
 
-class Submission(models.Model):
+class Submission(ChangeLoggedModel):
     """Модель для ответов студентов на задания."""
+    change_log_code = 3
+
     STATUS_SUBMITTED = 'submitted'
     STATUS_GRADED = 'graded'
     STATUS_RETURNED = 'returned'
@@ -176,10 +247,16 @@ class Submission(models.Model):
         verbose_name_plural = _('Ответы на задания')
         ordering = ['-submitted_at']
         unique_together = ['assignment', 'student']
+        indexes = [
+            models.Index(fields=['updated_at'], name='submission_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.assignment.title}"
     
+    def change_log_scope(self):
+        return {'student_id': self.student_id, 'assignment_id': self.assignment_id}
+    
     def save(self, *args, **kwargs):
         # Проверяем, сдано ли после дедлайна
         assignment_group = AssignmentGroup.objects.filter(
@@ -219,4 +296,44 @@ class SubmissionAttachment(models.Model):
         verbose_name_plural = _('Вложения ответов')
 
     def __str__(self):
-        return f"{self.filename} - {self.submission}" 
\ No newline at end of file
+        return f"{self.filename} - {self.submission}" 
+
+@receiver(post_save, sender=Assignment)
+def bump_assignment_groups_version(sender, instance, created, using, **kwargs):
+    """
+    Сбрасывает закешированные данные групп, которым назначено задание.
+
+    При удалении задания каскадно удаляются его назначения, и версии групп
+    меняет обработчик AssignmentGroup.
+    """
+    if created:
+        return
+    group_ids = AssignmentGroup.objects.using(using).filter(
+        assignment_id=instance.pk
+    ).values_list('group_id', flat=True)
+    bump_versions([('group', group_id) for group_id in group_ids], using=using)
+
+
+@receiver(post_save, sender=AssignmentGroup)
+@receiver(post_delete, sender=AssignmentGroup)
+def bump_assignment_group_version(sender, instance, using, **kwargs):
+    """Назначение задания группе или его дедлайн изменились."""
+    bump_versions([('group', instance.group_id)], using=using)
+
+
+@receiver(post_save, sender=Submission)
+@receiver(post_delete, sender=Submission)
+def bump_submission_versions(sender, instance, using, **kwargs):
+    """Ответ студента отправлен, оценён или удалён."""
+    bump_versions(
+        [('student_submissions', instance.student_id), ('assignment_submissions', instance.assignment_id)],
+        using=using,
+    )
+
+
+@receiver(post_delete, sender=Assignment)
+@receiver(post_delete, sender=AssignmentGroup)
+@receiver(post_delete, sender=Submission)
+def record_deletion(sender, instance, using, **kwargs):
+    """Удаление (в том числе каскадное) выполняется в транзакции вместе с записью в журнал."""
+    record_changes([instance], ChangeLogEntry.DELETE, using=using)
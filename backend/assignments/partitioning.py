@@ -0,0 +1,283 @@
+"""
+Секционирование таблицы ответов (Submission) в PostgreSQL.
+
+Таблица ответов растёт быстрее остальных, а запросы к ней всегда ограничены
+заданием или временем. В PostgreSQL её можно преобразовать в
+секционированную (declarative partitioning) командой partition_submissions:
+
+- hash - по assignment_id на SUBMISSION_HASH_PARTITIONS секций. Ответы
+  задания читаются из одной секции; ограничение "один ответ студента на
+  задание" сохраняется, так как содержит ключ секционирования. Схема по
+  умолчанию.
+- range - по submitted_at, секция на месяц и секция DEFAULT для остальных
+  строк. Опустевшие после архивации (archive) старые секции удаляются
+  целиком командой maintain_submission_partitions, она же создаёт секции
+  на SUBMISSION_PARTITION_MONTHS_AHEAD месяцев вперёд. Уникальность
+  (assignment_id, student_id) БД проверяет только вместе с submitted_at,
+  поэтому повторный ответ отсекают проверки представлений и сериализаторов.
+
+Таблица сохраняет имя, столбцы, индексы и триггеры, поэтому модель,
+SubmissionViewSet и сериализаторы работают без изменений. Первичный ключ
+включает ключ секционирования, идентификаторы по-прежнему выдаёт одна
+последовательность. Внешние ключи на ответы (SubmissionAttachment) не могут
+ссылаться на секционированную таблицу и удаляются - каскадное удаление
+вложений выполняет Django; обратное преобразование (--revert) их
+восстанавливает.
+
+Преобразование выполняется одной транзакцией и блокирует таблицу на время
+копирования строк. В SQLite и других СУБД таблица остаётся обычной.
+"""
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.backends.utils import truncate_name
+from django.utils import timezone
+
+from .models import Submission
+
+HASH = 'hash'
+RANGE = 'range'
+SCHEMES = (HASH, RANGE)
+PARTITION_KEYS = {HASH: 'assignment_id', RANGE: 'submitted_at'}
+_STRATEGIES = {'h': HASH, 'r': RANGE}
+
+
+def is_supported(connection):
+    return connection.vendor == 'postgresql'
+
+
+def table_name():
+    return Submission._meta.db_table
+
+
+def get_scheme(connection):
+    """Схема секционирования таблицы ответов или None для обычной таблицы."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT partstrat FROM pg_partitioned_table WHERE partrelid = %s::regclass', [table_name()]
+        )
+        row = cursor.fetchone()
+    return _STRATEGIES.get(row[0]) if row else None
+
+
+def get_partitions(connection, table=None):
+    """[(секция, граница, примерное число строк)] в порядке имён."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint
+            FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            ORDER BY c.relname
+            """,
+            [table or table_name()],
+        )
+        return cursor.fetchall()
+
+
+def month_start(moment):
+    moment = moment.astimezone(dt_timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(moment, months):
+    month = moment.month - 1 + months
+    return moment.replace(year=moment.year + month // 12, month=month % 12 + 1)
+
+
+def month_partition_name(start):
+    return f'{table_name()}_p{start:%Y_%m}'
+
+
+def conversion_sql(connection, scheme, hash_partitions=16, months_ahead=3):
+    """
+    Команды пересоздания таблицы ответов: секционированной по scheme или
+    обычной (scheme=None). Исходная таблица может быть секционированной.
+    """
+    qn = connection.ops.quote_name
+    table = table_name()
+    old = f'{table}_old'
+    key = PARTITION_KEYS.get(scheme)
+
+    with connection.cursor() as cursor:
+        constraints = _constraints(cursor, table)
+        indexes = _indexes(cursor, table, {name for name, _, _, _ in constraints})
+        triggers = _triggers(cursor, table)
+        first = None
+        if scheme == RANGE:
+            cursor.execute(f'SELECT MIN({qn(key)}) FROM {qn(table)}')
+            first = cursor.fetchone()[0]
+    old_partitions = [name for name, _, _ in get_partitions(connection)]
+    current_key = PARTITION_KEYS.get(get_scheme(connection))
+
+    statements = [f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}']
+    # Имена секций заняты секциями исходной таблицы до её удаления
+    statements += [f'ALTER TABLE {qn(name)} RENAME TO {qn(name + "_old")}' for name in old_partitions]
+
+    create = f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+    if scheme == HASH:
+        statements.append(f'{create} PARTITION BY HASH ({qn(key)})')
+        statements += [
+            f'CREATE TABLE {qn(f"{table}_h{remainder:02d}")} PARTITION OF {qn(table)} '
+            f'FOR VALUES WITH (MODULUS {hash_partitions}, REMAINDER {remainder})'
+            for remainder in range(hash_partitions)
+        ]
+    elif scheme == RANGE:
+        statements.append(f'{create} PARTITION BY RANGE ({qn(key)})')
+        current = month_start(timezone.now())
+        start = min(month_start(first), current) if first else current
+        while start <= add_months(current, months_ahead):
+            statements.append(range_partition_sql(connection, start))
+            start = add_months(start, 1)
+        statements.append(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+    else:
+        statements.append(create)
+
+    statements += [
+        f'INSERT INTO {qn(table)} SELECT * FROM {qn(old)}',
+        # Удаляет и секции, и внешние ключи других таблиц на исходную таблицу
+        f'DROP TABLE {qn(old)} CASCADE',
+    ]
+
+    sequence = f'{table}_id_seq'
+    statements += [
+        f'CREATE SEQUENCE {qn(sequence)} AS bigint OWNED BY {qn(table)}.{qn("id")}',
+        f"ALTER TABLE {qn(table)} ALTER COLUMN {qn('id')} SET DEFAULT nextval('{sequence}')",
+        f"SELECT setval('{sequence}', COALESCE(MAX({qn('id')}), 1), MAX({qn('id')}) IS NOT NULL) "
+        f'FROM {qn(table)}',
+    ]
+
+    for name, contype, definition, columns in constraints:
+        if contype in ('p', 'u'):
+            columns = _model_unique_columns(columns, current_key)
+            # Ограничения уникальности секционированной таблицы содержат ключ секционирования
+            if key and key not in columns:
+                columns = [*columns, key]
+            kind = 'PRIMARY KEY' if contype == 'p' else 'UNIQUE'
+            definition = f'{kind} ({", ".join(qn(column) for column in columns)})'
+        elif contype != 'f':
+            # Проверки скопированы LIKE ... INCLUDING CONSTRAINTS
+            continue
+        statements.append(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+
+    statements += indexes
+    statements += triggers
+    if scheme is None:
+        statements += _referencing_foreign_keys_sql(connection)
+    statements.append(f'ANALYZE {qn(table)}')
+    return statements
+
+
+def convert(connection, scheme, hash_partitions=16, months_ahead=3):
+    """Пересоздаёт таблицу ответов в одной транзакции; возвращает выполненные команды."""
+    with transaction.atomic(using=connection.alias):
+        statements = conversion_sql(connection, scheme, hash_partitions, months_ahead)
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+    return statements
+
+
+def range_partition_sql(connection, start):
+    qn = connection.ops.quote_name
+    end = add_months(start, 1)
+    return (
+        f'CREATE TABLE {qn(month_partition_name(start))} PARTITION OF {qn(table_name())} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def add_month_partition_sql(connection, start):
+    """
+    Команды добавления месячной секции к таблице с секцией DEFAULT.
+
+    Строки этого месяца, уже попавшие в DEFAULT, переносятся в новую секцию
+    до её подключения, иначе PostgreSQL не подключит секцию.
+    """
+    qn = connection.ops.quote_name
+    table = table_name()
+    name = month_partition_name(start)
+    end = add_months(start, 1)
+    bounds = f"{qn('submitted_at')} >= '{start.isoformat()}' AND {qn('submitted_at')} < '{end.isoformat()}'"
+    return [
+        f'CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+        f'WITH moved AS (DELETE FROM {qn(table + "_default")} WHERE {bounds} RETURNING *) '
+        f'INSERT INTO {qn(name)} SELECT * FROM moved',
+        f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')",
+    ]
+
+
+def _constraints(cursor, table):
+    """[(имя, тип, определение, столбцы)] ограничений таблицы."""
+    cursor.execute(
+        """
+        SELECT con.conname, con.contype, pg_get_constraintdef(con.oid),
+               ARRAY(
+                   SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, position)
+                   JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+                   ORDER BY k.position
+               )
+        FROM pg_constraint con
+        WHERE con.conrelid = %s::regclass
+        ORDER BY con.conname
+        """,
+        [table],
+    )
+    return [(name, contype, definition, list(columns)) for name, contype, definition, columns in cursor.fetchall()]
+
+
+def _model_unique_columns(columns, partition_key):
+    """Столбцы ограничения уникальности модели без добавленного ранее ключа секционирования."""
+    meta = Submission._meta
+    unique = [{meta.get_field(name).column for name in names} for names in meta.unique_together]
+    unique += [{field.column} for field in meta.concrete_fields if field.unique]
+    if set(columns) not in unique and partition_key in columns:
+        stripped = [column for column in columns if column != partition_key]
+        if set(stripped) in unique:
+            return stripped
+    return columns
+
+
+def _indexes(cursor, table, constraint_names):
+    """CREATE INDEX индексов таблицы, не созданных ограничениями."""
+    cursor.execute(
+        """
+        SELECT i.relname, pg_get_indexdef(i.oid)
+        FROM pg_index x JOIN pg_class i ON i.oid = x.indexrelid
+        WHERE x.indrelid = %s::regclass
+        ORDER BY i.relname
+        """,
+        [table],
+    )
+    # Индекс секционированной таблицы описывается как ON ONLY - без индексов секций
+    return [
+        definition.replace(' ON ONLY ', ' ON ', 1)
+        for name, definition in cursor.fetchall() if name not in constraint_names
+    ]
+
+
+def _triggers(cursor, table):
+    cursor.execute(
+        'SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal',
+        [table],
+    )
+    return [definition for definition, in cursor.fetchall()]
+
+
+def _referencing_foreign_keys_sql(connection):
+    """Внешние ключи моделей, ссылающихся на ответы (удаляются при секционировании)."""
+    qn = connection.ops.quote_name
+    statements = []
+    for relation in Submission._meta.related_objects:
+        field = relation.field
+        if not (field.concrete and field.db_constraint and relation.one_to_many):
+            continue
+        related_table = field.model._meta.db_table
+        name = truncate_name(f'{related_table}_{field.column}_fk', connection.ops.max_name_length())
+        statements.append(
+            f'ALTER TABLE {qn(related_table)} ADD CONSTRAINT {qn(name)} '
+            f'FOREIGN KEY ({qn(field.column)}) REFERENCES {qn(table_name())} ({qn("id")}) '
+            'DEFERRABLE INITIALLY DEFERRED'
+        )
+    return statements
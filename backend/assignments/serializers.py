@@ -7,22 +7,28 @@ from groups.serializers import GroupSerializer
 from authentication.serializers import TeacherProfileSerializer, StudentProfileSerializer
 from django.utils import timezone
 
+from core.access import get_access_context
+from core.fieldsets import SparseFieldsetMixin
+from core.serializers import CompiledListSerializer
 
-class AssignmentAttachmentSerializer(serializers.ModelSerializer):
+
+class AssignmentAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для вложений заданий."""
     class Meta:
         model = AssignmentAttachment
+        list_serializer_class = CompiledListSerializer
         fields = ['id', 'file', 'filename', 'uploaded_at']
         read_only_fields = ['uploaded_at']
 
 
-class AssignmentMinSerializer(serializers.ModelSerializer):
+class AssignmentMinSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Минимальный сериализатор для заданий."""
     time_remaining = serializers.SerializerMethodField()
     is_deadline_expired = serializers.BooleanField(read_only=True)
     
     class Meta:
         model = Assignment
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'title', 'status', 'deadline', 
             'is_deadline_expired', 'time_remaining'
@@ -46,16 +52,17 @@ class AssignmentMinSerializer(serializers.ModelSerializer):
             return f"{minutes}м {seconds}с"
 
 
-class AssignmentSerializer(serializers.ModelSerializer):
+class AssignmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Полный сериализатор для заданий."""
     created_by = TeacherProfileSerializer(read_only=True)
     attachments = AssignmentAttachmentSerializer(many=True, read_only=True)
     time_remaining = serializers.SerializerMethodField()
     is_deadline_expired = serializers.BooleanField(read_only=True)
-    submission_count = serializers.IntegerField(read_only=True)
+    submission_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Assignment
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'title', 'description', 'created_by',
             'created_at', 'updated_at', 'status', 'deadline',
@@ -65,6 +72,12 @@ class AssignmentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at', 'created_by']
     
+    def get_submission_count(self, obj):
+        """Возвращает количество ответов на задание."""
+        if hasattr(obj, '_submission_count'):
+            return obj._submission_count
+        return obj.submission_count
+    
     def get_time_remaining(self, obj):
         """Получение оставшегося времени в формате строки."""
         if not obj.time_remaining:
@@ -94,7 +107,26 @@ class AssignmentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class AssignmentGroupSerializer(serializers.ModelSerializer):
+class DeadlineTimelineSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """Сериализатор ближайших дедлайнов пользователя."""
+    assignment_id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(source='assignment.title', read_only=True)
+    status = serializers.CharField(source='assignment.status', read_only=True)
+    max_points = serializers.IntegerField(source='assignment.max_points', read_only=True)
+    group_id = serializers.IntegerField(read_only=True)
+    group_name = serializers.CharField(source='group.name', read_only=True)
+    
+    class Meta:
+        model = AssignmentGroup
+        list_serializer_class = CompiledListSerializer
+        fields = [
+            'id', 'assignment_id', 'title', 'status', 'max_points',
+            'group_id', 'group_name', 'custom_deadline', 'effective_deadline'
+        ]
+        read_only_fields = fields
+
+
+class AssignmentGroupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для связи заданий с группами."""
     assignment = AssignmentMinSerializer(read_only=True)
     group = GroupSerializer(read_only=True)
@@ -111,6 +143,7 @@ class AssignmentGroupSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = AssignmentGroup
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'assignment', 'group', 'assignment_id', 'group_id',
             'assigned_at', 'custom_deadline', 'effective_deadline'
@@ -129,15 +162,16 @@ class AssignmentGroupSerializer(serializers.ModelSerializer):
         return assignment_group
 
 
-class SubmissionAttachmentSerializer(serializers.ModelSerializer):
+class SubmissionAttachmentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для вложений ответов."""
     class Meta:
         model = SubmissionAttachment
+        list_serializer_class = CompiledListSerializer
         fields = ['id', 'file', 'filename', 'uploaded_at']
         read_only_fields = ['uploaded_at']
 
 
-class SubmissionSerializer(serializers.ModelSerializer):
+class SubmissionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для ответов на задания."""
     student = StudentProfileSerializer(read_only=True)
     graded_by = TeacherProfileSerializer(read_only=True)
@@ -150,6 +184,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Submission
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'assignment', 'assignment_id', 'student', 
             'submitted_at', 'updated_at', 'comment', 'status',
@@ -163,8 +198,8 @@ class SubmissionSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Создание ответа с текущим студентом."""
-        user = self.context['request'].user
-        if not hasattr(user, 'student_profile'):
+        access = get_access_context(self.context['request'])
+        if not access.student_profile:
             raise serializers.ValidationError(
                 "Только студент может отправлять ответы на задания."
             )
@@ -172,13 +207,9 @@ class SubmissionSerializer(serializers.ModelSerializer):
         assignment = validated_data.pop('assignment_id')
         
         # Проверка, назначено ли задание студенту через его группы
-        student_groups = user.student_profile.group_memberships.filter(
-            is_active=True
-        ).values_list('group_id', flat=True)
-        
         if not AssignmentGroup.objects.filter(
             assignment=assignment,
-            group_id__in=student_groups
+            group_id__in=access.student_group_ids
         ).exists():
             raise serializers.ValidationError(
                 "Это задание не назначено ни одной из ваших групп."
@@ -187,7 +218,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
         # Проверка на повторную отправку
         if Submission.objects.filter(
             assignment=assignment,
-            student=user.student_profile
+            student_id=access.student_profile_id
         ).exists():
             raise serializers.ValidationError(
                 "Вы уже отправили ответ на это задание."
@@ -195,7 +226,7 @@ class SubmissionSerializer(serializers.ModelSerializer):
         
         submission = Submission.objects.create(
             assignment=assignment,
-            student=user.student_profile,
+            student=access.student_profile,
             **validated_data
         )
         return submission
@@ -209,23 +240,20 @@ class SubmissionGradeSerializer(serializers.ModelSerializer):
     
     def update(self, instance, validated_data):
         """Обновление оценки ответа преподавателем."""
-        user = self.context['request'].user
-        if not hasattr(user, 'teacher_profile'):
+        access = get_access_context(self.context['request'])
+        if not access.teacher_profile:
             raise serializers.ValidationError(
                 "Только преподаватель может оценивать ответы."
             )
         
-        # Проверка, является ли преподаватель создателем задания или преподавателем группы
-        assignment = instance.assignment
-        student_groups = instance.student.group_memberships.filter(
-            is_active=True
-        ).values_list('group_id', flat=True)
-        
-        is_assignment_creator = assignment.created_by == user.teacher_profile
-        is_group_teacher = assignment.assignment_groups.filter(
-            group__teachers__teacher=user.teacher_profile,
-            group__teachers__is_active=True,
-            group_id__in=student_groups
+        # Проверка, является ли преподаватель создателем задания или преподавателем
+        # группы, которой назначено задание и в которой состоит студент
+        is_assignment_creator = instance.assignment.created_by_id == access.teacher_profile_id
+        is_group_teacher = not is_assignment_creator and AssignmentGroup.objects.filter(
+            assignment_id=instance.assignment_id,
+            group_id__in=access.teaching_group_ids,
+            group__memberships__student_id=instance.student_id,
+            group__memberships__is_active=True
         ).exists()
         
         if not (is_assignment_creator or is_group_teacher):
@@ -237,7 +265,7 @@ class SubmissionGradeSerializer(serializers.ModelSerializer):
         instance.status = validated_data.get('status', instance.status)
         instance.points = validated_data.get('points', instance.points)
         instance.feedback = validated_data.get('feedback', instance.feedback)
-        instance.graded_by = user.teacher_profile
+        instance.graded_by = access.teacher_profile
         
         # Устанавливаем текущее время как время оценивания
         instance.graded_at = timezone.now()
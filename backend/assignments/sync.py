@@ -0,0 +1,306 @@
+"""
+Лента изменений для синхронизации клиентов.
+
+Клиент хранит локальную копию заданий, назначений, ответов и участий в
+группах и запрашивает только изменения с момента предыдущего запроса:
+GET /api/assignments/sync?cursor=<курсор из предыдущего ответа>. Без курсора
+отдаются все видимые пользователю строки.
+
+Для каждой сущности ответ содержит изменённые строки (updated) и
+идентификаторы строк, которые клиент должен удалить (deleted): удалённых
+(по записям журнала изменений, core.changelog) и ставших невидимыми - снятых
+с публикации заданий, неактивных участий в группах. При удалении задания
+клиент удаляет и его назначения и ответы.
+
+Курсор - позиция журнала изменений, до которой клиент получил данные, и
+версия состава групп пользователя (core.versioning). Журнал читается так же,
+как потребителями (core.changelog.read_changes): до недавнего пропуска
+позиций, поэтому изменения из транзакций, зафиксированных позже более новых,
+не теряются. Если состав групп изменился, видимость меняется целиком, и ответ
+содержит полный снимок с reset=true - клиент заменяет им локальные данные.
+Так же обрабатываются курсоры старше срока хранения журнала изменений.
+
+Ответ ограничен SYNC_PAGE_SIZE строками снимка или записями журнала; при
+has_more=true клиент сразу запрашивает следующую страницу с новым курсором.
+Страницы снимка после первой дополняют локальные данные, а не заменяют их.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.changelog import head_position, read_changes
+from core.fieldsets import optimize_queryset
+from core.models import ChangeLogEntry
+from core.versioning import get_versions
+from groups.models import GroupMembership
+from groups.serializers import GroupMembershipSerializer
+from .models import Assignment, AssignmentGroup, Submission
+from .serializers import AssignmentGroupSerializer, AssignmentSerializer, SubmissionSerializer
+
+ENTITIES = {
+    'assignments': (Assignment, AssignmentSerializer),
+    'assignment_groups': (AssignmentGroup, AssignmentGroupSerializer),
+    'submissions': (Submission, SubmissionSerializer),
+    'memberships': (GroupMembership, GroupMembershipSerializer),
+}
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class SyncScope:
+    """
+    Что пользователь видит в ленте.
+
+    in_scope - строки каждой сущности, изменения которых касаются
+    пользователя; visible - те из них, что он видит сейчас (остальные
+    изменённые отдаются как удалённые); deletions - условия на записи
+    журнала об удалении строк каждой сущности (None - не читать их: задания
+    студента считаются удалёнными, когда удалены их назначения его группам).
+    """
+
+    def __init__(self, owner, group_ids, in_scope, visible, deletions):
+        self.owner = owner
+        self.group_ids = group_ids
+        self.in_scope = in_scope
+        self.visible = visible
+        self.deletions = deletions
+
+
+def get_scope(access):
+    """Область видимости студента или преподавателя, None для остальных."""
+    if access.student_profile_id is not None:
+        return _student_scope(access.student_profile_id, access.student_group_ids)
+    if access.teacher_profile_id is not None:
+        return _teacher_scope(access.teacher_profile_id, access.teaching_group_ids)
+    return None
+
+
+def _student_scope(student_id, group_ids):
+    group_assignment_ids = AssignmentGroup.objects.filter(group_id__in=group_ids).values('assignment_id')
+    in_scope = {
+        'assignments': Assignment.objects.filter(pk__in=group_assignment_ids),
+        'assignment_groups': AssignmentGroup.objects.filter(group_id__in=group_ids),
+        'submissions': Submission.objects.filter(student_id=student_id),
+        'memberships': GroupMembership.objects.filter(student_id=student_id),
+    }
+    visible = {
+        'assignments': in_scope['assignments'].filter(status=Assignment.STATUS_PUBLISHED),
+        'assignment_groups': in_scope['assignment_groups'].filter(
+            assignment__status=Assignment.STATUS_PUBLISHED
+        ),
+        'submissions': in_scope['submissions'],
+        'memberships': in_scope['memberships'].filter(is_active=True),
+    }
+    deletions = {
+        'assignments': None,
+        'assignment_groups': Q(group_id__in=group_ids),
+        'submissions': Q(student_id=student_id),
+        'memberships': Q(student_id=student_id),
+    }
+    return SyncScope(('student', student_id), group_ids, in_scope, visible, deletions)
+
+
+def _teacher_scope(teacher_id, group_ids):
+    own_assignment_ids = Assignment.objects.filter(created_by_id=teacher_id).values('id')
+    assignments = Assignment.objects.filter(
+        Q(created_by_id=teacher_id)
+        | Q(pk__in=AssignmentGroup.objects.filter(group_id__in=group_ids).values('assignment_id'))
+    )
+    in_scope = {
+        'assignments': assignments,
+        'assignment_groups': AssignmentGroup.objects.filter(
+            Q(group_id__in=group_ids) | Q(assignment_id__in=own_assignment_ids)
+        ),
+        'submissions': Submission.objects.filter(assignment_id__in=assignments.values('id')),
+        'memberships': GroupMembership.objects.filter(group_id__in=group_ids),
+    }
+    visible = dict(in_scope, memberships=in_scope['memberships'].filter(is_active=True))
+    deletions = {
+        'assignments': Q(teacher_id=teacher_id),
+        'assignment_groups': Q(group_id__in=group_ids) | Q(assignment_id__in=own_assignment_ids),
+        'submissions': Q(assignment_id__in=assignments.values('id')),
+        'memberships': Q(group_id__in=group_ids),
+    }
+    return SyncScope(('teacher', teacher_id), group_ids, in_scope, visible, deletions)
+
+
+class SyncCursor:
+    """
+    Позиция клиента в ленте.
+
+    position - позиция журнала изменений, до которой клиент получил данные,
+    issued_at - время её чтения, version - версия состава групп. Курсор
+    продолжения полного снимка дополнительно содержит сущность entity и
+    идентификатор after_pk последней отданной строки.
+    """
+
+    def __init__(self, position, issued_at, version, entity=None, after_pk=0):
+        self.position = position
+        self.issued_at = issued_at
+        self.version = version
+        self.entity = entity
+        self.after_pk = after_pk
+
+    def __str__(self):
+        delta = self.issued_at - _EPOCH
+        microseconds = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+        parts = [self.position, microseconds, self.version]
+        if self.entity is not None:
+            parts += [self.entity, self.after_pk]
+        return '.'.join(str(part) for part in parts)
+
+
+def parse_cursor(cursor):
+    """Возвращает SyncCursor или None, если курсор повреждён."""
+    parts = cursor.split('.')
+    if len(parts) not in (3, 5) or (len(parts) == 5 and parts[3] not in ENTITIES):
+        return None
+    try:
+        return SyncCursor(
+            int(parts[0]), _EPOCH + timedelta(microseconds=int(parts[1])), parts[2],
+            *([parts[3], int(parts[4])] if len(parts) == 5 else []),
+        )
+    except (ValueError, OverflowError):
+        return None
+
+
+def get_changes(scope, cursor, context):
+    """Собирает страницу ленты изменений для области видимости scope."""
+    # Версия читается до запросов: изменение состава групп во время сборки
+    # сменит её, и следующий запрос получит полный снимок
+    version = get_versions([scope.owner])[scope.owner]
+    parsed = parse_cursor(cursor) if cursor else None
+    # Записи после позиции курсора могли быть созданы до его выдачи, но не
+    # раньше чем за CHANGE_LOG_GAP_TIMEOUT
+    oldest = timezone.now() - timedelta(
+        days=settings.CHANGE_LOG_RETENTION_DAYS, seconds=-settings.CHANGE_LOG_GAP_TIMEOUT
+    )
+    if parsed is not None and (parsed.version != version or parsed.issued_at < oldest):
+        parsed = None
+
+    if parsed is None:
+        parsed = SyncCursor(head_position(), timezone.now(), version, entity=next(iter(ENTITIES)))
+        reset = bool(cursor)
+    else:
+        reset = False
+    if parsed.entity is not None:
+        changes, next_cursor, has_more = _snapshot(scope, parsed, context)
+    else:
+        changes, next_cursor, has_more = _delta(scope, parsed, context)
+    return {
+        'cursor': str(next_cursor),
+        'reset': reset,
+        'has_more': has_more,
+        'changes': changes,
+    }
+
+
+def _serialize(name, queryset, context):
+    serializer_class = ENTITIES[name][1]
+    queryset = optimize_queryset(queryset.order_by('pk'), serializer_class(context=context))
+    if name == 'assignments':
+        queryset = queryset.annotate(_submission_count=Count('submissions'))
+    return queryset, serializer_class
+
+
+def _snapshot(scope, cursor, context):
+    """
+    Страница полного снимка: не больше SYNC_PAGE_SIZE видимых строк по
+    порядку сущностей и идентификаторов, начиная со строки курсора.
+
+    После последней страницы курсор указывает на позицию журнала, прочитанную
+    до начала снимка: изменения, сделанные во время его выдачи, придут в ленте.
+    """
+    names = list(ENTITIES)
+    remaining = settings.SYNC_PAGE_SIZE
+    changes = {name: {'updated': [], 'deleted': []} for name in names}
+    next_cursor = SyncCursor(cursor.position, cursor.issued_at, cursor.version)
+    after_pk = cursor.after_pk
+    for index in range(names.index(cursor.entity), len(names)):
+        name = names[index]
+        if remaining == 0:
+            next_cursor.entity, next_cursor.after_pk = name, 0
+            break
+        queryset, serializer_class = _serialize(name, scope.visible[name].filter(pk__gt=after_pk), context)
+        rows = list(queryset[:remaining + 1])
+        after_pk = 0
+        if len(rows) > remaining:
+            rows = rows[:remaining]
+            next_cursor.entity, next_cursor.after_pk = name, rows[-1].pk
+        changes[name]['updated'] = serializer_class(rows, many=True, context=context).data
+        remaining -= len(rows)
+        if next_cursor.entity is not None:
+            break
+    return changes, next_cursor, next_cursor.entity is not None
+
+
+def _delta(scope, cursor, context):
+    """
+    Изменения из следующих записей журнала после позиции курсора: не больше
+    SYNC_PAGE_SIZE записей и не дальше недавнего пропуска позиций.
+    """
+    batch = read_changes(
+        cursor.position, settings.SYNC_PAGE_SIZE, [model for model, _ in ENTITIES.values()]
+    )
+    next_cursor = SyncCursor(batch.position, timezone.now(), cursor.version)
+    changes = {name: {'updated': [], 'deleted': []} for name in ENTITIES}
+    # Полная страница записей - в журнале могут быть следующие
+    has_more = len(batch) == settings.SYNC_PAGE_SIZE
+    if not batch:
+        return changes, next_cursor, has_more
+
+    positions = Q(pk__gt=cursor.position, pk__lte=batch.position)
+    for name, (model, _) in ENTITIES.items():
+        changed = _changed(name, model, positions, scope.group_ids)
+        deleted = set()
+        if scope.visible[name] is not scope.in_scope[name]:
+            # Изменённые строки, которые пользователь больше не видит
+            deleted.update(
+                scope.in_scope[name].filter(changed).exclude(pk__in=scope.visible[name].values('pk'))
+                .values_list('pk', flat=True)
+            )
+        if scope.deletions[name] is not None:
+            deleted.update(
+                _deletions(model, positions, scope.deletions[name]).values_list('object_id', flat=True)
+            )
+        if name == 'assignments':
+            deleted.update(_unassigned_assignment_ids(positions, scope))
+        updated, serializer_class = _serialize(name, scope.visible[name].filter(changed), context)
+        changes[name] = {
+            'updated': serializer_class(updated, many=True, context=context).data,
+            'deleted': sorted(deleted),
+        }
+    return changes, next_cursor, has_more
+
+
+def _logged(model, positions):
+    return ChangeLogEntry.objects.filter(positions, model=model.change_log_code)
+
+
+def _changed(name, model, positions, group_ids):
+    """Условие на строки сущности name, изменённые записями журнала в positions."""
+    changed = Q(pk__in=_logged(model, positions).values('object_id'))
+    if name in ('assignments', 'submissions'):
+        # Задание, назначенное группе пользователя, становится видимым вместе
+        # с ответами, хотя сами строки не менялись
+        assigned = _logged(AssignmentGroup, positions).filter(group_id__in=group_ids).values('assignment_id')
+        changed |= Q(pk__in=assigned) if name == 'assignments' else Q(assignment_id__in=assigned)
+    return changed
+
+
+def _deletions(model, positions, condition):
+    return _logged(model, positions).filter(condition, action=ChangeLogEntry.DELETE)
+
+
+def _unassigned_assignment_ids(positions, scope):
+    """Задания, снятые с групп пользователя и больше ему не видимые."""
+    unassigned = set(
+        _deletions(AssignmentGroup, positions, scope.deletions['assignment_groups'])
+        .values_list('assignment_id', flat=True)
+    )
+    if not unassigned:
+        return set()
+    still_visible = scope.visible['assignments'].filter(pk__in=unassigned).values_list('pk', flat=True)
+    return unassigned.difference(still_visible)
@@ -3,7 +3,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     AssignmentViewSet, AssignmentAttachmentViewSet,
     AssignmentGroupViewSet, SubmissionViewSet,
-    SubmissionAttachmentViewSet
+    SubmissionAttachmentViewSet, CalendarFeedView, DashboardView, SyncView
 )
 
 
@@ -22,5 +22,8 @@ router.register(r'submissions', SubmissionViewSet, basename='submission')
 router.register(r'submission-attachments', SubmissionAttachmentViewSet, basename='submission-attachment')
 
 urlpatterns = [
+    path('calendar/<str:token>.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+    path('dashboard', DashboardView.as_view(), name='dashboard'),
+    path('sync', SyncView.as_view(), name='sync'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
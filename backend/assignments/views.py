@@ -1,8 +1,13 @@
-from rest_framework import viewsets, permissions, filters, status
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
 from rest_framework.response import Response
-from django.db.models import Q, Prefetch
+from rest_framework.views import APIView
+from django.db.models import Count, Prefetch, Q
+from django.http import Http404
+from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 
 from .models import (
     Assignment, AssignmentAttachment, AssignmentGroup, 
@@ -12,10 +17,16 @@ from .serializers import (
     AssignmentSerializer, AssignmentMinSerializer, 
     AssignmentAttachmentSerializer, AssignmentGroupSerializer,
     SubmissionSerializer, SubmissionAttachmentSerializer,
-    SubmissionGradeSerializer
+    SubmissionGradeSerializer, DeadlineTimelineSerializer
 )
-from groups.models import GroupMembership, GroupTeacher
-from authentication.models import CustomUser
+from . import calendar, dashboard, sync
+from core.access import get_access_context
+from core.fieldsets import SparseFieldsetViewMixin, optimize_queryset
+from core.search import FullTextSearchFilter, RankedOrderingFilter
+from core.serializers import compile_values
+
+TIMELINE_DEFAULT_LIMIT = 10
+TIMELINE_MAX_LIMIT = 100
 
 
 class IsTeacherOrReadOnly(permissions.BasePermission):
@@ -29,14 +40,15 @@ class IsTeacherOrReadOnly(permissions.BasePermission):
             return True
             
         # Разрешить действия только для учителей
-        return hasattr(request.user, 'teacher_profile')
+        return get_access_context(request).teacher_profile is not None
 
 
-class AssignmentViewSet(viewsets.ModelViewSet):
+class AssignmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """API для работы с заданиями."""
     serializer_class = AssignmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [FullTextSearchFilter, RankedOrderingFilter]
+    search_index = 'assignment'
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'deadline', 'title']
     ordering = ['-created_at']
@@ -47,93 +59,70 @@ class AssignmentViewSet(viewsets.ModelViewSet):
         Преподаватели видят свои созданные задания и задания назначенных им групп.
         Студенты видят только задания, назначенные их группам.
         """
-        user = self.request.user
+        access = get_access_context(self.request)
         
-        if hasattr(user, 'teacher_profile'):
-            # Для преподавателей
-            teacher = user.teacher_profile
-            
-            # Получаем все группы, где учитель преподает
-            teaching_groups = GroupTeacher.objects.filter(
-                teacher=teacher, 
-                is_active=True
-            ).values_list('group_id', flat=True)
-            
+        if access.teacher_profile:
             # Задания, созданные учителем + задания, назначенные группам учителя
-            return Assignment.objects.filter(
-                Q(created_by=teacher) | 
-                Q(assignment_groups__group_id__in=teaching_groups)
+            queryset = Assignment.objects.filter(
+                Q(created_by_id=access.teacher_profile_id) | 
+                Q(assignment_groups__group_id__in=access.teaching_group_ids)
             ).distinct()
             
-        elif hasattr(user, 'student_profile'):
-            # Для студентов
-            student = user.student_profile
-            
-            # Получаем все активные группы студента
-            student_groups = GroupMembership.objects.filter(
-                student=student, 
-                is_active=True
-            ).values_list('group_id', flat=True)
-            
+        elif access.student_profile:
             # Только задания, назначенные группам студента
-            return Assignment.objects.filter(
-                assignment_groups__group_id__in=student_groups,
+            queryset = Assignment.objects.filter(
+                assignment_groups__group_id__in=access.student_group_ids,
                 status=Assignment.STATUS_PUBLISHED
             ).distinct()
             
-        return Assignment.objects.none()
+        else:
+            return Assignment.objects.none()
+        
+        if 'submission_count' in self.get_response_fields():
+            # distinct: соединение с назначениями не должно умножать ответы
+            queryset = queryset.annotate(_submission_count=Count('submissions', distinct=True))
+        return self.optimize_queryset(queryset)
     
     def perform_create(self, serializer):
         """Сохранение задания с текущим преподавателем."""
-        serializer.save(created_by=self.request.user.teacher_profile)
+        serializer.save(created_by=get_access_context(self.request).teacher_profile)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], serializer_class=AssignmentGroupSerializer)
     def groups(self, request, pk=None):
         """Получение групп, которым назначено задание."""
         assignment = self.get_object()
-        assignment_groups = AssignmentGroup.objects.filter(assignment=assignment)
-        serializer = AssignmentGroupSerializer(assignment_groups, many=True)
+        shape = self.get_field_shape()
+        assignment_groups = optimize_queryset(
+            AssignmentGroup.objects.filter(assignment=assignment),
+            AssignmentGroupSerializer(field_shape=shape)
+        )
+        serializer = AssignmentGroupSerializer(assignment_groups, many=True, field_shape=shape)
         return Response(serializer.data)
     
-    @action(detail=True, methods=['get'])
+    @action(detail=True, methods=['get'], serializer_class=SubmissionSerializer)
     def submissions(self, request, pk=None):
         """Получение всех ответов на задание."""
-        user = request.user
+        access = get_access_context(request)
         assignment = self.get_object()
         
-        # Проверка прав доступа (только преподаватель, создавший задание, или преподаватель группы)
-        if hasattr(user, 'teacher_profile'):
-            teacher = user.teacher_profile
-            teacher_groups = GroupTeacher.objects.filter(
-                teacher=teacher, 
-                is_active=True
-            ).values_list('group_id', flat=True)
-            
-            is_assignment_creator = assignment.created_by == teacher
-            is_group_teacher = AssignmentGroup.objects.filter(
-                assignment=assignment,
-                group_id__in=teacher_groups
-            ).exists()
-            
-            if not (is_assignment_creator or is_group_teacher):
-                return Response(
-                    {"detail": "У вас нет прав для просмотра ответов на это задание."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-                
-            submissions = Submission.objects.filter(assignment=assignment)
-            serializer = SubmissionSerializer(submissions, many=True)
+        # Преподавателю get_queryset() отдаёт только созданные им задания и задания
+        # его групп, поэтому отдельная проверка прав для объекта не нужна
+        shape = self.get_field_shape()
+        submissions = optimize_queryset(
+            Submission.objects.filter(assignment=assignment),
+            SubmissionSerializer(field_shape=shape)
+        )
+        if access.teacher_profile:
+            serializer = SubmissionSerializer(submissions, many=True, field_shape=shape)
             return Response(serializer.data)
         
         # Для студента показываем только его ответ
-        elif hasattr(user, 'student_profile'):
-            student = user.student_profile
+        elif access.student_profile:
             try:
-                submission = Submission.objects.get(
-                    assignment=assignment,
-                    student=student
+                submission = submissions.get(
+                    student_id=access.student_profile_id
                 )
-                serializer = SubmissionSerializer(submission)
+                serializer = SubmissionSerializer(submission, field_shape=shape)
                 return Response(serializer.data)
             except Submission.DoesNotExist:
                 return Response(
@@ -146,8 +135,93 @@ class AssignmentViewSet(viewsets.ModelViewSet):
             status=status.HTTP_403_FORBIDDEN
         )
 
+    @action(detail=False, methods=['get'], url_path='calendar-feed')
+    def calendar_feed(self, request):
+        """
+        Ссылка на календарь дедлайнов (.ics) для подписки в календарном приложении.
+
+        Ссылка действует без JWT и перестаёт работать при смене пароля.
+        """
+        access = get_access_context(request)
+        if not (access.teacher_profile or access.student_profile):
+            return Response(
+                {"detail": "Доступ запрещен."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        
+        token = calendar.make_feed_token(request.user.pk)
+        return Response({
+            'url': request.build_absolute_uri(reverse('calendar-feed', args=[token])),
+        })
+
+
+class CalendarFeedView(APIView):
+    """
+    Календарь дедлайнов пользователя в формате iCalendar.
+
+    Доступ по подписанному токену из ссылки, ответ отдаётся из кеша, пока
+    не изменятся задания или группы пользователя; клиенты с If-None-Match
+    получают 304.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [calendar.ICalendarRenderer]
+
+    def get(self, request, token):
+        user_id = calendar.read_feed_token(token)
+        feed = calendar.get_feed(user_id) if user_id is not None else None
+        if feed is None:
+            raise Http404
+        
+        headers = {'ETag': feed['etag'], 'Cache-Control': 'private, no-cache'}
+        not_modified = get_conditional_response(request._request, etag=feed['etag'])
+        if not_modified is not None:
+            for header, value in headers.items():
+                not_modified[header] = value
+            return not_modified
+        return Response(feed['body'], headers=headers)
+
+
+class DashboardView(APIView):
+    """
+    Сводка главного экрана студента или преподавателя.
+
+    Строится фиксированным числом запросов и отдаётся из кеша, пока не
+    изменятся группы, задания или ответы, из которых она собрана.
+    """
+
+    def get(self, request):
+        access = get_access_context(request)
+        if access.student_profile_id is not None:
+            data = dashboard.get_dashboard('student', access.student_profile_id)
+        elif access.teacher_profile_id is not None:
+            data = dashboard.get_dashboard('teacher', access.teacher_profile_id)
+        else:
+            raise PermissionDenied("Сводка доступна только студентам и преподавателям.")
+        return Response(data)
+
 
-class AssignmentAttachmentViewSet(viewsets.ModelViewSet):
+class SyncView(APIView):
+    """
+    Лента изменений для синхронизации клиента (см. assignments.sync).
+
+    Параметр ?cursor= - курсор из предыдущего ответа; без него возвращается
+    первая страница снимка всех видимых пользователю строк.
+    """
+
+    def get(self, request):
+        scope = sync.get_scope(get_access_context(request))
+        if scope is None:
+            raise PermissionDenied("Синхронизация доступна только студентам и преподавателям.")
+        return Response(sync.get_changes(
+            scope, request.query_params.get('cursor'), self.get_serializer_context()
+        ))
+
+    def get_serializer_context(self):
+        return {'request': self.request, 'view': self}
+
+
+class AssignmentAttachmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """API для работы с вложениями заданий."""
     serializer_class = AssignmentAttachmentSerializer
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrReadOnly]
@@ -159,28 +233,20 @@ class AssignmentAttachmentViewSet(viewsets.ModelViewSet):
         """Привязка вложения к заданию."""
         assignment_id = self.request.data.get('assignment_id')
         if not assignment_id:
-            return Response(
-                {"detail": "Необходимо указать ID задания."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            raise ValidationError({"assignment_id": "Необходимо указать ID задания."})
             
         try:
             assignment = Assignment.objects.get(id=assignment_id)
-            # Проверка прав доступа
-            if assignment.created_by != self.request.user.teacher_profile:
-                return Response(
-                    {"detail": "Вы можете добавлять вложения только к своим заданиям."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            serializer.save(assignment=assignment)
-        except Assignment.DoesNotExist:
-            return Response(
-                {"detail": "Задание не найдено."},
-                status=status.HTTP_404_NOT_FOUND
-            )
+        except (Assignment.DoesNotExist, ValueError):
+            raise NotFound("Задание не найдено.")
+
+        # Проверка прав доступа
+        if assignment.created_by_id != get_access_context(self.request).teacher_profile_id:
+            raise PermissionDenied("Вы можете добавлять вложения только к своим заданиям.")
+        serializer.save(assignment=assignment)
 
 
-class AssignmentGroupViewSet(viewsets.ModelViewSet):
+class AssignmentGroupViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """API для работы с назначением заданий группам."""
     serializer_class = AssignmentGroupSerializer
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrReadOnly]
@@ -191,7 +257,7 @@ class AssignmentGroupViewSet(viewsets.ModelViewSet):
         - assignment_id: фильтр по ID задания
         - group_id: фильтр по ID группы
         """
-        queryset = AssignmentGroup.objects.all()
+        queryset = self.optimize_queryset(AssignmentGroup.objects.all())
         
         assignment_id = self.request.query_params.get('assignment_id')
         if assignment_id:
@@ -205,43 +271,58 @@ class AssignmentGroupViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Проверка прав доступа перед созданием."""
-        user = self.request.user
-        if not hasattr(user, 'teacher_profile'):
-            return Response(
-                {"detail": "Только преподаватели могут назначать задания группам."},
-                status=status.HTTP_403_FORBIDDEN
-            )
-            
-        assignment_id = serializer.validated_data.get('assignment_id').id
-        group_id = serializer.validated_data.get('group_id').id
+        access = get_access_context(self.request)
+        if not access.teacher_profile:
+            raise PermissionDenied("Только преподаватели могут назначать задания группам.")
         
-        try:
-            assignment = Assignment.objects.get(id=assignment_id)
-            
-            # Проверка, является ли пользователь создателем задания или преподавателем группы
-            is_assignment_creator = assignment.created_by == user.teacher_profile
-            is_group_teacher = GroupTeacher.objects.filter(
-                teacher=user.teacher_profile,
-                group_id=group_id,
-                is_active=True
-            ).exists()
-            
-            if not (is_assignment_creator or is_group_teacher):
-                return Response(
-                    {"detail": "У вас нет прав для назначения этого задания данной группе."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-                
-            serializer.save()
+        # Задание и группа уже загружены полями сериализатора
+        assignment = serializer.validated_data.get('assignment_id')
+        group = serializer.validated_data.get('group_id')
+        
+        # Проверка, является ли пользователь создателем задания или преподавателем группы
+        is_assignment_creator = assignment.created_by_id == access.teacher_profile_id
+        is_group_teacher = access.teaches_group(group.id)
+        
+        if not (is_assignment_creator or is_group_teacher):
+            raise PermissionDenied("У вас нет прав для назначения этого задания данной группе.")
             
-        except Assignment.DoesNotExist:
-            return Response(
-                {"detail": "Задание не найдено."},
-                status=status.HTTP_404_NOT_FOUND
+        serializer.save()
+
+    @action(detail=False, methods=['get'], serializer_class=DeadlineTimelineSerializer)
+    def timeline(self, request):
+        """
+        Ближайшие дедлайны пользователя по всем его группам.
+
+        Параметр ?limit= (по умолчанию 10, не больше 100). Дедлайны выбираются
+        одним проходом по индексу (effective_deadline, group) от текущего момента.
+        """
+        access = get_access_context(request)
+        try:
+            limit = min(int(request.query_params.get('limit', TIMELINE_DEFAULT_LIMIT)), TIMELINE_MAX_LIMIT)
+        except ValueError:
+            limit = TIMELINE_DEFAULT_LIMIT
+        limit = max(limit, 1)
+        
+        queryset = AssignmentGroup.objects.filter(effective_deadline__gte=timezone.now())
+        if access.teacher_profile:
+            queryset = queryset.filter(group_id__in=access.teaching_group_ids).exclude(
+                assignment__status=Assignment.STATUS_ARCHIVED
             )
+        elif access.student_profile:
+            queryset = queryset.filter(
+                group_id__in=access.student_group_ids,
+                assignment__status=Assignment.STATUS_PUBLISHED
+            )
+        else:
+            queryset = queryset.none()
+        
+        # Строки values() сериализуются без создания экземпляров моделей
+        paths, represent = compile_values(self.get_serializer())
+        rows = queryset.order_by('effective_deadline', 'id').values(*paths)[:limit]
+        return Response([represent(row) for row in rows])
 
 
-class SubmissionViewSet(viewsets.ModelViewSet):
+class SubmissionViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """API для работы с ответами на задания."""
     serializer_class = SubmissionSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -250,38 +331,34 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         """
         Получение списка ответов в зависимости от роли пользователя.
         """
-        user = self.request.user
+        access = get_access_context(self.request)
         
-        if hasattr(user, 'teacher_profile'):
+        if access.teacher_profile:
             # Для преподавателей - ответы на их задания и задания их групп
-            teacher = user.teacher_profile
-            
-            # Получаем все группы, где учитель преподает
-            teaching_groups = GroupTeacher.objects.filter(
-                teacher=teacher, 
-                is_active=True
-            ).values_list('group_id', flat=True)
-            
-            return Submission.objects.filter(
-                Q(assignment__created_by=teacher) | 
-                Q(assignment__assignment_groups__group_id__in=teaching_groups)
+            queryset = Submission.objects.filter(
+                Q(assignment__created_by_id=access.teacher_profile_id) | 
+                Q(assignment__assignment_groups__group_id__in=access.teaching_group_ids)
             ).distinct()
             
-        elif hasattr(user, 'student_profile'):
+        elif access.student_profile:
             # Для студентов - только их собственные ответы
-            return Submission.objects.filter(student=user.student_profile)
+            queryset = Submission.objects.filter(student_id=access.student_profile_id)
             
-        return Submission.objects.none()
+        else:
+            return Submission.objects.none()
+        
+        return self.optimize_queryset(queryset)
     
     def create(self, request, *args, **kwargs):
         """Создание нового ответа на задание."""
-        if not hasattr(request.user, 'student_profile'):
+        access = get_access_context(request)
+        if not access.student_profile:
             return Response(
                 {"detail": "Только студенты могут отправлять ответы на задания."},
                 status=status.HTTP_403_FORBIDDEN
             )
             
-        student = request.user.student_profile
+        student = access.student_profile
         assignment_id = request.data.get('assignment_id')
         
         if not assignment_id:
@@ -299,10 +376,9 @@ class SubmissionViewSet(viewsets.ModelViewSet):
             )
         
         # Проверка, доступно ли задание для студента
-        student_groups = student.get_active_groups()
         if not AssignmentGroup.objects.filter(
             assignment=assignment, 
-            group__in=student_groups
+            group_id__in=access.student_group_ids
         ).exists():
             return Response(
                 {"detail": "У вас нет доступа к этому заданию."},
@@ -323,7 +399,7 @@ class SubmissionViewSet(viewsets.ModelViewSet):
             assignment=assignment,
             student=student,
             comment=comment,
-            is_late=assignment.is_deadline_expired()
+            is_late=assignment.is_deadline_expired
         )
         
         return Response(
@@ -348,7 +424,7 @@ class SubmissionViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class SubmissionAttachmentViewSet(viewsets.ModelViewSet):
+class SubmissionAttachmentViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """API для работы с вложениями ответов на задания."""
     serializer_class = SubmissionAttachmentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -360,26 +436,16 @@ class SubmissionAttachmentViewSet(viewsets.ModelViewSet):
         """Привязка вложения к ответу."""
         submission_id = self.request.data.get('submission_id')
         if not submission_id:
-            return Response(
-                {"detail": "Необходимо указать ID ответа."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            raise ValidationError({"submission_id": "Необходимо указать ID ответа."})
             
         try:
             submission = Submission.objects.get(id=submission_id)
+        except (Submission.DoesNotExist, ValueError):
+            raise NotFound("Ответ не найден.")
             
-            # Проверка прав доступа
-            user = self.request.user
-            if hasattr(user, 'student_profile') and submission.student != user.student_profile:
-                return Response(
-                    {"detail": "Вы можете добавлять вложения только к своим ответам."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-                
-            serializer.save(submission=submission)
+        # Проверка прав доступа
+        access = get_access_context(self.request)
+        if access.student_profile and submission.student_id != access.student_profile_id:
+            raise PermissionDenied("Вы можете добавлять вложения только к своим ответам.")
             
-        except Submission.DoesNotExist:
-            return Response(
-                {"detail": "Ответ не найден."},
-                status=status.HTTP_404_NOT_FOUND
-            ) 
\ No newline at end of file
+        serializer.save(submission=submission)
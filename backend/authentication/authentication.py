@@ -0,0 +1,174 @@
+"""
+JWT-аутентификация без обращения к базе данных.
+
+Токены, выданные CustomTokenObtainPairSerializer, содержат роль пользователя и
+идентификаторы его профилей. ClaimsJWTAuthentication восстанавливает из них
+ClaimsUser, не загружая CustomUser из БД. Отозванные токены (смена пароля или
+роли, деактивация, удаление пользователя) отсекаются по метке
+tokens_valid_after, которая кешируется на JWT_REVOCATION_CACHE_TTL секунд.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import CustomUser, StudentProfile, TeacherProfile
+
+ROLE_CLAIM = 'role'
+STUDENT_PROFILE_CLAIM = 'student_profile_id'
+TEACHER_PROFILE_CLAIM = 'teacher_profile_id'
+
+# Значение в кеше для пользователей, все токены которых недействительны
+_ALL_TOKENS_REVOKED = float('inf')
+
+
+def _revocation_cache_key(user_id):
+    return f'auth:tokens_valid_after:{user_id}'
+
+
+def add_user_claims(token, user):
+    """Добавляет в токен роль пользователя и идентификаторы его профилей."""
+    token['username'] = user.username
+    token[ROLE_CLAIM] = user.role
+    token['is_staff'] = user.is_staff
+    token['is_superuser'] = user.is_superuser
+    profile = user.get_profile()
+    token[STUDENT_PROFILE_CLAIM] = profile.id if user.is_student() and profile else None
+    token[TEACHER_PROFILE_CLAIM] = profile.id if user.is_teacher() and profile else None
+    return token
+
+
+def revoke_user_tokens(user):
+    """
+    Делает недействительными все токены пользователя, выданные до текущего момента.
+
+    Метка сохраняется в БД, а кеш текущего процесса обновляется сразу; остальные
+    процессы увидят отзыв не позднее чем через JWT_REVOCATION_CACHE_TTL секунд.
+    """
+    from django.utils import timezone
+
+    # iat в токенах хранится с точностью до секунды
+    valid_after = timezone.now().replace(microsecond=0)
+    CustomUser.objects.filter(pk=user.pk).update(tokens_valid_after=valid_after)
+    user.tokens_valid_after = valid_after
+    cache.set(
+        _revocation_cache_key(user.pk),
+        valid_after.timestamp() if user.is_active else _ALL_TOKENS_REVOKED,
+        settings.JWT_REVOCATION_CACHE_TTL,
+    )
+
+
+def forget_user_tokens(user_id):
+    """Помечает все токены удалённого пользователя как отозванные."""
+    cache.set(_revocation_cache_key(user_id), _ALL_TOKENS_REVOKED, settings.JWT_REVOCATION_CACHE_TTL)
+
+
+def tokens_valid_after(user_id):
+    """
+    Возвращает unix-время, раньше которого выданные токены пользователя недействительны.
+
+    При промахе кеша выполняется один запрос к БД.
+    """
+    key = _revocation_cache_key(user_id)
+    value = cache.get(key)
+    if value is None:
+        row = CustomUser.objects.filter(pk=user_id).values_list('is_active', 'tokens_valid_after').first()
+        if row is None or not row[0]:
+            value = _ALL_TOKENS_REVOKED
+        else:
+            value = row[1].timestamp() if row[1] else 0
+        cache.set(key, value, settings.JWT_REVOCATION_CACHE_TTL)
+    return value
+
+
+def profile_reference(model, profile_id, user_id):
+    """
+    Возвращает экземпляр профиля, у которого загружены только id и user_id.
+
+    Для фильтрации и присваивания внешних ключей этого достаточно, а остальные
+    поля загружаются из БД одним запросом при первом обращении
+    (см. BaseProfile.refresh_from_db).
+    """
+    return model.from_db('default', ['id', 'user_id'], [profile_id, user_id])
+
+
+class ClaimsUser(TokenUser):
+    """
+    Пользователь, восстановленный из claims JWT.
+
+    Повторяет интерфейс CustomUser, который используют представления и
+    разрешения: role, is_student(), is_teacher(), student_profile и
+    teacher_profile. Атрибута профиля нет, если у пользователя нет
+    соответствующего профиля, поэтому проверки hasattr() работают так же,
+    как для CustomUser, но без запросов к БД.
+    """
+    ROLE_STUDENT = CustomUser.ROLE_STUDENT
+    ROLE_TEACHER = CustomUser.ROLE_TEACHER
+
+    _profile_attributes = {
+        'student_profile': (STUDENT_PROFILE_CLAIM, StudentProfile),
+        'teacher_profile': (TEACHER_PROFILE_CLAIM, TeacherProfile),
+    }
+
+    @cached_property
+    def role(self):
+        return self.token.get(ROLE_CLAIM)
+
+    @cached_property
+    def student_profile_id(self):
+        return self.token.get(STUDENT_PROFILE_CLAIM)
+
+    @cached_property
+    def teacher_profile_id(self):
+        return self.token.get(TEACHER_PROFILE_CLAIM)
+
+    def is_student(self):
+        return self.role == self.ROLE_STUDENT
+
+    def is_teacher(self):
+        return self.role == self.ROLE_TEACHER
+
+    def get_profile(self):
+        if self.is_student():
+            return getattr(self, 'student_profile', None)
+        elif self.is_teacher():
+            return getattr(self, 'teacher_profile', None)
+        return None
+
+    def __getattr__(self, attr):
+        if attr in self._profile_attributes:
+            claim, model = self._profile_attributes[attr]
+            profile_id = self.token.get(claim)
+            if not profile_id:
+                raise AttributeError(attr)
+            profile = profile_reference(model, profile_id, self.id)
+            self.__dict__[attr] = profile
+            return profile
+        return super().__getattr__(attr)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация, строящая пользователя из claims токена без запроса к БД.
+
+    Токены без claim роли (выданные до появления ClaimsUser) обрабатываются
+    стандартным способом с загрузкой пользователя из БД.
+    """
+
+    def get_user(self, validated_token):
+        if ROLE_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if validated_token.get('iat', 0) < tokens_valid_after(user_id):
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+
+        return ClaimsUser(validated_token)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0002_alter_customuser_email_teacherprofile_studentprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='tokens_valid_after',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Токены действительны после'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:31
+
+from django.db import migrations, models
+
+# Столбцы, по префиксу которых ищут студентов (StudentViewSet.typeahead)
+PREFIX_COLUMNS = ['username', 'first_name', 'last_name', 'email']
+
+
+def prefix_index_sql(vendor, column):
+    """
+    Индекс для поиска по префиксу без учёта регистра (lookup istartswith).
+
+    PostgreSQL сравнивает UPPER(столбец) через LIKE, для которого нужен
+    класс операторов text_pattern_ops; SQLite использует индекс для LIKE,
+    только если он построен с сопоставлением NOCASE.
+    """
+    name = f'user_{column}_prefix_idx'
+    if vendor == 'postgresql':
+        return (
+            f'CREATE INDEX IF NOT EXISTS {name} ON authentication_customuser '
+            f'(UPPER("{column}"::text) text_pattern_ops)'
+        )
+    if vendor == 'sqlite':
+        return f'CREATE INDEX IF NOT EXISTS {name} ON authentication_customuser ("{column}" COLLATE NOCASE)'
+    return None
+
+
+def create_prefix_indexes(apps, schema_editor):
+    for column in PREFIX_COLUMNS:
+        sql = prefix_index_sql(schema_editor.connection.vendor, column)
+        if sql:
+            schema_editor.execute(sql)
+
+
+def drop_prefix_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for column in PREFIX_COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS user_{column}_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_customuser_tokens_valid_after'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='user_name_order_idx'),
+        ),
+        migrations.RunPython(create_prefix_indexes, drop_prefix_indexes),
+    ]
@@ -1,7 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
 
@@ -25,9 +25,36 @@ class CustomUser(AbstractUser):
     
     email = models.EmailField(_('email address'), unique=True)
     
+    tokens_valid_after = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Токены действительны после')
+    )
+    
+    # Поля, изменение которых отзывает выданные пользователю JWT
+    TOKEN_CLAIM_FIELDS = ('password', 'role', 'is_active', 'is_staff', 'is_superuser')
+    
     class Meta:
         verbose_name = _('Пользователь')
         verbose_name_plural = _('Пользователи')
+        indexes = [
+            # Сортировка и постраничный вывод по ключу в поиске студентов
+            models.Index(fields=['last_name', 'first_name', 'id'], name='user_name_order_idx'),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_token_claims = instance.get_token_claims()
+        return instance
+    
+    def get_token_claims(self):
+        """Возвращает значения полей, от которых зависят выданные токены."""
+        deferred = self.get_deferred_fields()
+        return {
+            field: getattr(self, field)
+            for field in self.TOKEN_CLAIM_FIELDS if field not in deferred
+        }
         
     def is_student(self):
         return self.role == self.ROLE_STUDENT
@@ -53,6 +80,14 @@ class BaseProfile(models.Model):
     
     class Meta:
         abstract = True
+    
+    def refresh_from_db(self, using=None, fields=None):
+        # Профиль из claims JWT содержит только id и user_id: при первом
+        # обращении к другому полю загружаем все отложенные поля одним запросом
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields)
 
 
 class StudentProfile(BaseProfile):
@@ -73,6 +108,14 @@ class StudentProfile(BaseProfile):
     
     def __str__(self):
         return f"{self.user.username} - {self.user.get_full_name() or self.user.email}"
+    
+    def get_active_groups(self):
+        """Возвращает группы, в которых студент состоит в данный момент."""
+        from groups.models import Group
+        return Group.objects.filter(
+            memberships__student=self,
+            memberships__is_active=True
+        )
 
 
 class TeacherProfile(BaseProfile):
@@ -111,4 +154,26 @@ def save_user_profile(sender, instance, **kwargs):
     if instance.is_student() and hasattr(instance, 'student_profile'):
         instance.student_profile.save()
     elif instance.is_teacher() and hasattr(instance, 'teacher_profile'):
-        instance.teacher_profile.save() 
\ No newline at end of file
+        instance.teacher_profile.save()
+
+
+@receiver(post_save, sender=CustomUser)
+def revoke_changed_user_tokens(sender, instance, created, **kwargs):
+    """Отзывает токены пользователя при смене пароля, роли или прав доступа."""
+    from .authentication import revoke_user_tokens
+    
+    claims = instance.get_token_claims()
+    loaded = getattr(instance, '_loaded_token_claims', None)
+    instance._loaded_token_claims = claims
+    if created or loaded is None:
+        return
+    if any(loaded[field] != value for field, value in claims.items() if field in loaded):
+        revoke_user_tokens(instance)
+
+
+@receiver(post_delete, sender=CustomUser)
+def revoke_deleted_user_tokens(sender, instance, **kwargs):
+    """Отзывает токены удалённого пользователя."""
+    from .authentication import forget_user_tokens
+    
+    forget_user_tokens(instance.pk)
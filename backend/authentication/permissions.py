@@ -1,3 +1,4 @@
+from django.contrib.auth import get_user_model
 from rest_framework import permissions
 
 
@@ -39,4 +40,7 @@ class IsOwnerOrTeacher(permissions.BasePermission):
             return True
             
         # Проверяем, является ли пользователь владельцем объекта
-        return obj == request.user or hasattr(obj, 'user') and obj.user == request.user 
\ No newline at end of file
+        # Сравниваем по pk: request.user может быть построен из claims JWT
+        if isinstance(obj, get_user_model()):
+            return obj.pk == request.user.pk
+        return hasattr(obj, 'user_id') and obj.user_id == request.user.pk 
\ No newline at end of file
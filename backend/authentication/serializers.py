@@ -1,33 +1,78 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from django.core.validators import EmailValidator, MinLengthValidator
 import re
 
+from core.fieldsets import SparseFieldsetMixin
+from core.serializers import CompiledListSerializer
+from .authentication import add_user_claims, tokens_valid_after
 from .models import StudentProfile, TeacherProfile
 
 User = get_user_model()
 
 
-class BasicUserSerializer(serializers.ModelSerializer):
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Выдаёт токены с ролью пользователя и идентификаторами его профилей.
+    
+    Кроме токенов возвращает базовую информацию о пользователе, полученном
+    при проверке пароля, без повторного запроса к БД.
+    """
+    
+    @classmethod
+    def get_token(cls, user):
+        return add_user_claims(super().get_token(user), user)
+    
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        data.update({
+            'user_id': self.user.id,
+            'username': self.user.username,
+            'email': self.user.email,
+            'role': self.user.role,
+            'first_name': self.user.first_name,
+            'last_name': self.user.last_name,
+        })
+        return data
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """Обновляет access-токен, если refresh-токен не был отозван."""
+    
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or refresh.get('iat', 0) < tokens_valid_after(user_id):
+            raise InvalidToken(_('Токен был отозван.'))
+        return super().validate(attrs)
+
+
+class BasicUserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Базовый сериализатор для пользователя с основной информацией."""
     class Meta:
         model = User
+        list_serializer_class = CompiledListSerializer
         fields = ['id', 'username', 'first_name', 'last_name', 'email']
 
 
-class StudentProfileSerializer(serializers.ModelSerializer):
+class StudentProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для профиля студента."""
     user = BasicUserSerializer(read_only=True)
     
     class Meta:
         model = StudentProfile
+        list_serializer_class = CompiledListSerializer
         fields = ['id', 'user', 'student_id', 'major', 'year_of_study', 'bio', 'avatar']
 
 
-class TeacherProfileSerializer(serializers.ModelSerializer):
+class TeacherProfileSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = TeacherProfile
+        list_serializer_class = CompiledListSerializer
         fields = ['position', 'department', 'academic_degree', 'bio', 'avatar']
 
 
@@ -120,7 +165,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserProfileDetailSerializer(serializers.ModelSerializer):
+class UserProfileDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для детального отображения профиля пользователя."""
     student_profile = StudentProfileSerializer(read_only=True)
     teacher_profile = TeacherProfileSerializer(read_only=True)
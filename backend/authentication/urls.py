@@ -1,9 +1,9 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from rest_framework_simplejwt.views import TokenRefreshView
 
 from .views import (
     CustomTokenObtainPairView,
+    CustomTokenRefreshView,
     UserRegistrationView,
     UserProfileView,
     UserViewSet,
@@ -18,7 +18,7 @@ router.register('students', StudentViewSet, basename='students')
 urlpatterns = [
     # JWT аутентификация
     path('token/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/refresh/', CustomTokenRefreshView.as_view(), name='token_refresh'),
     
     # Регистрация и профиль пользователя
     path('register/', UserRegistrationView.as_view(), name='register'),
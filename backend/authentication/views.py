@@ -1,12 +1,22 @@
-from rest_framework import generics, permissions, status, viewsets, filters
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from rest_framework import generics, permissions, status, viewsets
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from rest_framework_simplejwt.views import TokenObtainPairView
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
+from core.aggregates import GroupConcat
+from core.fieldsets import SparseFieldsetViewMixin
+from core.search import FullTextSearchFilter
 from .models import StudentProfile, TeacherProfile
 
 from .serializers import (
+    CustomTokenObtainPairSerializer,
+    CustomTokenRefreshSerializer,
     UserRegistrationSerializer, 
     UserProfileDetailSerializer,
     UserProfileUpdateSerializer,
@@ -17,31 +27,20 @@ from .permissions import IsOwnerOrTeacher, IsTeacher, IsStudent
 
 User = get_user_model()
 
+# Ограничения поиска студентов для автодополнения
+TYPEAHEAD_DEFAULT_LIMIT = 10
+TYPEAHEAD_MAX_LIMIT = 25
+TYPEAHEAD_MAX_TERMS = 4
+
 
 class CustomTokenObtainPairView(TokenObtainPairView):
     """Кастомное представление для получения JWT токенов с дополнительной информацией о пользователе."""
-    
-    def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        
-        if response.status_code == status.HTTP_200_OK:
-            # Получаем текущего пользователя по имени пользователя из запроса
-            username = request.data.get('username')
-            try:
-                user = User.objects.get(username=username)
-                # Добавляем базовую информацию о пользователе к ответу
-                response.data.update({
-                    'user_id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'role': user.role,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                })
-            except User.DoesNotExist:
-                pass
-                
-        return response
+    serializer_class = CustomTokenObtainPairSerializer
+
+
+class CustomTokenRefreshView(TokenRefreshView):
+    """Обновление access-токена с проверкой отзыва refresh-токена."""
+    serializer_class = CustomTokenRefreshSerializer
 
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -50,7 +49,7 @@ class UserRegistrationView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(SparseFieldsetViewMixin, generics.RetrieveUpdateAPIView):
     """Представление для просмотра и обновления профиля пользователя."""
     permission_classes = [permissions.IsAuthenticated]
     
@@ -61,10 +60,11 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     
     def get_object(self):
         """Возвращает текущего аутентифицированного пользователя."""
-        return self.request.user
+        # request.user построен из claims токена, поэтому загружаем модель целиком
+        return self.optimize_queryset(User.objects.all()).get(pk=self.request.user.pk)
 
 
-class UserViewSet(viewsets.ReadOnlyModelViewSet):
+class UserViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet для просмотра пользователей с фильтрацией по ролям."""
     queryset = User.objects.all()
     serializer_class = UserProfileDetailSerializer
@@ -72,7 +72,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     
     def get_queryset(self):
         """Фильтрует пользователей в зависимости от роли текущего пользователя."""
-        queryset = super().get_queryset()
+        queryset = self.optimize_queryset(super().get_queryset())
         user = self.request.user
         
         # Для студентов возвращаем только преподавателей
@@ -85,7 +85,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsTeacher])
     def students(self, request):
         """Возвращает список всех студентов (только для преподавателей)."""
-        students = User.objects.filter(role=User.ROLE_STUDENT)
+        students = self.optimize_queryset(User.objects.filter(role=User.ROLE_STUDENT))
         page = self.paginate_queryset(students)
         
         if page is not None:
@@ -98,7 +98,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'], permission_classes=[IsStudent])
     def teachers(self, request):
         """Возвращает список всех преподавателей (для студентов)."""
-        teachers = User.objects.filter(role=User.ROLE_TEACHER)
+        teachers = self.optimize_queryset(User.objects.filter(role=User.ROLE_TEACHER))
         page = self.paginate_queryset(teachers)
         
         if page is not None:
@@ -109,23 +109,108 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
-class StudentViewSet(viewsets.ReadOnlyModelViewSet):
+class StudentViewSet(SparseFieldsetViewMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet для работы со студентами
     
     list: Список всех студентов с возможностью поиска
     retrieve: Получение информации о конкретном студенте
+    typeahead: Постраничный поиск студентов по префиксу для автодополнения
     """
-    queryset = StudentProfile.objects.select_related('user').all()
+    queryset = StudentProfile.objects.all()
     serializer_class = StudentProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter]
+    filter_backends = [FullTextSearchFilter]
+    search_index = 'student'
     search_fields = ['user__username', 'user__first_name', 'user__last_name', 'user__email']
     
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+    
     def list(self, request, *args, **kwargs):
         """
         Получение списка студентов с возможностью поиска
         """
         queryset = self.filter_queryset(self.get_queryset())
         serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data) 
\ No newline at end of file
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def typeahead(self, request):
+        """
+        Поиск студентов для автодополнения.
+        
+        Каждое слово параметра q ищется как префикс имени, фамилии, логина или
+        email. Возвращает не больше limit (до TYPEAHEAD_MAX_LIMIT) студентов в
+        сокращённом виде, отсортированных по фамилии и имени; следующая
+        страница запрашивается с параметром cursor=next_cursor.
+        """
+        try:
+            limit = int(request.query_params.get('limit', TYPEAHEAD_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': _('Ожидается целое число.')})
+        limit = max(1, min(limit, TYPEAHEAD_MAX_LIMIT))
+        
+        queryset = StudentProfile.objects.all()
+        for term in request.query_params.get('q', '').split()[:TYPEAHEAD_MAX_TERMS]:
+            condition = Q()
+            # SQLite сравнивает без учёта регистра только ASCII, поэтому
+            # кириллица дополнительно ищется в строчном и "Заглавном" написании
+            for variant in {term, term.lower(), term.capitalize()}:
+                condition |= (
+                    Q(user__last_name__istartswith=variant) |
+                    Q(user__first_name__istartswith=variant) |
+                    Q(user__username__istartswith=variant) |
+                    Q(user__email__istartswith=variant)
+                )
+            queryset = queryset.filter(condition)
+        
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                position = json.loads(urlsafe_b64decode(cursor.encode()))
+                if not isinstance(position, list) or len(position) != 3:
+                    raise ValueError(cursor)
+                last_name, first_name, user_id = position
+                if not (isinstance(last_name, str) and isinstance(first_name, str)
+                        and type(user_id) is int):
+                    raise TypeError(cursor)
+            except (ValueError, TypeError):
+                raise ValidationError({'cursor': _('Неверный курсор.')})
+            queryset = queryset.filter(
+                Q(user__last_name__gt=last_name) |
+                Q(user__last_name=last_name, user__first_name__gt=first_name) |
+                Q(user__last_name=last_name, user__first_name=first_name, user_id__gt=user_id)
+            )
+        
+        rows = list(
+            queryset.values(
+                'id', 'user_id', 'user__username', 'user__first_name', 'user__last_name'
+            ).annotate(
+                group_codes=GroupConcat(
+                    'group_memberships__group__code',
+                    distinct=True,
+                    filter=Q(group_memberships__is_active=True)
+                )
+            ).order_by('user__last_name', 'user__first_name', 'user_id')[:limit + 1]
+        )
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = urlsafe_b64encode(json.dumps(
+                [last['user__last_name'], last['user__first_name'], last['user_id']],
+                ensure_ascii=False
+            ).encode()).decode()
+        
+        results = [
+            {
+                'id': row['id'],
+                'full_name': f"{row['user__first_name']} {row['user__last_name']}".strip() or row['user__username'],
+                'username': row['user__username'],
+                'group_codes': sorted(row['group_codes'].split(',')) if row['group_codes'] else [],
+            }
+            for row in rows
+        ]
+        return Response({'results': results, 'next_cursor': next_cursor})
@@ -0,0 +1,92 @@
+"""
+Контекст доступа текущего запроса.
+
+Представления, разрешения и сериализаторы проверяют одно и то же: является ли
+пользователь преподавателем или студентом, в каких группах он преподаёт или
+состоит. AccessContext загружает эти данные один раз за запрос и хранит их на
+объекте HttpRequest, поэтому повторные проверки не обращаются к БД.
+"""
+from django.utils.functional import cached_property
+
+
+class AccessContext:
+    """Роль, профили и группы пользователя, загружаемые не более одного раза."""
+
+    def __init__(self, user):
+        self.user = user
+
+    @cached_property
+    def is_teacher(self):
+        return bool(self.user and self.user.is_authenticated and self.user.is_teacher())
+
+    @cached_property
+    def is_student(self):
+        return bool(self.user and self.user.is_authenticated and self.user.is_student())
+
+    @cached_property
+    def teacher_profile(self):
+        """Профиль преподавателя или None."""
+        return getattr(self.user, 'teacher_profile', None) if self.is_teacher else None
+
+    @cached_property
+    def student_profile(self):
+        """Профиль студента или None."""
+        return getattr(self.user, 'student_profile', None) if self.is_student else None
+
+    @property
+    def teacher_profile_id(self):
+        return self.teacher_profile.pk if self.teacher_profile else None
+
+    @property
+    def student_profile_id(self):
+        return self.student_profile.pk if self.student_profile else None
+
+    @cached_property
+    def teaching_group_ids(self):
+        """Идентификаторы групп, в которых пользователь активно преподаёт."""
+        if self.teacher_profile is None:
+            return frozenset()
+        from groups.models import GroupTeacher
+        return frozenset(
+            GroupTeacher.objects.filter(teacher_id=self.teacher_profile_id, is_active=True)
+            .values_list('group_id', flat=True)
+        )
+
+    @cached_property
+    def student_group_ids(self):
+        """Идентификаторы групп, в которых пользователь активно состоит."""
+        if self.student_profile is None:
+            return frozenset()
+        from groups.models import GroupMembership
+        return frozenset(
+            GroupMembership.objects.filter(student_id=self.student_profile_id, is_active=True)
+            .values_list('group_id', flat=True)
+        )
+
+    def teaches_group(self, group_id):
+        return group_id in self.teaching_group_ids
+
+    def belongs_to_group(self, group_id):
+        return group_id in self.student_group_ids
+
+    def invalidate(self):
+        """Сбрасывает загруженные группы после изменения состава групп в запросе."""
+        self.__dict__.pop('teaching_group_ids', None)
+        self.__dict__.pop('student_group_ids', None)
+
+
+def get_access_context(request):
+    """
+    Возвращает AccessContext пользователя запроса.
+
+    Принимает как DRF Request, так и HttpRequest. Контекст хранится на
+    HttpRequest, поэтому он общий для представления, разрешений и
+    сериализаторов одного запроса.
+    """
+    http_request = getattr(request, '_request', request)
+    user = request.user
+    context = getattr(http_request, '_access_context', None)
+    if context is None or context.user is not user:
+        context = AccessContext(user)
+        http_request._access_context = context
+    return context
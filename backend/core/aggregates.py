@@ -0,0 +1,28 @@
+from django.db.models import Aggregate, CharField
+
+
+class GroupConcat(Aggregate):
+    """
+    Склеивает значения группы в строку через запятую.
+
+    GROUP_CONCAT в SQLite и MySQL, STRING_AGG в PostgreSQL.
+    """
+    function = 'GROUP_CONCAT'
+    template = '%(function)s(%(distinct)s%(expressions)s)'
+    allow_distinct = True
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            function='STRING_AGG',
+            template="%(function)s(%(distinct)s(%(expressions)s)::text, ',')",
+            **extra_context
+        )
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection,
+            template="%(function)s(%(distinct)s%(expressions)s SEPARATOR ',')",
+            **extra_context
+        )
@@ -0,0 +1,32 @@
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_migrate
+from django.apps import AppConfig
+from django.core import checks
+
+
+def restore_search_indexes(sender, using, **kwargs):
+    """
+    Восстанавливает триггеры полнотекстового поиска после миграций.
+
+    SQLite пересоздаёт таблицу при большинстве изменений схемы, и триггеры
+    исходной таблицы при этом удаляются.
+    """
+    from .search import ensure_search_indexes
+
+    connection = connections[using]
+    applied = MigrationRecorder(connection).applied_migrations()
+    if ('core', '0001_search_indexes') in applied:
+        ensure_search_indexes(connection)
+
+
+class CoreConfig(AppConfig):
+    name = 'core'
+
+    def ready(self):
+        from .checks import check_change_log_codes, check_connection_pool_size, check_shared_cache
+
+        post_migrate.connect(restore_search_indexes, sender=self)
+        checks.register(check_connection_pool_size)
+        checks.register(check_change_log_codes)
+        checks.register(check_shared_cache)
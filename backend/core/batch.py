@@ -0,0 +1,86 @@
+"""
+Пакетное выполнение GET-запросов к API.
+
+Клиент передаёт список путей, каждый выполняется представлением напрямую,
+без повторного прохода middleware и проверки JWT: подзапросы получают уже
+аутентифицированного пользователя пакета (как force_authenticate в тестах
+DRF) и общий AccessContext, поэтому профили и группы пользователя
+загружаются один раз на весь пакет. Разрешения каждого представления
+проверяются как обычно.
+"""
+import json
+import logging
+from urllib.parse import urlsplit
+
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+
+from .access import get_access_context
+
+logger = logging.getLogger('django.request')
+
+API_PREFIX = '/api/'
+
+# Заголовки пакета, не относящиеся к подзапросам
+_EXCLUDED_META = (
+    'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_ACCEPT_ENCODING', 'wsgi.input',
+)
+
+
+def build_subrequest(request, path, query_string):
+    """Создаёт GET-запрос к path с пользователем и контекстом доступа пакета."""
+    http_request = request._request
+    subrequest = HttpRequest()
+    subrequest.method = 'GET'
+    subrequest.path = subrequest.path_info = path
+    subrequest.META = {
+        key: value for key, value in http_request.META.items() if key not in _EXCLUDED_META
+    }
+    subrequest.META.update({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'HTTP_ACCEPT': 'application/json',
+    })
+    subrequest.GET = QueryDict(query_string)
+    subrequest.COOKIES = http_request.COOKIES
+    subrequest.user = request.user
+    # Request DRF использует эти атрибуты вместо классов аутентификации
+    subrequest._force_auth_user = request.user
+    subrequest._force_auth_token = request.auth
+    subrequest._access_context = get_access_context(request)
+    return subrequest
+
+
+def execute(request, url, excluded_paths=()):
+    """Выполняет один подзапрос пакета и возвращает (статус, тело)."""
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path.startswith(API_PREFIX):
+        return status.HTTP_400_BAD_REQUEST, {'detail': f'Путь должен начинаться с {API_PREFIX}'}
+    if parts.path in excluded_paths:
+        return status.HTTP_400_BAD_REQUEST, {'detail': 'Этот путь нельзя выполнить в пакете'}
+    try:
+        match = resolve(parts.path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {'detail': 'Не найдено.'}
+
+    subrequest = build_subrequest(request, parts.path, parts.query)
+    subrequest.resolver_match = match
+    try:
+        response = match.func(subrequest, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception('Batch subrequest failed: %s', url, extra={'request': subrequest})
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {'detail': 'Внутренняя ошибка сервера.'}
+
+    if isinstance(response, Response):
+        # Данные ещё не отрендерены и попадут в общий ответ как есть
+        return response.status_code, response.data
+    if hasattr(response, 'render'):
+        response.render()
+    content = b'' if response.streaming else response.content
+    if response.get('Content-Type', '').startswith('application/json'):
+        return response.status_code, json.loads(content) if content else None
+    return response.status_code, content.decode(response.charset, errors='replace')
@@ -0,0 +1,183 @@
+"""
+Журнал изменений предметных данных (transactional outbox).
+
+Задания, назначения, ответы, группы и участие в них (подклассы
+core.models.ChangeLoggedModel) записывают каждое изменение в таблицу
+ChangeLogEntry в той же транзакции. Потребители - инвалидация кешей,
+уведомления, ленты синхронизации, аналитика - читают журнал по позиции и
+сохраняют обработанную позицию (ChangeLogCheckpoint), поэтому изменение не
+теряется при ошибке потребителя и обрабатывается хотя бы один раз:
+
+    consumer = Consumer('analytics', models=[Submission])
+    for entries in consumer.batches():
+        process(entries)
+
+Позиции выдаются при вставке, а транзакции фиксируются в другом порядке:
+запись с меньшей позицией может стать видимой позже записи с большей.
+Поэтому потребитель читает записи подряд и останавливается на пропущенной
+позиции: её запись ещё может зафиксироваться. Пропуск считается окончательным
+(откат транзакции, удаление при уплотнении), если следующая за ним запись
+старше CHANGE_LOG_GAP_TIMEOUT секунд - пишущие журнал транзакции должны
+завершаться быстрее.
+
+В журнал не попадают изменения в обход save() и обработчиков удаления:
+QuerySet.update() и bulk_create() без явного вызова record_changes(), а также
+вставки команды seed_dataset.
+
+Команда compact_changelog удаляет записи старше срока хранения и
+промежуточные изменения объектов, после которых есть более поздние записи.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import ChangeLogCheckpoint, ChangeLogEntry, ChangeLoggedModel
+
+
+def change_logged_models():
+    """Возвращает {код: модель} всех моделей, пишущих журнал изменений."""
+    return {
+        model.change_log_code: model
+        for model in apps.get_models()
+        if issubclass(model, ChangeLoggedModel)
+    }
+
+
+def entry_model(entry):
+    """Модель, к объекту которой относится запись журнала."""
+    return change_logged_models()[entry.model]
+
+
+# Сколько позиций журнала проверяется одним запросом при поиске пропусков
+SCAN_SIZE = 5000
+
+
+class ChangeBatch(list):
+    """Записи журнала и позиция, до которой журнал прочитан (включая записи других моделей)."""
+
+    def __init__(self, entries, position):
+        super().__init__(entries)
+        self.position = position
+
+
+def read_changes(after=0, limit=1000, models=None):
+    """
+    Записи журнала с позицией больше after в порядке позиций (ChangeBatch).
+
+    Чтение останавливается на недавнем пропуске позиций (см. модуль).
+    models ограничивает выборку записями указанных моделей.
+    """
+    codes = None if models is None else {model.change_log_code for model in models}
+    gap_cutoff = timezone.now() - timedelta(seconds=settings.CHANGE_LOG_GAP_TIMEOUT)
+    position = after
+    selected = []
+    while len(selected) < limit:
+        rows = list(
+            ChangeLogEntry.objects.filter(pk__gt=position).order_by('pk')
+            .values_list('pk', 'model', 'created_at')[:SCAN_SIZE]
+        )
+        for pk, model, created_at in rows:
+            if pk != position + 1 and created_at > gap_cutoff:
+                # Запись с пропущенной позицией может быть ещё не зафиксирована
+                rows = []
+                break
+            position = pk
+            if codes is None or model in codes:
+                selected.append(pk)
+                if len(selected) == limit:
+                    break
+        if len(rows) < SCAN_SIZE:
+            break
+    return ChangeBatch(ChangeLogEntry.objects.filter(pk__in=selected).order_by('pk'), position)
+
+
+def head_position():
+    """
+    Позиция, до которой журнал можно прочитать сейчас (как read_changes).
+
+    Все записи до неё зафиксированы, поэтому данные, прочитанные после
+    вызова, отражают их; новый потребитель, начавший с этой позиции, получит
+    все последующие изменения.
+    """
+    gap_cutoff = timezone.now() - timedelta(seconds=settings.CHANGE_LOG_GAP_TIMEOUT)
+    # Пропуски перед записями старше CHANGE_LOG_GAP_TIMEOUT окончательны,
+    # поэтому проверяются только позиции после последней из них
+    start = (
+        ChangeLogEntry.objects.filter(created_at__lte=gap_cutoff).order_by('-created_at')
+        .values_list('pk', flat=True).first()
+    )
+    return read_changes(start or 0, models=()).position
+
+
+class Consumer:
+    """
+    Потребитель журнала изменений с сохраняемой позицией.
+
+    fetch() возвращает следующие необработанные записи, commit() сохраняет
+    позицию после их обработки. Записи, обработанные до сбоя, но не
+    подтверждённые commit(), будут получены повторно.
+    """
+
+    def __init__(self, name, models=None, batch_size=1000):
+        self.name = name
+        self.models = models
+        self.batch_size = batch_size
+
+    @property
+    def position(self):
+        checkpoint, _ = ChangeLogCheckpoint.objects.get_or_create(consumer=self.name)
+        return checkpoint.position
+
+    def fetch(self, limit=None):
+        return read_changes(self.position, limit or self.batch_size, self.models)
+
+    def commit(self, entries):
+        """Сохраняет позицию, до которой прочитаны обработанные записи (результат fetch())."""
+        position = getattr(entries, 'position', None)
+        if position is None:
+            if not entries:
+                return
+            position = entries[-1].pk
+        # Позиция только растёт, даже если параллельный потребитель ушёл дальше
+        ChangeLogCheckpoint.objects.filter(consumer=self.name, position__lt=position).update(
+            position=position, updated_at=timezone.now()
+        )
+
+    def batches(self):
+        """Выдаёт пачки записей до конца журнала, подтверждая каждую после обработки."""
+        while True:
+            position = self.position
+            batch = read_changes(position, self.batch_size, self.models)
+            if batch.position == position:
+                return
+            # Пачка без записей нужных моделей лишь сдвигает позицию
+            if batch:
+                yield batch
+            self.commit(batch)
+
+
+def compact(before):
+    """
+    Удаляет записи об изменении объектов, созданные до before, если после
+    них есть более поздние записи того же объекта.
+
+    Потребитель, не дошедший до удалённой записи, всё равно получит более
+    позднюю; записи о создании и удалении сохраняются.
+    """
+    later = ChangeLogEntry.objects.filter(
+        model=OuterRef('model'), object_id=OuterRef('object_id'), pk__gt=OuterRef('pk'),
+    )
+    superseded = ChangeLogEntry.objects.filter(
+        Exists(later), action=ChangeLogEntry.UPDATE, created_at__lt=before,
+    )
+    deleted, _ = superseded.delete()
+    return deleted
+
+
+def prune(before):
+    """Удаляет записи, созданные до before."""
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=before).delete()
+    return deleted
@@ -0,0 +1,89 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.checks import Error, Warning
+
+
+def check_connection_pool_size(app_configs, **kwargs):
+    """Сверяет размер пулов соединений с числом процессов и потоков gunicorn."""
+    database = settings.DATABASES.get('default', {})
+    if database.get('ENGINE', '').endswith('sqlite3'):
+        return []
+
+    threads = settings.WEB_THREADS
+    pool_size = (database.get('POOL') or {}).get('MAX_SIZE')
+    # Без пула каждый поток держит своё соединение
+    per_process = min(pool_size, threads) if pool_size else threads
+    total = settings.WEB_CONCURRENCY * per_process
+
+    errors = []
+    if total > settings.DB_MAX_CONNECTIONS:
+        errors.append(Warning(
+            f'{settings.WEB_CONCURRENCY} worker(s) may open up to {total} database connections, '
+            f'more than DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}.',
+            hint='Reduce WEB_CONCURRENCY, WEB_THREADS or DB_POOL_MAX_SIZE.',
+            id='core.W001',
+        ))
+    if pool_size and pool_size < threads:
+        errors.append(Warning(
+            f'DB_POOL_MAX_SIZE={pool_size} is smaller than WEB_THREADS={threads}; '
+            'request threads will wait for free connections.',
+            id='core.W002',
+        ))
+    return errors
+
+
+def _shared_cache_users():
+    """Данные в кеше, которые должны быть общими для процессов gunicorn."""
+    users = [
+        f'token revocation is cached for JWT_REVOCATION_CACHE_TTL={settings.JWT_REVOCATION_CACHE_TTL}s',
+        # Версии данных (core.versioning) меняются в процессе, изменившем данные
+        'data version bumps do not reach other workers, which serve stale calendar feeds '
+        f'for up to CALENDAR_FEED_CACHE_TIMEOUT={settings.CALENDAR_FEED_CACHE_TIMEOUT}s '
+        f'and stale dashboards for up to DASHBOARD_CACHE_TIMEOUT={settings.DASHBOARD_CACHE_TIMEOUT}s',
+    ]
+    if getattr(settings, 'DATABASE_REPLICAS', None):
+        # Метка core.db_routing.stick_to_primary ставится процессом, выполнившим запись
+        users.append('after a write, requests handled by other workers read from lagging replicas')
+    return users
+
+
+def check_shared_cache(app_configs, **kwargs):
+    """Требует общий кеш, если запросы обслуживают несколько процессов."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if settings.WEB_CONCURRENCY <= 1 or not backend.endswith('.LocMemCache'):
+        return []
+
+    message = (
+        f'WEB_CONCURRENCY={settings.WEB_CONCURRENCY} workers use a per-process LocMemCache, '
+        'so a worker does not see cache changes made by the others: '
+        + '; '.join(_shared_cache_users()) + '.'
+    )
+    hint = 'Set REDIS_URL to a Redis server shared by all workers or set WEB_CONCURRENCY=1.'
+    # runserver обслуживает запросы одним процессом
+    if settings.DEBUG:
+        return [Warning(message, hint=hint, id='core.W003')]
+    return [Error(message, hint=hint, id='core.E003')]
+
+
+def check_change_log_codes(app_configs, **kwargs):
+    """Проверяет, что модели журнала изменений имеют различные коды."""
+    from .models import ChangeLoggedModel
+
+    errors = []
+    seen = {}
+    for model in apps.get_models():
+        if not issubclass(model, ChangeLoggedModel):
+            continue
+        code = model.change_log_code
+        if code is None:
+            errors.append(Error(
+                f'{model._meta.label} does not define change_log_code.', obj=model, id='core.E001',
+            ))
+        elif code in seen:
+            errors.append(Error(
+                f'{model._meta.label} uses change_log_code={code} of {seen[code]._meta.label}.',
+                obj=model, id='core.E002',
+            ))
+        else:
+            seen[code] = model
+    return errors
@@ -0,0 +1,139 @@
+"""
+Сжатие ответов gzip и brotli.
+
+Кодек выбирается по заголовку Accept-Encoding с учётом q-значений; при
+равных значениях предпочтение у brotli. Brotli используется, если
+установлен пакет brotli. Потоковые ответы сжимаются по мере выдачи частей.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Типы содержимого, которые уже сжаты или почти не сжимаются
+INCOMPRESSIBLE_CONTENT_TYPES = (
+    'image/', 'video/', 'audio/', 'font/woff',
+    'application/zip', 'application/gzip', 'application/x-gzip', 'application/x-bzip2',
+    'application/x-7z-compressed', 'application/x-rar-compressed', 'application/x-xz',
+    'application/octet-stream', 'application/pdf',
+)
+# Исключения из префиксов выше: текстовые форматы
+COMPRESSIBLE_CONTENT_TYPES = ('image/svg+xml',)
+
+
+class GzipCodec:
+    name = 'gzip'
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        compressor = self.compressor()
+        return compressor.compress(data) + compressor.finish()
+
+    def compressor(self):
+        # wbits=31 - формат gzip (заголовок и CRC)
+        return _ZlibStream(zlib.compressobj(self.level, zlib.DEFLATED, 31))
+
+
+class BrotliCodec:
+    name = 'br'
+
+    def __init__(self, quality=4):
+        self.quality = quality
+
+    def compress(self, data):
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=self.quality)
+
+    def compressor(self):
+        return _BrotliStream(brotli.Compressor(mode=brotli.MODE_TEXT, quality=self.quality))
+
+
+class _ZlibStream:
+
+    def __init__(self, compressobj):
+        self._compressobj = compressobj
+
+    def compress(self, data):
+        return self._compressobj.compress(data)
+
+    def finish(self):
+        return self._compressobj.flush()
+
+
+class _BrotliStream:
+
+    def __init__(self, compressor):
+        self._compressor = compressor
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def available_codecs(gzip_level=6, brotli_quality=4):
+    """Кодеки в порядке предпочтения сервера."""
+    codecs = []
+    if brotli is not None:
+        codecs.append(BrotliCodec(brotli_quality))
+    codecs.append(GzipCodec(gzip_level))
+    return codecs
+
+
+def negotiate_codec(accept_encoding, codecs):
+    """
+    Выбирает кодек по Accept-Encoding: наибольшее q, при равных - порядок codecs.
+    None, если клиент не принимает ни один из них.
+    """
+    weights = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for codec in codecs:
+        q = weights.get(codec.name, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+def is_compressible(content_type):
+    content_type = (content_type or '').split(';', 1)[0].strip().lower()
+    if content_type in COMPRESSIBLE_CONTENT_TYPES:
+        return True
+    return not content_type.startswith(INCOMPRESSIBLE_CONTENT_TYPES)
+
+
+def compress_stream(chunks, codec):
+    """Сжимает итератор байтовых частей, выдавая сжатые данные по мере готовности."""
+    compressor = codec.compressor()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def compress_async_stream(chunks, codec):
+    compressor = codec.compressor()
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
@@ -0,0 +1,376 @@
+"""
+Генератор синтетических данных для воспроизведения проблем производительности.
+
+Объекты создаются пакетно: bulk_create для таблиц, идентификаторы которых
+нужны дальше, и executemany для остальных. Пароль хешируется один раз, профили
+создаются напрямую (сигналы post_save при пакетной вставке не срабатывают), а все
+случайные величины берутся из random.Random с фиксированным seed, поэтому при
+одинаковых параметрах получается одинаковый набор данных. По той же причине
+созданные строки не записываются в журнал изменений (core.changelog).
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from authentication.models import StudentProfile, TeacherProfile
+from groups.models import CODE_ALPHABET, CODE_LENGTH, Group, GroupMembership, GroupTeacher
+from assignments.models import Assignment, AssignmentGroup, Submission
+
+User = get_user_model()
+
+DEFAULT_PASSWORD = 'Test1234'
+
+FIRST_NAMES = [
+    'Александр', 'Мария', 'Дмитрий', 'Анна', 'Иван', 'Елена', 'Максим', 'Ольга',
+    'Сергей', 'Наталья', 'Андрей', 'Татьяна', 'Алексей', 'Ирина', 'Никита', 'Дарья',
+]
+LAST_NAMES = [
+    'Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров', 'Соколов',
+    'Михайлов', 'Новиков', 'Федоров', 'Морозов', 'Волков', 'Алексеев', 'Лебедев',
+]
+POSITIONS = ['Профессор', 'Доцент', 'Старший преподаватель', 'Ассистент']
+DEPARTMENTS = ['Компьютерные науки', 'Математика', 'Физика', 'Информатика']
+DEGREES = ['Доктор наук', 'Кандидат наук', 'Магистр', 'PhD']
+MAJORS = [
+    'Программная инженерия', 'Информационные системы',
+    'Компьютерная безопасность', 'Прикладная математика',
+]
+SUBJECTS = [
+    'Алгоритмы', 'Базы данных', 'Операционные системы', 'Сети', 'Матанализ',
+    'Линейная алгебра', 'Физика', 'Машинное обучение', 'Компиляторы',
+]
+
+
+@contextmanager
+def disable_auto_now(*model_fields):
+    """
+    Временно отключает auto_now/auto_now_add у полей, чтобы bulk_create
+    сохранил сгенерированные даты вместо текущего времени.
+    """
+    saved = []
+    for model, field_name in model_fields:
+        field = model._meta.get_field(field_name)
+        saved.append((field, field.auto_now, field.auto_now_add))
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
+
+
+class DatasetGenerator:
+    """
+    Создает набор университетов с преподавателями, группами, студентами,
+    заданиями и ответами на них.
+
+    Размеры задаются на один университет: teachers, groups, students_per_group,
+    assignments_per_group. Доля ответов, поздних сдач и оценённых ответов
+    задаётся коэффициентами submission_rate, late_rate и graded_rate.
+    """
+
+    def __init__(self, seed=42, password=DEFAULT_PASSWORD, prefix='seed', batch_size=2000, log=None):
+        self.rng = random.Random(seed)
+        self.password_hash = make_password(password)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        # Опорное время округляется до суток, чтобы повторный запуск в тот же
+        # день давал те же даты
+        self.now = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        self.counts = {}
+
+    def username(self, university, role, index):
+        return f'{self.prefix}_u{university}_{role}{index}'
+
+    def existing_users(self):
+        return User.objects.filter(username__startswith=f'{self.prefix}_u')
+
+    def generate(self, universities=1, teachers=20, groups=40, students_per_group=25,
+                 assignments_per_group=10, elective_rate=0.2, submission_rate=0.8,
+                 late_rate=0.15, graded_rate=0.6):
+        with transaction.atomic(), disable_auto_now(
+            (Group, 'created_at'),
+            (Assignment, 'created_at'),
+        ):
+            for university in range(1, universities + 1):
+                self._generate_university(
+                    university, teachers, groups, students_per_group,
+                    assignments_per_group, elective_rate, submission_rate,
+                    late_rate, graded_rate,
+                )
+        return self.counts
+
+    def _bulk_create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        label = model._meta.verbose_name_plural
+        self.counts[str(label)] = self.counts.get(str(label), 0) + len(created)
+        return created
+
+    def _insert_rows(self, model, field_names, rows):
+        """
+        Вставляет строки через executemany без создания экземпляров моделей.
+
+        Используется для таблиц, идентификаторы строк которых генератору не нужны:
+        подготовка значений полей в bulk_create занимает большую часть времени.
+        """
+        fields = [model._meta.get_field(name) for name in field_names]
+        connection = connections[router.db_for_write(model)]
+        quote = connection.ops.quote_name
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            quote(model._meta.db_table),
+            ', '.join(quote(field.column) for field in fields),
+            ', '.join(['%s'] * len(fields)),
+        )
+        datetime_columns = [
+            i for i, field in enumerate(fields) if field.get_internal_type() == 'DateTimeField'
+        ]
+        adapt = connection.ops.adapt_datetimefield_value
+
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), self.batch_size):
+                batch = rows[start:start + self.batch_size]
+                if datetime_columns:
+                    batch = [list(row) for row in batch]
+                    for row in batch:
+                        for i in datetime_columns:
+                            row[i] = adapt(row[i])
+                cursor.executemany(sql, batch)
+
+        label = str(model._meta.verbose_name_plural)
+        self.counts[label] = self.counts.get(label, 0) + len(rows)
+
+    def _random_past(self, max_days):
+        return self.now - timedelta(days=self.rng.uniform(0, max_days))
+
+    def _generate_university(self, university, num_teachers, num_groups, students_per_group,
+                             assignments_per_group, elective_rate, submission_rate,
+                             late_rate, graded_rate):
+        rng = self.rng
+        self.log(f'University {university}: creating users...')
+
+        teacher_users = self._bulk_create(User, [
+            self._user(university, User.ROLE_TEACHER, i) for i in range(1, num_teachers + 1)
+        ])
+        teachers = self._bulk_create(TeacherProfile, [
+            TeacherProfile(
+                user=user,
+                position=rng.choice(POSITIONS),
+                department=rng.choice(DEPARTMENTS),
+                academic_degree=rng.choice(DEGREES),
+            )
+            for user in teacher_users
+        ])
+
+        num_students = num_groups * students_per_group
+        student_prefix = self.username(university, User.ROLE_STUDENT, '')
+        self._insert_rows(
+            User,
+            ('username', 'email', 'password', 'first_name', 'last_name', 'role', 'date_joined',
+             'is_superuser', 'is_staff', 'is_active'),
+            [
+                self._user_row(university, User.ROLE_STUDENT, i) + (False, False, True)
+                for i in range(1, num_students + 1)
+            ],
+        )
+        student_user_ids = dict(
+            User.objects.filter(username__startswith=student_prefix).values_list('username', 'id')
+        )
+        self._insert_rows(
+            StudentProfile,
+            ('user', 'student_id', 'major', 'year_of_study', 'bio', 'created_at', 'updated_at'),
+            [
+                (
+                    student_user_ids[self.username(university, User.ROLE_STUDENT, i)],
+                    f'S{university:02d}{i:06d}', rng.choice(MAJORS), rng.randint(1, 5), '',
+                    self.now, self.now,
+                )
+                for i in range(1, num_students + 1)
+            ],
+        )
+        profile_ids = dict(
+            StudentProfile.objects.filter(user__username__startswith=student_prefix)
+            .values_list('user_id', 'id')
+        )
+        students = [
+            profile_ids[student_user_ids[self.username(university, User.ROLE_STUDENT, i)]]
+            for i in range(1, num_students + 1)
+        ]
+
+        self.log(f'University {university}: creating groups...')
+        codes = self._group_codes(num_groups)
+        groups = self._bulk_create(Group, [
+            Group(
+                name=f'{rng.choice(SUBJECTS)} {university}-{i}',
+                code=codes[i],
+                description=f'Учебная группа {i} университета {university}',
+                created_by=rng.choice(teachers),
+                created_at=self._random_past(365),
+            )
+            for i in range(num_groups)
+        ])
+
+        group_teachers = []
+        for group in groups:
+            group_teachers.append((group.id, group.created_by_id, group.created_at, True))
+            co_teacher = rng.choice(teachers)
+            if co_teacher != group.created_by and rng.random() < 0.3:
+                group_teachers.append((group.id, co_teacher.id, group.created_at, True))
+        self._insert_rows(GroupTeacher, ('group', 'teacher', 'joined_at', 'is_active'), group_teachers)
+
+        # Каждый студент состоит в основной группе и, возможно, в одной факультативной
+        members_by_group = {group.id: [] for group in groups}
+        memberships = []
+        for i, student_id in enumerate(students):
+            main_group = groups[i // students_per_group]
+            joined = [main_group]
+            if rng.random() < elective_rate:
+                elective = rng.choice(groups)
+                if elective != main_group:
+                    joined.append(elective)
+            for position, group in enumerate(joined):
+                is_active = rng.random() > 0.02
+                role = (GroupMembership.ROLE_MONITOR
+                        if position == 0 and i % students_per_group == 0
+                        else GroupMembership.ROLE_MEMBER)
+                memberships.append((group.id, student_id, role, group.created_at, group.created_at, is_active))
+                if is_active:
+                    members_by_group[group.id].append(student_id)
+        self._insert_rows(
+            GroupMembership, ('group', 'student', 'role', 'joined_at', 'updated_at', 'is_active'), memberships,
+        )
+
+        self.log(f'University {university}: creating assignments...')
+        assignments = []
+        assignment_owner_groups = []
+        for group in groups:
+            for _ in range(assignments_per_group):
+                deadline = self.now + timedelta(days=rng.uniform(-120, 60))
+                assignments.append(Assignment(
+                    title=f'{rng.choice(SUBJECTS)}: задание {len(assignments) + 1}',
+                    description='Синтетическое задание для нагрузочного тестирования.',
+                    created_by=group.created_by,
+                    created_at=deadline - timedelta(days=rng.uniform(7, 30)),
+                    status=rng.choices(
+                        [Assignment.STATUS_PUBLISHED, Assignment.STATUS_DRAFT, Assignment.STATUS_ARCHIVED],
+                        weights=[85, 10, 5],
+                    )[0],
+                    deadline=deadline,
+                    max_points=rng.choice([10, 20, 50, 100]),
+                    allow_late_submissions=rng.random() < 0.8,
+                    late_penalty_percentage=rng.choice([0, 10, 20, 30]),
+                ))
+                assignment_owner_groups.append(group)
+        assignments = self._bulk_create(Assignment, assignments)
+
+        assignment_groups = []
+        for assignment, group in zip(assignments, assignment_owner_groups):
+            targets = [(group, None)]
+            # Часть заданий назначается еще одной группе с индивидуальным дедлайном
+            if rng.random() < 0.1:
+                other = rng.choice(groups)
+                if other != group:
+                    targets.append((other, assignment.deadline + timedelta(days=rng.randint(1, 7))))
+            for target, custom_deadline in targets:
+                assignment_groups.append((assignment, target.id, custom_deadline))
+        self._insert_rows(
+            AssignmentGroup,
+            ('assignment', 'group', 'assigned_at', 'updated_at', 'custom_deadline', 'effective_deadline'),
+            [
+                (assignment.id, group_id, assignment.created_at, assignment.created_at, custom_deadline,
+                 custom_deadline or assignment.deadline)
+                for assignment, group_id, custom_deadline in assignment_groups
+            ],
+        )
+
+        self.log(f'University {university}: creating submissions...')
+        submissions = []
+        submitted = set()
+        for assignment, group_id, custom_deadline in assignment_groups:
+            if assignment.status == Assignment.STATUS_DRAFT:
+                continue
+            deadline = custom_deadline or assignment.deadline
+            rate = submission_rate if deadline < self.now else submission_rate / 3
+            for student_id in members_by_group[group_id]:
+                key = (assignment.id, student_id)
+                if key in submitted or rng.random() >= rate:
+                    continue
+                submitted.add(key)
+                submissions.append(self._submission(
+                    assignment, student_id, deadline, late_rate, graded_rate,
+                ))
+        self._insert_rows(
+            Submission,
+            ('assignment', 'student', 'submitted_at', 'updated_at', 'comment', 'status',
+             'points', 'is_late', 'feedback', 'graded_by', 'graded_at'),
+            submissions,
+        )
+
+    def _user_row(self, university, role, index):
+        rng = self.rng
+        username = self.username(university, role, index)
+        return (
+            username, f'{username}@example.com', self.password_hash,
+            rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), role, self._random_past(365 * 4),
+        )
+
+    def _user(self, university, role, index):
+        username, email, password, first_name, last_name, role, date_joined = self._user_row(
+            university, role, index
+        )
+        return User(
+            username=username, email=email, password=password, first_name=first_name,
+            last_name=last_name, role=role, date_joined=date_joined,
+        )
+
+    def _group_codes(self, count):
+        """Генерирует уникальные коды групп, не пересекающиеся с уже существующими."""
+        codes = set()
+        while len(codes) < count:
+            candidates = sorted({
+                ''.join(self.rng.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+                for _ in range(count - len(codes))
+            } - codes)
+            for start in range(0, len(candidates), 500):
+                chunk = candidates[start:start + 500]
+                taken = set(Group.objects.filter(code__in=chunk).values_list('code', flat=True))
+                codes.update(code for code in chunk if code not in taken)
+        return sorted(codes)
+
+    def _submission(self, assignment, student_id, deadline, late_rate, graded_rate):
+        rng = self.rng
+        is_late = deadline < self.now and rng.random() < late_rate
+        if is_late:
+            submitted_at = deadline + timedelta(hours=rng.uniform(1, 72))
+        else:
+            submitted_at = deadline - timedelta(hours=rng.uniform(1, 24 * 7))
+        submitted_at = min(submitted_at, self.now)
+
+        points = None
+        if is_late and assignment.allow_late_submissions:
+            # Так же, как в Submission.save: штраф применяется к максимальному баллу
+            penalty = assignment.late_penalty_percentage / 100
+            points = int(assignment.max_points * (1 - penalty))
+
+        status = Submission.STATUS_SUBMITTED
+        graded_by_id = graded_at = None
+        feedback = ''
+        if deadline < self.now and rng.random() < graded_rate:
+            status = rng.choices(
+                [Submission.STATUS_GRADED, Submission.STATUS_RETURNED], weights=[90, 10]
+            )[0]
+            points = rng.randint(0, points if points is not None else assignment.max_points)
+            graded_by_id = assignment.created_by_id
+            graded_at = min(submitted_at + timedelta(days=rng.uniform(0.5, 10)), self.now)
+            feedback = 'Хорошая работа.' if status == Submission.STATUS_GRADED else 'Нужно доработать.'
+
+        return (
+            assignment.id, student_id, submitted_at, graded_at or submitted_at, '',
+            status, points, is_late, feedback, graded_by_id, graded_at,
+        )
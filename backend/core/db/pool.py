@@ -0,0 +1,264 @@
+"""
+Пул соединений с БД и статистика соединений.
+
+Django 4.2 не умеет переиспользовать соединения между потоками: соединение
+либо закрывается в конце запроса (CONN_MAX_AGE=0), либо остаётся за потоком
+(CONN_MAX_AGE>0). Бэкенды core.db.backends.* получают соединения через
+ConnectionPool:
+
+- без ключа POOL в настройках БД пул не хранит соединения, а только считает
+  открытые/закрытые соединения и время подключения;
+- с POOL = {'MAX_SIZE': ..., 'TIMEOUT': ..., 'MAX_IDLE': ...} закрытое Django
+  соединение возвращается в пул и выдаётся следующему запросу любого потока
+  процесса. При CONN_HEALTH_CHECKS соединение из пула проверяется перед выдачей.
+
+Статистика (pool_stats()) считается в пределах процесса.
+"""
+import threading
+import time
+from collections import deque
+
+from django.db import DatabaseError
+
+
+class PoolTimeout(DatabaseError):
+    """Свободное соединение не появилось за POOL['TIMEOUT'] секунд."""
+
+
+class ConnectionPool:
+
+    def __init__(self, alias, max_size=0, timeout=30.0, max_idle=300.0, health_checks=False):
+        self.alias = alias
+        # 0 - соединения не переиспользуются
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_checks = health_checks
+        self._idle = deque()
+        # Параметры подключения свободных соединений (БД меняется, например, в тестах)
+        self._params_key = None
+        self._condition = threading.Condition()
+        self._open = 0
+        self._in_use = 0
+        self._counters = dict.fromkeys([
+            'requests', 'created', 'reused', 'closed', 'failed_health_checks', 'timeouts',
+        ], 0)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._connect_total = 0.0
+
+    @property
+    def pooled(self):
+        return self.max_size > 0
+
+    def acquire(self, connect, params_key=None):
+        """
+        Выдаёт соединение из пула или открывает новое через connect().
+
+        params_key описывает параметры подключения: при их смене свободные
+        соединения к прежней БД закрываются.
+        """
+        started = time.monotonic()
+        if params_key != self._params_key:
+            self.close_idle()
+            self._params_key = params_key
+        deadline = started + self.timeout
+        while True:
+            connection = self._checkout(deadline)
+            if connection is None:
+                break
+            if not self.health_checks or self._is_usable(connection):
+                self._record_checkout(started)
+                return connection
+            with self._condition:
+                self._counters['failed_health_checks'] += 1
+            self._discard(connection)
+
+        connect_started = time.monotonic()
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+            raise
+        self._record_checkout(started, connect_time=time.monotonic() - connect_started)
+        return connection
+
+    def release(self, connection, reusable=True):
+        """Возвращает соединение в пул или закрывает его."""
+        expired = []
+        with self._condition:
+            self._in_use -= 1
+            if reusable and self.pooled:
+                now = time.monotonic()
+                self._idle.append((connection, now))
+                connection = None
+                # Соединения, простаивающие дольше MAX_IDLE, закрываются
+                while self._idle and now - self._idle[0][1] > self.max_idle:
+                    expired.append(self._idle.popleft()[0])
+            self._condition.notify()
+        if connection is not None:
+            expired.append(connection)
+        for item in expired:
+            self._discard(item)
+
+    def close_idle(self):
+        """Закрывает все свободные соединения пула."""
+        with self._condition:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+        for connection in idle:
+            self._discard(connection)
+
+    def stats(self):
+        with self._condition:
+            checkouts = self._counters['created'] + self._counters['reused']
+            return {
+                'pooled': self.pooled,
+                'max_size': self.max_size,
+                'open': self._open,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                **self._counters,
+                'wait_ms_total': round(self._wait_total * 1000, 3),
+                'wait_ms_avg': round(self._wait_total * 1000 / checkouts, 3) if checkouts else 0.0,
+                'wait_ms_max': round(self._wait_max * 1000, 3),
+                'connect_ms_avg': (
+                    round(self._connect_total * 1000 / self._counters['created'], 3)
+                    if self._counters['created'] else 0.0
+                ),
+            }
+
+    def reset_stats(self):
+        with self._condition:
+            for key in self._counters:
+                self._counters[key] = 0
+            self._wait_total = self._wait_max = self._connect_total = 0.0
+
+    def _checkout(self, deadline):
+        """
+        Берёт свободное соединение; None - можно открыть новое (место уже занято).
+        """
+        with self._condition:
+            self._counters['requests'] += 1
+            while True:
+                if self._idle:
+                    return self._idle.pop()[0]
+                if not self.pooled or self._open < self.max_size:
+                    self._open += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f'No free connection in the "{self.alias}" pool '
+                        f'(max size {self.max_size}) after {self.timeout:g}s'
+                    )
+                self._condition.wait(remaining)
+
+    def _record_checkout(self, started, connect_time=None):
+        """connect_time - время открытия нового соединения, None для взятого из пула."""
+        waited = time.monotonic() - started
+        with self._condition:
+            if connect_time is None:
+                self._counters['reused'] += 1
+            else:
+                self._counters['created'] += 1
+                self._connect_total += connect_time
+            self._in_use += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._condition:
+            self._open -= 1
+            self._counters['closed'] += 1
+            self._condition.notify()
+
+    @staticmethod
+    def _is_usable(connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except Exception:
+            return False
+        return True
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, settings_dict):
+    pool = _pools.get(alias)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(alias)
+            if pool is None:
+                options = settings_dict.get('POOL') or {}
+                pool = _pools[alias] = ConnectionPool(
+                    alias,
+                    max_size=options.get('MAX_SIZE', 0),
+                    timeout=options.get('TIMEOUT', 30.0),
+                    max_idle=options.get('MAX_IDLE', 300.0),
+                    health_checks=settings_dict.get('CONN_HEALTH_CHECKS', False),
+                )
+    return pool
+
+
+def discard_pool(alias):
+    """Закрывает свободные соединения пула; следующий запрос создаст пул по текущим настройкам."""
+    with _pools_lock:
+        pool = _pools.pop(alias, None)
+    if pool is not None:
+        pool.close_idle()
+
+
+def pool_stats():
+    """Статистика соединений по псевдонимам БД."""
+    return {alias: pool.stats() for alias, pool in sorted(_pools.items())}
+
+
+def reset_pool_stats():
+    for pool in list(_pools.values()):
+        pool.reset_stats()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Примесь к DatabaseWrapper: соединения открываются через ConnectionPool,
+    а закрытие возвращает их в пул.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        return self.pool.acquire(
+            lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(conn_params),
+            params_key=repr(sorted(conn_params.items(), key=lambda item: item[0])),
+        )
+
+    def _close(self):
+        if self.connection is None:
+            return
+        connection = self.connection
+        reusable = self.pool.pooled and not self.errors_occurred
+        if reusable:
+            # Соединение уходит в пул без открытой транзакции
+            try:
+                if self.in_atomic_block or not self.autocommit:
+                    connection.rollback()
+            except Exception:
+                reusable = False
+        with self.wrap_database_errors:
+            self.pool.release(connection, reusable=reusable)
@@ -0,0 +1,91 @@
+"""
+Маршрутизация чтения на реплики БД.
+
+Запись всегда идёт в основную БД (default). Чтение направляется на одну из
+реплик (settings.DATABASE_REPLICAS) только внутри read_from_replica():
+ReplicaRoutingMiddleware включает его для безопасных HTTP-запросов, а
+аналитические выборки вне запросов (команды, отчёты) оборачиваются в него явно.
+
+Реплики отстают от основной БД. Чтобы пользователь видел свои изменения,
+после его пишущего запроса чтение для него на DATABASE_REPLICA_LAG секунд
+возвращается на основную БД. Метка хранится в кеше и должна быть видна
+всем процессам, поэтому с репликами нужен общий кеш (REDIS_URL, проверка
+core.E003).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """Направляет чтение в блоке (или декорированной функции) на реплики."""
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def read_from_primary():
+    """Направляет чтение в блоке на основную БД."""
+    return read_from_replica(enabled=False)
+
+
+def read_only_view(view):
+    """
+    Помечает представление, которое только читает данные, хотя принимает
+    небезопасный метод (например, POST с параметрами в теле): такие запросы
+    читают с реплик и не привязывают пользователя к основной БД.
+    """
+    view.read_only = True
+    return view
+
+
+def _sticky_cache_key(user_id):
+    return f'db:read_primary:{user_id}'
+
+
+def stick_to_primary(user_id):
+    """Читать данные пользователя из основной БД, пока реплики не догонят его запись."""
+    cache.set(_sticky_cache_key(user_id), True, settings.DATABASE_REPLICA_LAG)
+
+
+def is_stuck_to_primary(user_id):
+    return bool(cache.get(_sticky_cache_key(user_id)))
+
+
+class ReplicaRouter:
+    """
+    Роутер: запись и миграции - в default, чтение - на реплику, если включено
+    read_from_replica() и основная БД не находится в транзакции.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _use_replica.get():
+            return DEFAULT_DB_ALIAS
+        # Внутри транзакции чтение должно видеть её собственные изменения
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_aliases()
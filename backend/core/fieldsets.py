@@ -0,0 +1,267 @@
+"""
+Выборочные поля (?fields=) и явное раскрытие связей (?expand=) в ответах API.
+
+?fields=id,points,student.user.username - поля ответа; поля вложенных
+сериализаторов перечисляются через точку. Без параметра отдаются все поля.
+
+?expand=student,group.created_by - связи из Meta.expandable_fields, которые
+по умолчанию отдаются первичным ключом, заменяются вложенными объектами.
+Путь может проходить через уже вложенные сериализаторы (group.created_by).
+
+Не попавшие в ответ поля не сериализуются, а related_lookups() строит
+select_related/prefetch_related только для связей, оставшихся в ответе, так
+что невостребованные связи не запрашиваются из БД. Так же добавляются
+аннотации из Meta.field_annotations (например, счётчики) - и для вложенных
+сериализаторов, чтобы не считать их отдельным запросом на каждую строку.
+"""
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions, relations, serializers
+from rest_framework.exceptions import ValidationError
+
+
+class FieldShape:
+    """Запрошенная форма ответа сериализатора."""
+
+    def __init__(self):
+        # None - все поля по умолчанию
+        self.fields = None
+        self.expand = set()
+        self.nested = {}
+
+    def child(self, name):
+        shape = self.nested.get(name)
+        if shape is None:
+            shape = self.nested[name] = FieldShape()
+        return shape
+
+
+def parse_field_shape(fields=None, expand=None):
+    """Разбирает значения параметров ?fields= и ?expand= в FieldShape."""
+    shape = FieldShape()
+    for param, value in (('fields', fields), ('expand', expand)):
+        for path in (item.strip() for item in (value or '').split(',')):
+            if not path:
+                continue
+            names = path.split('.')
+            if not all(names):
+                raise ValidationError({param: _('Неверный путь поля: %(path)s.') % {'path': path}})
+            node = shape
+            for name in names:
+                if param == 'fields':
+                    if node.fields is None:
+                        node.fields = set()
+                    node.fields.add(name)
+                else:
+                    node.expand.add(name)
+                node = node.child(name)
+    return shape
+
+
+class SparseFieldsetMixin:
+    """
+    Примесь к ModelSerializer: форма ответа задаётся аргументом field_shape.
+
+    Meta.expandable_fields - {поле: класс сериализатора} связей, которые
+    раскрываются только по ?expand=.
+    Meta.field_relations - {поле: [lookup, ...]} связей, которые читает поле
+    без вложенного сериализатора (например, SerializerMethodField).
+    Meta.field_annotations - {поле: {атрибут: выражение}} аннотаций queryset,
+    которые читает поле.
+    """
+
+    def __init__(self, *args, field_shape=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.field_shape = field_shape
+
+    def get_fields(self):
+        fields = super().get_fields()
+        shape = self.field_shape
+        if shape is None:
+            return fields
+
+        expandable = getattr(self.Meta, 'expandable_fields', {})
+        for name in sorted(shape.expand):
+            if name in expandable:
+                fields[name] = self._build_expanded_field(expandable[name], name, fields.get(name))
+            elif not isinstance(fields.get(name), serializers.BaseSerializer):
+                raise ValidationError({'expand': _('Поле нельзя раскрыть: %(name)s.') % {'name': name}})
+
+        if shape.fields is not None:
+            requested = shape.fields | shape.expand
+            unknown = requested.difference(fields)
+            if unknown:
+                raise ValidationError({'fields': _('Неизвестные поля: %(names)s.') % {
+                    'names': ', '.join(sorted(unknown))
+                }})
+            fields = OrderedDict((name, field) for name, field in fields.items() if name in requested)
+
+        for name, nested_shape in shape.nested.items():
+            field = fields.get(name)
+            target = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(target, SparseFieldsetMixin):
+                target.field_shape = nested_shape
+            elif nested_shape.fields is not None or nested_shape.expand:
+                raise ValidationError({'fields': _('Поле не содержит вложенных полей: %(name)s.') % {'name': name}})
+        return fields
+
+    @staticmethod
+    def _build_expanded_field(serializer_class, name, field):
+        kwargs = {'read_only': True}
+        if field is not None and field.source and field.source != name:
+            kwargs['source'] = field.source
+        return serializer_class(**kwargs)
+
+
+def related_lookups(serializer):
+    """
+    Возвращает (select_related, prefetch_related, annotations) для связей и
+    аннотаций, которые прочитает serializer.to_representation().
+
+    annotations - {lookup связи ('' - сама модель): (модель, {атрибут: выражение})}.
+    """
+    select, prefetch, annotations = [], [], {}
+    _collect_lookups(serializer, serializer.Meta.model, [], False, select, prefetch, annotations)
+    return select, prefetch, annotations
+
+
+def optimize_queryset(queryset, serializer):
+    """Добавляет к queryset select_related/prefetch_related и аннотации по полям сериализатора."""
+    select, prefetch, annotations = related_lookups(serializer)
+    own = annotations.pop('', None)
+    if own:
+        queryset = queryset.annotate(**own[1])
+
+    # Связь с аннотациями загружается отдельным запросом (Prefetch) с
+    # аннотированным queryset; связи внутри неё - select_related этого queryset
+    related_select = {lookup: [] for lookup in annotations}
+    for lookup in list(select):
+        owner = _annotated_owner(lookup, annotations)
+        if owner is not None:
+            select.remove(lookup)
+            if lookup != owner:
+                related_select[owner].append(lookup[len(owner) + 2:])
+    lookups = [lookup for lookup in prefetch if lookup not in annotations]
+    for lookup, (model, expressions) in annotations.items():
+        related = model._default_manager.annotate(**expressions)
+        if related_select[lookup]:
+            related = related.select_related(*related_select[lookup])
+        lookups.append(Prefetch(lookup, queryset=related))
+    # Prefetch с queryset должен идти раньше строковых lookup, проходящих через ту же связь
+    lookups.sort(key=lambda item: (
+        (item.prefetch_through if isinstance(item, Prefetch) else item).count('__'),
+        not isinstance(item, Prefetch),
+    ))
+
+    if select:
+        queryset = queryset.select_related(*select)
+    if lookups:
+        queryset = queryset.prefetch_related(*lookups)
+    return queryset
+
+
+def _annotated_owner(lookup, annotations):
+    """Самая глубокая аннотируемая связь, внутри которой (или на которой) лежит lookup."""
+    owner = None
+    for path in annotations:
+        if (lookup == path or lookup.startswith(path + '__')) and (owner is None or len(path) > len(owner)):
+            owner = path
+    return owner
+
+
+def _collect_lookups(serializer, model, prefix, many, select, prefetch, annotations):
+    meta = getattr(serializer, 'Meta', None)
+    field_relations = getattr(meta, 'field_relations', {})
+    field_annotations = getattr(meta, 'field_annotations', {})
+    for field in serializer._readable_fields:
+        for lookup in field_relations.get(field.field_name, ()):
+            path, _model, path_many = _relation_path(model, lookup.split('__'))
+            _add_lookup(prefix + path, many or path_many, select, prefetch)
+
+        if field.field_name in field_annotations:
+            _model, expressions = annotations.setdefault('__'.join(prefix), (model, {}))
+            expressions.update(field_annotations[field.field_name])
+
+        if field.source == '*':
+            continue
+        attrs = field.source_attrs
+        # Первичный ключ связи читается из столбца *_id без запроса
+        if isinstance(field, relations.RelatedField) and field.use_pk_only_optimization() and len(attrs) == 1:
+            continue
+
+        path, related_model, path_many = _relation_path(model, attrs)
+        if not path:
+            continue
+        _add_lookup(prefix + path, many or path_many, select, prefetch)
+
+        target = field.child if isinstance(field, serializers.ListSerializer) else field
+        if len(path) == len(attrs) and isinstance(target, serializers.ModelSerializer):
+            _collect_lookups(
+                target, related_model, prefix + path, many or path_many, select, prefetch, annotations,
+            )
+
+
+def _relation_path(model, attrs):
+    """Начало attrs, проходящее по связям модели: (путь, модель в конце пути, есть ли связь ко многим)."""
+    path = []
+    many = False
+    for attr in attrs:
+        if model is None:
+            break
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation:
+            break
+        path.append(attr)
+        many = many or field.one_to_many or field.many_to_many
+        model = field.related_model
+    return path, model, many
+
+
+def _add_lookup(path, many, select, prefetch):
+    if not path:
+        return
+    lookup = '__'.join(path)
+    target = prefetch if many else select
+    if lookup not in target:
+        target.append(lookup)
+
+
+class SparseFieldsetViewMixin:
+    """
+    Примесь к GenericAPIView: ?fields= и ?expand= для безопасных запросов
+    и queryset со связями, нужными полям ответа (optimize_queryset()).
+    """
+
+    def get_field_shape(self):
+        if not hasattr(self, '_field_shape'):
+            request = getattr(self, 'request', None)
+            shape = None
+            if request is not None and request.method in permissions.SAFE_METHODS:
+                fields = request.query_params.get('fields')
+                expand = request.query_params.get('expand')
+                if fields or expand:
+                    shape = parse_field_shape(fields, expand)
+            self._field_shape = shape
+        return self._field_shape
+
+    def get_serializer(self, *args, **kwargs):
+        if issubclass(self.get_serializer_class(), SparseFieldsetMixin):
+            kwargs.setdefault('field_shape', self.get_field_shape())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_response_fields(self):
+        """Имена полей, которые попадут в ответ."""
+        return {field.field_name for field in self.get_serializer()._readable_fields}
+
+    def optimize_queryset(self, queryset):
+        serializer = self.get_serializer()
+        # Действие со своим serializer_class может отдавать объекты другой модели
+        if getattr(getattr(serializer, 'Meta', None), 'model', None) is not queryset.model:
+            return queryset
+        return optimize_queryset(queryset, serializer)
@@ -0,0 +1,249 @@
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.dataset import DEFAULT_PASSWORD
+from core.profiling import percentile
+from assignments.models import Assignment, AssignmentGroup, Submission
+from groups.models import Group
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmarks the main API endpoints against the synthetic dataset '
+        '(see seed_dataset) and compares the results with a baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=30, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per endpoint')
+        parser.add_argument('--prefix', default='seed', help='Username prefix used by seed_dataset')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of the generated users')
+        parser.add_argument('--endpoints', help='Comma separated subset of endpoints to run')
+        parser.add_argument('--output', default='benchmark_results.json', help='Where to write the JSON results')
+        parser.add_argument('--baseline', help='JSON results of a previous run to compare with')
+        parser.add_argument('--threshold', type=float, default=20.0,
+                            help='Allowed p95 latency regression against the baseline, in percent')
+
+    def handle(self, *args, **options):
+        self.client = Client(HTTP_HOST=self._host())
+        self.iterations = options['iterations']
+        self.warmup = options['warmup']
+
+        fixtures = self._fixtures(options['prefix'], options['password'])
+        endpoints = self._endpoints(fixtures)
+        if options['endpoints']:
+            selected = options['endpoints'].split(',')
+            unknown = set(selected) - set(endpoints)
+            if unknown:
+                raise CommandError(f'Unknown endpoints: {", ".join(sorted(unknown))}')
+            endpoints = {name: endpoints[name] for name in selected}
+
+        results = {}
+        for name, (request, mutating) in endpoints.items():
+            results[name] = self._measure(request, mutating)
+            self._print_result(name, results[name])
+
+        report = {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'iterations': self.iterations,
+            'dataset': {
+                'users': User.objects.count(),
+                'groups': Group.objects.count(),
+                'assignments': Assignment.objects.count(),
+                'submissions': Submission.objects.count(),
+            },
+            'endpoints': results,
+        }
+        Path(options['output']).write_text(json.dumps(report, indent=2, ensure_ascii=False))
+        self.stdout.write(f'Results written to {options["output"]}')
+
+        failures = [
+            f'{name}: HTTP {result["status"]}'
+            for name, result in results.items() if result['status'] >= 400
+        ]
+        if options['baseline']:
+            failures += self._compare(results, options['baseline'], options['threshold'])
+        if failures:
+            raise CommandError('Benchmark failed:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Benchmark passed'))
+
+    def _host(self):
+        for host in settings.ALLOWED_HOSTS:
+            if host and host != '*' and not host.startswith('.'):
+                return host
+        return 'localhost'
+
+    def _fixtures(self, prefix, password):
+        """Подбирает из синтетических данных пользователей и объекты для запросов."""
+        users = User.objects.filter(username__startswith=f'{prefix}_u')
+        teacher = (
+            users.filter(role=User.ROLE_TEACHER)
+            .annotate(groups_count=Count('teacher_profile__teaching_groups'))
+            .order_by('-groups_count', 'id')
+            .select_related('teacher_profile')
+            .first()
+        )
+        student = (
+            users.filter(role=User.ROLE_STUDENT)
+            .annotate(groups_count=Count(
+                'student_profile__group_memberships',
+                filter=Q(student_profile__group_memberships__is_active=True),
+            ))
+            .order_by('-groups_count', 'id')
+            .select_related('student_profile')
+            .first()
+        )
+        if teacher is None or student is None:
+            raise CommandError(
+                f'No generated users with prefix "{prefix}". Run "manage.py seed_dataset" first.'
+            )
+
+        group = (
+            Group.objects.filter(teachers__teacher=teacher.teacher_profile)
+            .annotate(members=Count('memberships'))
+            .order_by('-members', 'id')
+            .first()
+        )
+        pending_assignment = (
+            AssignmentGroup.objects.filter(
+                group__memberships__student=student.student_profile,
+                group__memberships__is_active=True,
+            )
+            .exclude(assignment__submissions__student=student.student_profile)
+            .values_list('assignment_id', flat=True)
+            .first()
+        )
+        submission = (
+            Submission.objects.filter(assignment__created_by=teacher.teacher_profile)
+            .values_list('id', flat=True)
+            .first()
+        )
+        return {
+            'teacher': teacher,
+            'student': student,
+            'password': password,
+            'group_id': group.id if group else None,
+            'pending_assignment_id': pending_assignment,
+            'submission_id': submission,
+        }
+
+    def _endpoints(self, fixtures):
+        teacher = self._auth_headers(fixtures['teacher'])
+        student = self._auth_headers(fixtures['student'])
+        client = self.client
+
+        endpoints = {
+            'assignment_list_teacher': (
+                lambda: client.get('/api/assignments/assignments', **teacher), False),
+            'assignment_list_student': (
+                lambda: client.get('/api/assignments/assignments', **student), False),
+            'group_list': (
+                lambda: client.get('/api/groups/groups', **teacher), False),
+            'submission_list': (
+                lambda: client.get('/api/assignments/submissions', **teacher), False),
+            'token_obtain': (
+                lambda: client.post(
+                    '/api/auth/token/',
+                    {'username': fixtures['teacher'].username, 'password': fixtures['password']},
+                    content_type='application/json',
+                ), False),
+        }
+        if fixtures['group_id']:
+            endpoints['group_detail'] = (
+                lambda: client.get(f'/api/groups/groups/{fixtures["group_id"]}', **teacher), False)
+        if fixtures['pending_assignment_id']:
+            endpoints['submission_create'] = (
+                lambda: client.post(
+                    '/api/assignments/submissions',
+                    {'assignment_id': fixtures['pending_assignment_id'], 'comment': 'benchmark'},
+                    content_type='application/json',
+                    **student,
+                ), True)
+        if fixtures['submission_id']:
+            endpoints['submission_grade'] = (
+                lambda: client.patch(
+                    f'/api/assignments/submissions/{fixtures["submission_id"]}/grade',
+                    {'status': Submission.STATUS_GRADED, 'points': 10, 'feedback': 'benchmark'},
+                    content_type='application/json',
+                    **teacher,
+                ), True)
+        return endpoints
+
+    @staticmethod
+    def _auth_headers(user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+
+    def _measure(self, request, mutating):
+        timings = []
+        queries = []
+        status = None
+        for i in range(self.warmup + self.iterations):
+            # Изменяющие запросы выполняются в транзакции, которая откатывается,
+            # чтобы каждая итерация работала с одними и теми же данными
+            with transaction.atomic() if mutating else nullcontext():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = request()
+                    elapsed = time.perf_counter() - started
+                if mutating:
+                    transaction.set_rollback(True)
+            status = response.status_code
+            if i >= self.warmup:
+                timings.append(elapsed * 1000)
+                queries.append(len(captured.captured_queries))
+
+        timings.sort()
+        return {
+            'status': status,
+            'p50_ms': round(percentile(timings, 0.50), 3),
+            'p95_ms': round(percentile(timings, 0.95), 3),
+            'p99_ms': round(percentile(timings, 0.99), 3),
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': max(queries),
+        }
+
+    def _print_result(self, name, result):
+        self.stdout.write(
+            f'{name:<26} HTTP {result["status"]}  '
+            f'p50 {result["p50_ms"]:>9.2f} ms  p95 {result["p95_ms"]:>9.2f} ms  '
+            f'p99 {result["p99_ms"]:>9.2f} ms  queries {result["queries"]}'
+        )
+
+    def _compare(self, results, baseline_path, threshold):
+        try:
+            baseline = json.loads(Path(baseline_path).read_text())['endpoints']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f'Cannot read baseline {baseline_path}: {e}')
+
+        failures = []
+        for name, result in results.items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            allowed = previous['p95_ms'] * (1 + threshold / 100)
+            if result['p95_ms'] > allowed:
+                failures.append(
+                    f'{name}: p95 {result["p95_ms"]:.2f} ms exceeds baseline '
+                    f'{previous["p95_ms"]:.2f} ms by more than {threshold:g}%'
+                )
+            if result['queries'] > previous['queries']:
+                failures.append(
+                    f'{name}: {result["queries"]} queries, baseline had {previous["queries"]}'
+                )
+        return failures
@@ -0,0 +1,120 @@
+import csv
+import io
+import time
+import zlib
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory
+
+from assignments import calendar
+from assignments.models import Submission
+from assignments.serializers import SubmissionSerializer
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.compression import BrotliCodec, GzipCodec, brotli, compress_stream
+from core.fieldsets import optimize_queryset
+from core.renderers import OrjsonRenderer
+
+User = get_user_model()
+
+GZIP_LEVELS = (1, 6, 9)
+BROTLI_QUALITIES = (1, 4, 6, 11)
+# Размер части потокового ответа
+STREAM_CHUNK_SIZE = 8192
+
+
+class Command(BaseCommand):
+    help = (
+        'Reports compressed size and compression CPU time of gzip and brotli levels '
+        'for typical API payloads (paginated lists, a large submission list, a CSV '
+        'export and the iCalendar feed)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Submissions in the large list and CSV')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case, the best one is reported')
+        parser.add_argument('--prefix', default='seed', help='Username prefix used by seed_dataset')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        codecs = [GzipCodec(level) for level in GZIP_LEVELS]
+        if brotli is not None:
+            codecs += [BrotliCodec(quality) for quality in BROTLI_QUALITIES]
+        else:
+            self.stdout.write('brotli is not installed, reporting gzip only')
+
+        for name, body in self._payloads(options).items():
+            self.stdout.write(f'\n{name}: {len(body)} B')
+            for codec in codecs:
+                seconds, compressed = self._best(lambda: codec.compress(body))
+                self._check_stream(codec, body)
+                self.stdout.write(
+                    f'  {codec.name:4} {self._level(codec):2}  {len(compressed):9} B  '
+                    f'{len(compressed) / len(body) * 100:5.1f}%  {seconds * 1000:8.3f} ms  '
+                    f'{len(body) / seconds / 2 ** 20:7.1f} MB/s'
+                )
+        self.stdout.write(
+            f'\nCurrent settings: gzip level {settings.COMPRESSION_GZIP_LEVEL}, '
+            f'brotli quality {settings.COMPRESSION_BROTLI_QUALITY}, '
+            f'min size {settings.COMPRESSION_MIN_SIZE} B'
+        )
+
+    def _payloads(self, options):
+        teacher = User.objects.filter(
+            username__startswith=f'{options["prefix"]}_', role=User.ROLE_TEACHER
+        ).first()
+        if teacher is None:
+            raise CommandError(f'No "{options["prefix"]}_*" teacher found, run seed_dataset first')
+        token = CustomTokenObtainPairSerializer.get_token(teacher).access_token
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {token}', HTTP_HOST='localhost')
+
+        payloads = {}
+        for path in ('/api/groups/groups', '/api/assignments/assignments', '/api/assignments/submissions'):
+            response = client.get(path, HTTP_ACCEPT='application/json', HTTP_ACCEPT_ENCODING='identity')
+            if response.status_code != 200:
+                raise CommandError(f'{path}: HTTP {response.status_code}')
+            payloads[f'{path} (page)'] = response.content
+
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        serializer = SubmissionSerializer(context={'request': request})
+        submissions = optimize_queryset(Submission.objects.order_by('id'), serializer)[:options['rows']]
+        data = SubmissionSerializer(submissions, many=True, context={'request': request}).data
+        payloads[f'submissions list ({len(data)} rows, JSON)'] = OrjsonRenderer().render(data)
+
+        columns = ['id', 'assignment__title', 'student__user__username', 'status', 'points', 'is_late', 'submitted_at']
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in Submission.objects.order_by('id').values_list(*columns)[:options['rows']]:
+            writer.writerow(row)
+        payloads[f'submissions export ({options["rows"]} rows, CSV)'] = buffer.getvalue().encode()
+
+        feed = calendar.get_feed(teacher.pk)
+        if feed is not None:
+            payloads['calendar feed (ics)'] = feed['body'].encode()
+        return payloads
+
+    def _check_stream(self, codec, body):
+        """Потоковое сжатие частями должно распаковываться в исходное тело."""
+        chunks = (body[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(body), STREAM_CHUNK_SIZE))
+        compressed = b''.join(compress_stream(chunks, codec))
+        if codec.name == 'gzip':
+            restored = zlib.decompress(compressed, 31)
+        else:
+            restored = brotli.decompress(compressed)
+        if restored != body:
+            raise CommandError(f'{codec.name} stream does not decompress to the original body')
+
+    @staticmethod
+    def _level(codec):
+        return codec.level if codec.name == 'gzip' else codec.quality
+
+    def _best(self, func):
+        best, result = None, None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
@@ -0,0 +1,137 @@
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.test import Client
+
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.db.pool import discard_pool, get_pool
+from core.profiling import percentile
+
+User = get_user_model()
+
+# Режимы соединений: изменения настроек БД default на время замера
+MODES = {
+    'new': {'CONN_MAX_AGE': 0, 'POOL': None},
+    'persistent': {'CONN_MAX_AGE': 60, 'POOL': None},
+    'pooled': {'CONN_MAX_AGE': 0, 'POOL': 'threads'},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures per-request latency of an API endpoint with a new connection per request, '
+        'persistent connections (CONN_MAX_AGE) and the connection pool (core.db.pool)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=300, help='Measured requests per mode')
+        parser.add_argument('--threads', type=int, default=4, help='Concurrent request threads')
+        parser.add_argument('--path', default='/api/groups/groups', help='Endpoint to request')
+        parser.add_argument('--prefix', default='seed', help='Username prefix used by seed_dataset')
+        parser.add_argument('--modes', default=','.join(MODES), help='Comma separated modes to run')
+
+    def handle(self, *args, **options):
+        modes = options['modes'].split(',')
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f'Unknown modes: {", ".join(sorted(unknown))}')
+        if not hasattr(connections[DEFAULT_DB_ALIAS], 'pool'):
+            raise CommandError('The default database must use a core.db.backends.* engine')
+
+        user = User.objects.filter(
+            username__startswith=f'{options["prefix"]}_', role=User.ROLE_TEACHER
+        ).first()
+        if user is None:
+            raise CommandError(f'No "{options["prefix"]}_*" teacher found, run seed_dataset first')
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        self.headers = {'HTTP_AUTHORIZATION': f'Bearer {token}', 'HTTP_HOST': self._host()}
+
+        settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+        original = {key: settings_dict.get(key) for key in ('CONN_MAX_AGE', 'POOL')}
+        results = {}
+        try:
+            for mode in modes:
+                overrides = dict(MODES[mode])
+                if overrides['POOL'] == 'threads':
+                    overrides['POOL'] = {'MAX_SIZE': options['threads'], 'TIMEOUT': 30}
+                settings_dict.update(overrides)
+                results[mode] = self._measure(options['path'], options['requests'], options['threads'])
+                self._print_result(mode, results[mode])
+        finally:
+            settings_dict.update(original)
+            connections.close_all()
+            discard_pool(DEFAULT_DB_ALIAS)
+
+        baseline = results.get('new')
+        if baseline:
+            for mode, result in results.items():
+                if mode != 'new':
+                    saved = baseline['mean_ms'] - result['mean_ms']
+                    self.stdout.write(f'{mode}: {saved:+.2f} ms per request saved compared with new')
+
+    def _measure(self, path, total, threads):
+        connections.close_all()
+        discard_pool(DEFAULT_DB_ALIAS)
+        durations = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker(count):
+            client = Client(**self.headers)
+            local = []
+            try:
+                for _ in range(count):
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    # Тестовый клиент не закрывает соединения в конце запроса,
+                    # как это делает обработчик request_finished
+                    close_old_connections()
+                    local.append(time.perf_counter() - started)
+                    if response.status_code >= 400:
+                        errors.append(f'HTTP {response.status_code}')
+            except Exception as e:
+                errors.append(repr(e))
+            finally:
+                connections.close_all()
+                with lock:
+                    durations.extend(local)
+
+        per_thread = [total // threads + (1 if i < total % threads else 0) for i in range(threads)]
+        workers = [threading.Thread(target=worker, args=(count,)) for count in per_thread]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        if errors:
+            raise CommandError(f'{len(errors)} request(s) failed, first error: {errors[0]}')
+
+        durations.sort()
+        stats = get_pool(DEFAULT_DB_ALIAS, connections[DEFAULT_DB_ALIAS].settings_dict).stats()
+        return {
+            'requests': len(durations),
+            'mean_ms': sum(durations) * 1000 / len(durations),
+            'p50_ms': percentile(durations, 0.5) * 1000,
+            'p95_ms': percentile(durations, 0.95) * 1000,
+            'connections_created': stats['created'],
+            'connections_reused': stats['reused'],
+            'connect_ms_avg': stats['connect_ms_avg'],
+            'wait_ms_avg': stats['wait_ms_avg'],
+        }
+
+    def _print_result(self, mode, result):
+        self.stdout.write(
+            f'{mode:11} mean {result["mean_ms"]:7.2f} ms  p50 {result["p50_ms"]:7.2f} ms  '
+            f'p95 {result["p95_ms"]:7.2f} ms  connections created {result["connections_created"]:5}  '
+            f'reused {result["connections_reused"]:5}  connect {result["connect_ms_avg"]:.3f} ms  '
+            f'wait {result["wait_ms_avg"]:.3f} ms'
+        )
+
+    def _host(self):
+        for host in settings.ALLOWED_HOSTS:
+            if host and host != '*' and not host.startswith('.'):
+                return host
+        return 'localhost'
@@ -0,0 +1,74 @@
+import gzip
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from assignments.models import Submission
+from assignments.serializers import SubmissionSerializer
+from core.fieldsets import optimize_queryset
+from core.parsers import OrjsonParser
+from core.renderers import MessagePackRenderer, OrjsonRenderer, msgpack, orjson
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares render time and payload size of the stdlib JSON renderer, the orjson '
+        'renderer and the MessagePack renderer (core.renderers) on a large submission list, '
+        'and parse time of the JSON parsers'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5000, help='Submissions in the list')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case, the best one is reported')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson is not installed')
+        self.repeat = options['repeat']
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        serializer = SubmissionSerializer(context={'request': request})
+        submissions = optimize_queryset(Submission.objects.order_by('id'), serializer)[:options['rows']]
+        data = SubmissionSerializer(submissions, many=True, context={'request': request}).data
+        if not data:
+            raise CommandError('The database is empty, run seed_dataset first')
+        self.stdout.write(f'{len(data)} submissions')
+
+        renderers = [('json (stdlib)', JSONRenderer()), ('json (orjson)', OrjsonRenderer())]
+        if msgpack is not None:
+            renderers.append(('msgpack', MessagePackRenderer()))
+        else:
+            self.stdout.write('msgpack is not installed, skipping MessagePack')
+
+        results = {}
+        for name, renderer in renderers:
+            seconds, body = self._best(lambda: renderer.render(data, renderer.media_type, {}))
+            results[name] = body
+            self.stdout.write(
+                f'render {name:14} {seconds * 1000:8.2f} ms  {len(data) / seconds:9.0f} rows/s  '
+                f'size {len(body):9} B  gzip {len(gzip.compress(body, 6)):8} B'
+            )
+
+        baseline = results['json (stdlib)']
+        if results['json (orjson)'] != baseline:
+            raise CommandError('orjson output differs from the stdlib JSON renderer')
+        if 'msgpack' in results and msgpack.unpackb(results['msgpack']) != json.loads(baseline):
+            raise CommandError('MessagePack output does not decode to the same data')
+
+        for name, parser in (('json (stdlib)', JSONParser()), ('json (orjson)', OrjsonParser())):
+            seconds, parsed = self._best(lambda: parser.parse(io.BytesIO(baseline), parser.media_type, {}))
+            self.stdout.write(f'parse  {name:14} {seconds * 1000:8.2f} ms  {len(data) / seconds:9.0f} rows/s')
+        self.stdout.write(self.style.SUCCESS('orjson output is identical to the stdlib JSON renderer'))
+
+    def _best(self, func):
+        best, result = None, None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
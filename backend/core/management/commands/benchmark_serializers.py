@@ -0,0 +1,119 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Prefetch, Q
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from assignments.models import AssignmentGroup, Submission
+from assignments.serializers import (
+    AssignmentGroupSerializer, DeadlineTimelineSerializer, SubmissionSerializer,
+)
+from core.serializers import CompiledListSerializer, compile_values
+from groups.models import Group
+from groups.serializers import GroupSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares rows per second of the standard DRF ListSerializer and the compiled '
+        'read-only fast path (core.serializers) on the synthetic dataset, and checks '
+        'that both produce byte-identical JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows serialized per case')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per case, the best one is reported')
+
+    def handle(self, *args, **options):
+        self.repeat = options['repeat']
+        rows = options['rows']
+        request = RequestFactory().get('/', HTTP_HOST='localhost')
+        self.context = {'request': request}
+
+        # time_remaining зависит от текущего времени - фиксируем его на время замеров
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now()):
+            cases = {
+                'assignment-groups': (AssignmentGroupSerializer, list(
+                    AssignmentGroup.objects.select_related('assignment').prefetch_related(
+                        Prefetch('group', queryset=self._groups())
+                    ).order_by('id')[:rows]
+                )),
+                'submissions': (SubmissionSerializer, list(
+                    Submission.objects.select_related(
+                        'assignment', 'student__user', 'graded_by'
+                    ).prefetch_related('attachments').order_by('id')[:rows]
+                )),
+                'groups': (GroupSerializer, list(
+                    self._groups().order_by('id')[:rows]
+                )),
+            }
+            failures = []
+            for name, (serializer_class, instances) in cases.items():
+                if not instances:
+                    raise CommandError('The database is empty, run seed_dataset first')
+                failures += self._compare_instances(name, serializer_class, instances)
+            failures += self._compare_values(rows)
+
+        if failures:
+            raise CommandError('Output mismatch:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Compiled serializers produce identical output'))
+
+    def _groups(self):
+        return Group.objects.select_related('created_by__user').annotate(
+            _member_count=Count('memberships', filter=Q(memberships__is_active=True), distinct=True),
+            _teacher_count=Count('teachers', filter=Q(teachers__is_active=True), distinct=True),
+        )
+
+    def _compare_instances(self, name, serializer_class, instances):
+        def standard():
+            # Вложенные списки тоже сериализуются стандартным ListSerializer
+            with mock.patch.object(
+                CompiledListSerializer, 'to_representation', serializers.ListSerializer.to_representation
+            ):
+                return serializers.ListSerializer(
+                    instances, child=serializer_class(), context=self.context
+                ).data
+
+        def compiled():
+            return serializer_class(instances, many=True, context=self.context).data
+
+        return self._report(name, len(instances), standard, compiled)
+
+    def _compare_values(self, rows):
+        """Сериализация из строк values() против экземпляров, вместе с загрузкой из БД."""
+        queryset = AssignmentGroup.objects.order_by('effective_deadline', 'id')
+
+        def standard():
+            instances = queryset.select_related('assignment', 'group')[:rows]
+            return DeadlineTimelineSerializer(instances, many=True, context=self.context).data
+
+        def compiled():
+            paths, represent = compile_values(DeadlineTimelineSerializer(context=self.context))
+            return [represent(row) for row in queryset.values(*paths)[:rows]]
+
+        return self._report('timeline (values, incl. query)', rows, standard, compiled)
+
+    def _report(self, name, count, standard, compiled):
+        renderer = JSONRenderer()
+        standard_time, standard_data = self._best(standard)
+        compiled_time, compiled_data = self._best(compiled)
+        identical = renderer.render(standard_data) == renderer.render(compiled_data)
+        self.stdout.write(
+            f'{name:32} rows {count:6}  standard {count / standard_time:9.0f} rows/s  '
+            f'compiled {count / compiled_time:9.0f} rows/s  x{standard_time / compiled_time:.2f}  '
+            f'{"identical" if identical else "DIFFERENT"}'
+        )
+        return [] if identical else [name]
+
+    def _best(self, func):
+        best, data = None, None
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            data = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, data
@@ -0,0 +1,132 @@
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from core.dataset import DEFAULT_PASSWORD
+from groups import models as group_models
+from groups.models import Group
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates thousands of groups from parallel threads in a test database and checks '
+        'that every group gets a unique code with a single INSERT and no lookup queries'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--groups', type=int, default=2000, help='Groups to create in total')
+        parser.add_argument('--workers', type=int, default=8, help='Parallel threads')
+        parser.add_argument('--code-length', type=int, default=3,
+                            help='Code length used during the check; short codes force collisions')
+
+    def handle(self, *args, **options):
+        verbosity = max(options['verbosity'] - 1, 0)
+        self._use_file_test_database()
+        setup_test_environment()
+        old_config = setup_databases(verbosity=verbosity, interactive=False)
+        try:
+            teacher = User.objects.create_user(
+                username='codes_teacher', email='codes_teacher@example.com',
+                password=DEFAULT_PASSWORD, role=User.ROLE_TEACHER,
+            )
+            teacher_id = teacher.teacher_profile.id
+            with mock.patch.object(group_models, 'CODE_LENGTH', options['code_length']):
+                stats, elapsed = self._run(teacher_id, options['groups'], options['workers'])
+            codes = list(Group.objects.values_list('code', flat=True))
+        finally:
+            connection.close()
+            teardown_databases(old_config, verbosity=verbosity)
+            teardown_test_environment()
+
+        self._report(stats, codes, elapsed, options['groups'])
+
+    def _use_file_test_database(self):
+        """SQLite в памяти нельзя открыть из нескольких потоков - используем файл."""
+        settings_dict = connection.settings_dict
+        if connection.vendor == 'sqlite':
+            path = Path(tempfile.gettempdir()) / 'deadline_mate_check_group_codes.sqlite3'
+            settings_dict['TEST'] = {**settings_dict.get('TEST', {}), 'NAME': str(path)}
+            # Потоки ждут блокировку записи, а не завершаются с "database is locked"
+            settings_dict['OPTIONS'] = {**settings_dict.get('OPTIONS', {}), 'timeout': 60}
+
+    def _run(self, teacher_id, total, workers):
+        stats = Counter()
+        errors = []
+        lock = threading.Lock()
+
+        def worker(count, number):
+            local = Counter()
+
+            def count_queries(execute, sql, params, many, context):
+                statement = sql.lstrip().split(None, 1)[0].upper()
+                if statement == 'INSERT' and '"groups_group"' not in sql:
+                    # Запись журнала изменений в той же транзакции
+                    statement = 'INSERT (change log)'
+                local[statement] += 1
+                return execute(sql, params, many, context)
+
+            db = connections['default']
+            if db.vendor == 'sqlite':
+                # Транзакция, начатая BEGIN (DEFERRED), при конкурентной записи сразу
+                # получает "database is locked"; BEGIN IMMEDIATE ждёт блокировку
+                db._start_transaction_under_autocommit = lambda: db.cursor().execute('BEGIN IMMEDIATE')
+            try:
+                with db.execute_wrapper(count_queries):
+                    for i in range(count):
+                        Group.objects.create(name=f'Группа {number}-{i}', created_by_id=teacher_id)
+                        local['groups'] += 1
+            except Exception as e:
+                errors.append(e)
+            finally:
+                db.close()
+                with lock:
+                    stats.update(local)
+
+        per_worker = [total // workers + (1 if i < total % workers else 0) for i in range(workers)]
+        threads = [
+            threading.Thread(target=worker, args=(count, number))
+            for number, count in enumerate(per_worker)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        if errors:
+            raise CommandError(f'{len(errors)} worker(s) failed, first error: {errors[0]!r}')
+        return stats, elapsed
+
+    def _report(self, stats, codes, elapsed, total):
+        inserts = stats['INSERT']
+        lookups = stats['SELECT']
+        duplicates = [code for code, count in Counter(codes).items() if count > 1]
+
+        self.stdout.write(f'Groups created:    {stats["groups"]} in {elapsed:.1f}s')
+        self.stdout.write(f'INSERT statements: {inserts} ({inserts - stats["groups"]} retried on code collision)')
+        self.stdout.write(f'SELECT statements: {lookups}')
+        self.stdout.write(f'Duplicate codes:   {len(duplicates)}')
+
+        failures = []
+        if stats['groups'] != total or len(codes) != total:
+            failures.append(f'expected {total} groups, created {stats["groups"]}, stored {len(codes)}')
+        if duplicates:
+            failures.append(f'duplicate codes: {", ".join(duplicates[:10])}')
+        if lookups:
+            failures.append(f'{lookups} SELECT queries issued while allocating codes')
+        if failures:
+            raise CommandError('Group code allocation check failed:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Group code allocation check passed'))
@@ -0,0 +1,185 @@
+import logging
+import re
+import warnings
+from collections import Counter
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, setup_test_environment,
+    teardown_databases, teardown_test_environment,
+)
+from django.urls import NoReverseMatch, reverse
+
+from assignments.models import AssignmentGroup, Submission
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.dataset import DatasetGenerator
+from core.profiling import fingerprint
+from groups.models import GroupMembership
+
+User = get_user_model()
+
+# Модули с роутерами, маршруты которых проверяются
+ROUTER_MODULES = ['authentication.urls', 'groups.urls', 'assignments.urls']
+
+# Размеры набора данных: во втором каждой записи больше, чем помещается
+# на одной странице пагинации, в первом - меньше
+DATASET_SIZES = {
+    'small': dict(teachers=2, groups=2, students_per_group=3, assignments_per_group=2),
+    'large': dict(teachers=2, groups=8, students_per_group=15, assignments_per_group=6),
+}
+
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'IN \((?:\?, )*\?\)')
+
+
+def normalize_sql(sql):
+    """Заменяет подставленные в запрос значения на плейсхолдеры."""
+    sql = _STRING_LITERAL_RE.sub('?', sql)
+    sql = _NUMBER_LITERAL_RE.sub('?', sql)
+    return fingerprint(_IN_LIST_RE.sub('IN (...)', sql))
+
+
+class Command(BaseCommand):
+    help = (
+        'Requests every GET route registered in the authentication, groups and assignments '
+        'routers on a small and a large dataset and fails when the number of SQL queries '
+        'grows with the number of rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--report-only', action='store_true',
+                            help='Print the report without failing on violations')
+        parser.add_argument('--tolerance', type=int, default=0,
+                            help='Extra queries allowed on the large dataset')
+
+    def handle(self, *args, **options):
+        verbosity = options['verbosity']
+        # Ответы 403/404 для маршрутов, недоступных роли, ожидаемы
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        warnings.filterwarnings('ignore', message='Pagination may yield inconsistent results')
+        setup_test_environment()
+        old_config = setup_databases(verbosity=max(verbosity - 1, 0), interactive=False)
+        try:
+            measurements = {}
+            for size, params in DATASET_SIZES.items():
+                call_command('flush', interactive=False, verbosity=0)
+                DatasetGenerator(seed=1, prefix='budget').generate(**params)
+                self._fill_empty_relations()
+                measurements[size] = self._measure()
+        finally:
+            teardown_databases(old_config, verbosity=max(verbosity - 1, 0))
+            teardown_test_environment()
+
+        violations = self._report(measurements, options['tolerance'])
+        if violations and not options['report_only']:
+            raise CommandError(f'{violations} route(s) issue more queries on the larger dataset')
+        if not violations:
+            self.stdout.write(self.style.SUCCESS('All routes keep a constant number of queries'))
+
+    @staticmethod
+    def _fill_empty_relations():
+        """
+        Добавляет по ответу заданиям без ответов.
+
+        Для пустого списка объектов Django не выполняет запросы prefetch_related,
+        поэтому на малом наборе число запросов было бы занижено.
+        """
+        first_member = {}
+        for group_id, student_id in (
+            GroupMembership.objects.filter(is_active=True).order_by('pk').values_list('group_id', 'student_id')
+        ):
+            first_member.setdefault(group_id, student_id)
+
+        students = {}
+        for assignment_id, group_id in (
+            AssignmentGroup.objects.filter(assignment__submissions__isnull=True)
+            .order_by('pk').values_list('assignment_id', 'group_id')
+        ):
+            if assignment_id not in students and group_id in first_member:
+                students[assignment_id] = first_member[group_id]
+        Submission.objects.bulk_create(
+            Submission(assignment_id=assignment_id, student_id=student_id)
+            for assignment_id, student_id in students.items()
+        )
+
+    def _users(self):
+        return {
+            'teacher': User.objects.get(username='budget_u1_teacher1'),
+            'student': User.objects.get(username='budget_u1_student1'),
+        }
+
+    def _viewsets(self):
+        """Перечисляет GET-маршруты каждого ViewSet роутеров: [(имя URL, detail), ...]."""
+        for module in ROUTER_MODULES:
+            router = import_module(module).router
+            for prefix, viewset, basename in router.registry:
+                yield [
+                    (route.name.format(basename=basename), route.detail)
+                    for route in router.get_routes(viewset)
+                    if 'get' in route.mapping
+                ]
+
+    def _measure(self):
+        client = Client()
+        results = {}
+        for role, user in self._users().items():
+            headers = {'HTTP_AUTHORIZATION': f'Bearer {CustomTokenObtainPairSerializer.get_token(user).access_token}'}
+            for routes in self._viewsets():
+                # Для detail-маршрутов используется первый объект из списка того же ViewSet
+                object_id = None
+                for name, detail in routes:
+                    try:
+                        url = reverse(name, kwargs={'pk': object_id} if detail else None)
+                    except NoReverseMatch:
+                        continue
+                    with CaptureQueriesContext(connection) as captured:
+                        response = client.get(url, **headers)
+                    if response.status_code != 200:
+                        continue
+                    if name.endswith('-list'):
+                        object_id = self._first_id(response)
+                    results[(name, role)] = Counter(
+                        normalize_sql(query['sql']) for query in captured.captured_queries
+                    )
+        return results
+
+    @staticmethod
+    def _first_id(response):
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        if isinstance(data, dict):
+            data = data.get('results', [])
+        if isinstance(data, list) and data and isinstance(data[0], dict):
+            return data[0].get('id')
+        return None
+
+    def _report(self, measurements, tolerance):
+        small, large = measurements['small'], measurements['large']
+        violations = 0
+        for key in sorted(set(small) & set(large)):
+            name, role = key
+            small_count = sum(small[key].values())
+            large_count = sum(large[key].values())
+            line = f'{name} [{role}]: {small_count} -> {large_count} queries'
+            if large_count <= small_count + tolerance:
+                self.stdout.write(f'  ok    {line}')
+                continue
+
+            violations += 1
+            self.stdout.write(self.style.ERROR(f'  FAIL  {line}'))
+            grown = large[key] - small[key]
+            for sql, extra in grown.most_common(5):
+                self.stdout.write(f'          +{extra} x {sql[:300]}')
+
+        skipped = sorted(set(small) ^ set(large))
+        for name, role in skipped:
+            self.stdout.write(f'  skip  {name} [{role}]: not available on both datasets')
+        return violations
@@ -0,0 +1,109 @@
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client, override_settings
+from django.test.utils import (
+    setup_databases, setup_test_environment, teardown_databases, teardown_test_environment,
+)
+
+from authentication.serializers import CustomTokenObtainPairSerializer
+from core.dataset import DEFAULT_PASSWORD
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs requests against a test database and checks which connection serves them: '
+        'safe requests read from replicas, writes and reads right after a user\'s own write '
+        'go to the primary database. Requires configured replicas, e.g. '
+        'SQLITE_REPLICAS=/tmp/replica.sqlite3'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lag', type=float, default=1.0,
+                            help='DATABASE_REPLICA_LAG used during the check, seconds')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError(
+                'No replicas configured: set SQLITE_REPLICAS (SQLite) or DB_REPLICA_HOSTS (PostgreSQL)'
+            )
+
+        verbosity = max(options['verbosity'] - 1, 0)
+        setup_test_environment()
+        # Реплики в тестах - зеркала тестовой основной БД (TEST MIRROR)
+        old_config = setup_databases(verbosity=verbosity, interactive=False)
+        try:
+            with override_settings(DATABASE_REPLICA_LAG=options['lag']):
+                failures = self._check(options['lag'])
+        finally:
+            for connection in connections.all():
+                connection.close()
+            teardown_databases(old_config, verbosity=verbosity)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError('Replica routing check failed:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Replica routing check passed'))
+
+    def _check(self, lag):
+        teacher = User.objects.create_user(
+            username='replica_teacher', email='replica_teacher@example.com',
+            password=DEFAULT_PASSWORD, role=User.ROLE_TEACHER,
+        )
+        student = User.objects.create_user(
+            username='replica_student', email='replica_student@example.com',
+            password=DEFAULT_PASSWORD, role=User.ROLE_STUDENT,
+        )
+        teacher_client = self._client(teacher)
+        student_client = self._client(student)
+
+        steps = [
+            ('teacher GET', lambda: teacher_client.get('/api/groups/groups'), 'replica'),
+            ('teacher POST', lambda: teacher_client.post(
+                '/api/groups/groups', {'name': 'Replica group'}, content_type='application/json'
+            ), 'primary'),
+            ('teacher GET after own write', lambda: teacher_client.get('/api/groups/groups'), 'primary'),
+            ('student GET', lambda: student_client.get('/api/groups/groups'), 'replica'),
+            ('teacher GET after replica lag', lambda: (
+                time.sleep(lag + 0.1), teacher_client.get('/api/groups/groups'))[1], 'replica'),
+        ]
+
+        failures = []
+        for name, request, expected in steps:
+            status_code, queries = self._run(request)
+            primary = queries[DEFAULT_DB_ALIAS]
+            replica = sum(count for alias, count in queries.items() if alias != DEFAULT_DB_ALIAS)
+            self.stdout.write(f'{name:32} HTTP {status_code}  primary: {primary:3}  replicas: {replica:3}')
+            if status_code >= 400:
+                failures.append(f'{name}: HTTP {status_code}')
+            elif expected == 'replica' and (primary or not replica):
+                failures.append(f'{name}: expected reads from replicas, {primary} queries hit the primary')
+            elif expected == 'primary' and replica:
+                failures.append(f'{name}: expected the primary database, {replica} queries hit replicas')
+        return failures
+
+    def _client(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _run(self, request):
+        queries = Counter()
+
+        def wrapper_for(alias):
+            def count(execute, sql, params, many, context):
+                queries[alias] += 1
+                return execute(sql, params, many, context)
+            return count
+
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(wrapper_for(alias)))
+            response = request()
+        return response.status_code, queries
@@ -0,0 +1,50 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+from django.utils import timezone
+
+from core import changelog
+from core.models import ChangeLogCheckpoint, ChangeLogEntry
+
+
+class Command(BaseCommand):
+    help = (
+        'Compacts the change log: deletes entries older than CHANGE_LOG_RETENTION_DAYS and '
+        'intermediate updates older than CHANGE_LOG_COMPACT_AFTER_HOURS that have a later '
+        'entry for the same object; reports consumer lag'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention-days', type=int, default=None,
+            help='Retention in days (default: CHANGE_LOG_RETENTION_DAYS)',
+        )
+        parser.add_argument(
+            '--compact-after-hours', type=int, default=None,
+            help='Age in hours after which superseded updates are removed '
+                 '(default: CHANGE_LOG_COMPACT_AFTER_HOURS)',
+        )
+
+    def handle(self, *args, **options):
+        days = options['retention_days']
+        if days is None:
+            days = settings.CHANGE_LOG_RETENTION_DAYS
+        hours = options['compact_after_hours']
+        if hours is None:
+            hours = settings.CHANGE_LOG_COMPACT_AFTER_HOURS
+        now = timezone.now()
+
+        pruned = changelog.prune(now - timedelta(days=days))
+        self.stdout.write(f'Deleted {pruned} entries older than {days} days')
+        compacted = changelog.compact(now - timedelta(hours=hours))
+        self.stdout.write(f'Deleted {compacted} superseded updates older than {hours} hours')
+
+        head = ChangeLogEntry.objects.aggregate(head=Max('pk'))['head'] or 0
+        self.stdout.write(f'Log head: {head}')
+        for checkpoint in ChangeLogCheckpoint.objects.order_by('consumer'):
+            lag = ChangeLogEntry.objects.filter(pk__gt=checkpoint.position).count()
+            self.stdout.write(
+                f'  {checkpoint.consumer}: position {checkpoint.position}, {lag} entries behind'
+            )
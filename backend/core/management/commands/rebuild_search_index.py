@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.search import ensure_search_indexes, get_backend
+
+
+class Command(BaseCommand):
+    help = 'Recreates missing full-text search triggers and refills the search tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if get_backend(connection) is None:
+            raise CommandError(f'Full-text search is not supported on {connection.vendor}')
+        rebuilt = ensure_search_indexes(connection, rebuild=True)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search indexes: {", ".join(rebuilt)}'))
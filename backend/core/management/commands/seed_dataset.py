@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.dataset import DEFAULT_PASSWORD, DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Seeds the database with a synthetic university dataset '
+        '(users, groups, memberships, assignments and submissions) using bulk inserts; '
+        'the inserted rows are not written to the change log'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--universities', type=int, default=1, help='Number of universities to create')
+        parser.add_argument('--teachers', type=int, default=20, help='Teachers per university')
+        parser.add_argument('--groups', type=int, default=40, help='Groups per university')
+        parser.add_argument('--students-per-group', type=int, default=25, help='Students in each main group')
+        parser.add_argument('--assignments-per-group', type=int, default=10, help='Assignments created for each group')
+        parser.add_argument('--elective-rate', type=float, default=0.2,
+                            help='Share of students that also join a second group')
+        parser.add_argument('--submission-rate', type=float, default=0.8,
+                            help='Share of students submitting an assignment after its deadline')
+        parser.add_argument('--late-rate', type=float, default=0.15, help='Share of late submissions')
+        parser.add_argument('--graded-rate', type=float, default=0.6, help='Share of graded submissions')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument('--prefix', default='seed', help='Username prefix of generated users')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Password of every generated user')
+        parser.add_argument('--batch-size', type=int, default=2000, help='bulk_create batch size')
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously generated users with the same prefix first')
+
+    def handle(self, *args, **options):
+        generator = DatasetGenerator(
+            seed=options['seed'],
+            password=options['password'],
+            prefix=options['prefix'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+
+        existing = generator.existing_users()
+        if existing.exists():
+            if not options['clear']:
+                raise CommandError(
+                    f'Users with prefix "{options["prefix"]}" already exist. '
+                    'Use --clear to remove them or choose another --prefix.'
+                )
+            self.stdout.write('Deleting previously generated data...')
+            existing.delete()
+
+        started = time.perf_counter()
+        counts = generator.generate(
+            universities=options['universities'],
+            teachers=options['teachers'],
+            groups=options['groups'],
+            students_per_group=options['students_per_group'],
+            assignments_per_group=options['assignments_per_group'],
+            elective_rate=options['elective_rate'],
+            submission_rate=options['submission_rate'],
+            late_rate=options['late_rate'],
+            graded_rate=options['graded_rate'],
+        )
+        elapsed = time.perf_counter() - started
+
+        for label, count in counts.items():
+            self.stdout.write(f'  {label}: {count}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Successfully generated dataset in {elapsed:.1f}s '
+            f'(password for all users: {options["password"]})'
+        ))
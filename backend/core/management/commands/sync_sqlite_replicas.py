@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Copies the default SQLite database into the SQLite read replicas (SQLITE_REPLICAS). '
+        'With --interval the copy is repeated, which emulates replication lag locally'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Repeat the copy every N seconds until interrupted')
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('Replicas are synchronised by the database server, not by this command')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('No replicas configured, set SQLITE_REPLICAS=path[,path...]')
+
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                self._copy(alias)
+            self.stdout.write(
+                f'Synchronised {len(settings.DATABASE_REPLICAS)} replica(s) '
+                f'in {(time.perf_counter() - started) * 1000:.0f} ms'
+            )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
+
+    def _copy(self, alias):
+        connections[alias].close()
+        source = sqlite3.connect(str(settings.DATABASES[DEFAULT_DB_ALIAS]['NAME']))
+        target = sqlite3.connect(str(settings.DATABASES[alias]['NAME']))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
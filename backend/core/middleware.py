@@ -0,0 +1,187 @@
+import random
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from .compression import (
+    available_codecs, compress_async_stream, compress_stream, is_compressible, negotiate_codec,
+)
+from .db_routing import is_stuck_to_primary, read_from_replica, stick_to_primary
+from .profiling import RequestProfile, current_profile, install_serialization_timing, registry
+
+
+class QueryProfilerMiddleware:
+    """
+    Профилирует SQL-запросы каждого HTTP-запроса и агрегирует статистику
+    по имени URL (см. core.profiling).
+
+    Включается настройкой QUERY_PROFILER_ENABLED. Запросы к БД перехватываются
+    через execute_wrapper, поэтому DEBUG не требуется, а накладные расходы
+    ограничиваются счетчиками; время сериализации замеряется обёрткой
+    serializer.data. QUERY_PROFILER_SAMPLE_RATE позволяет профилировать только
+    часть запросов.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'QUERY_PROFILER_SAMPLE_RATE', 1.0)
+        registry.window = getattr(settings, 'QUERY_PROFILER_WINDOW', registry.window)
+        install_serialization_timing()
+
+    def __call__(self, request):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        request._query_profile = profile
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+
+        duration = perf_counter() - profile.started_at
+        registry.record(self._endpoint_name(request), duration, profile, response.status_code)
+        return response
+
+    def process_template_response(self, request, response):
+        """Замеряет время рендеринга ответов DRF (renderer, без построения serializer.data)."""
+        profile = getattr(request, '_query_profile', None)
+        if profile is not None:
+            profile.start_render()
+            response.add_post_render_callback(profile.finish_render)
+        return response
+
+    @staticmethod
+    def _endpoint_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return '<unresolved>'
+        return match.view_name or match._func_path
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Направляет чтение безопасных запросов (GET, HEAD, OPTIONS) на реплики БД
+    (см. core.db_routing).
+
+    После пишущего запроса пользователя его запросы на DATABASE_REPLICA_LAG
+    секунд читают из основной БД. Пользователь определяется по user_id из
+    JWT без проверки подписи: поддельный токен может лишь отправить чтение
+    на основную БД. Представления, помеченные read_only_view, считаются
+    безопасными при любом методе. Без настроенных реплик middleware отключается.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'DATABASE_REPLICAS', None):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = self._token_user_id(request)
+        if request.method not in self.SAFE_METHODS and not self._is_read_only(request):
+            try:
+                return self.get_response(request)
+            finally:
+                if user_id is not None:
+                    stick_to_primary(user_id)
+
+        use_replica = user_id is None or not is_stuck_to_primary(user_id)
+        with read_from_replica(use_replica):
+            return self.get_response(request)
+
+    @staticmethod
+    def _is_read_only(request):
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return getattr(match.func, 'read_only', False)
+
+    @staticmethod
+    def _token_user_id(request):
+        import jwt
+        from rest_framework_simplejwt.settings import api_settings
+
+        parts = request.META.get('HTTP_AUTHORIZATION', '').split()
+        if len(parts) != 2 or parts[0] not in api_settings.AUTH_HEADER_TYPES:
+            return None
+        try:
+            payload = jwt.decode(parts[1], options={'verify_signature': False})
+        except jwt.PyJWTError:
+            return None
+        return payload.get(api_settings.USER_ID_CLAIM)
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы gzip или brotli по Accept-Encoding клиента (см. core.compression).
+
+    Не сжимаются ответы меньше COMPRESSION_MIN_SIZE байт, уже сжатые и
+    несжимаемые типы содержимого, а также пути из COMPRESSION_EXCLUDE_PATHS
+    (ответы с токенами: сжатие секретов рядом с данными из запроса открывает
+    атаку BREACH). Потоковые ответы сжимаются по частям без буферизации
+    всего тела. Уровни сжатия - COMPRESSION_GZIP_LEVEL и
+    COMPRESSION_BROTLI_QUALITY.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'COMPRESSION_ENABLED', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.exclude_paths = tuple(getattr(settings, 'COMPRESSION_EXCLUDE_PATHS', ()))
+        self.codecs = available_codecs(
+            gzip_level=getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6),
+            brotli_quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4),
+        )
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self._should_compress(request, response):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate_codec(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.codecs)
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_async_stream(response.streaming_content, codec)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, codec)
+            del response.headers['Content-Length']
+        else:
+            compressed = codec.compress(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # Сжатое тело отличается от исходного побайтно
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = codec.name
+        return response
+
+    def _should_compress(self, request, response):
+        if response.status_code in (204, 206, 304) or response.has_header('Content-Encoding'):
+            return False
+        if not response.streaming and len(response.content) < self.min_size:
+            return False
+        if self.exclude_paths and request.path.startswith(self.exclude_paths):
+            return False
+        return is_compressible(response.get('Content-Type'))
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from core.search import drop_search_indexes, ensure_search_indexes
+
+
+def create_search_indexes(apps, schema_editor):
+    ensure_search_indexes(schema_editor.connection)
+
+
+def remove_search_indexes(apps, schema_editor):
+    drop_search_indexes(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0003_customuser_tokens_valid_after'),
+        ('groups', '0002_groupteacher'),
+        ('assignments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, remove_search_indexes),
+    ]
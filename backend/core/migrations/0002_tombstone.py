@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:08
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100, verbose_name='Модель')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор')),
+                ('group_id', models.BigIntegerField(blank=True, null=True, verbose_name='Группа')),
+                ('assignment_id', models.BigIntegerField(blank=True, null=True, verbose_name='Задание')),
+                ('student_id', models.BigIntegerField(blank=True, null=True, verbose_name='Студент')),
+                ('teacher_id', models.BigIntegerField(blank=True, null=True, verbose_name='Преподаватель')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата удаления')),
+            ],
+            options={
+                'verbose_name': 'Отметка удаления',
+                'verbose_name_plural': 'Отметки удаления',
+                'indexes': [models.Index(fields=['deleted_at'], name='tombstone_deleted_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:14
+
+from django.db import migrations, models
+import django.utils.timezone
+
+# Коды моделей журнала (change_log_code) на момент миграции
+MODEL_CODES = {
+    'assignments.assignment': 1,
+    'assignments.assignmentgroup': 2,
+    'assignments.submission': 3,
+    'groups.group': 4,
+    'groups.groupmembership': 5,
+    'groups.groupteacher': 6,
+}
+DELETE = 3
+
+
+def copy_tombstones(apps, schema_editor):
+    Tombstone = apps.get_model('core', 'Tombstone')
+    ChangeLogEntry = apps.get_model('core', 'ChangeLogEntry')
+    alias = schema_editor.connection.alias
+    ChangeLogEntry.objects.using(alias).bulk_create([
+        ChangeLogEntry(
+            model=MODEL_CODES[tombstone.model], object_id=tombstone.object_id, action=DELETE,
+            group_id=tombstone.group_id, assignment_id=tombstone.assignment_id,
+            student_id=tombstone.student_id, teacher_id=tombstone.teacher_id,
+            created_at=tombstone.deleted_at,
+        )
+        for tombstone in Tombstone.objects.using(alias).order_by('deleted_at', 'pk')
+        if tombstone.model in MODEL_CODES
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLogCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(max_length=100, unique=True, verbose_name='Потребитель')),
+                ('position', models.BigIntegerField(default=0, verbose_name='Позиция')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Позиция потребителя журнала',
+                'verbose_name_plural': 'Позиции потребителей журнала',
+            },
+        ),
+        migrations.CreateModel(
+            name='ChangeLogEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.PositiveSmallIntegerField(verbose_name='Код модели')),
+                ('object_id', models.BigIntegerField(verbose_name='Идентификатор')),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Создание'), (2, 'Изменение'), (3, 'Удаление')], verbose_name='Действие')),
+                ('group_id', models.BigIntegerField(blank=True, null=True, verbose_name='Группа')),
+                ('assignment_id', models.BigIntegerField(blank=True, null=True, verbose_name='Задание')),
+                ('student_id', models.BigIntegerField(blank=True, null=True, verbose_name='Студент')),
+                ('teacher_id', models.BigIntegerField(blank=True, null=True, verbose_name='Преподаватель')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Время изменения')),
+            ],
+            options={
+                'verbose_name': 'Запись журнала изменений',
+                'verbose_name_plural': 'Журнал изменений',
+            },
+        ),
+        migrations.RunPython(copy_tombstones, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='Tombstone',
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['created_at'], name='changelog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='changelogentry',
+            index=models.Index(fields=['model', 'object_id', 'id'], name='changelog_object_idx'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+from django.db import models, router, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Запись журнала изменений предметных данных (см. core.changelog).
+
+    Пишется в той же транзакции, что и изменение строки, поэтому изменение
+    без записи (и запись без изменения) невозможны. Идентификатор записи -
+    позиция в журнале. Строка компактна: код модели, идентификатор объекта,
+    действие и идентификаторы, по которым потребители определяют, кого
+    касается изменение (группа, задание, студент, преподаватель).
+    """
+    CREATE = 1
+    UPDATE = 2
+    DELETE = 3
+
+    ACTION_CHOICES = [
+        (CREATE, _('Создание')),
+        (UPDATE, _('Изменение')),
+        (DELETE, _('Удаление')),
+    ]
+
+    model = models.PositiveSmallIntegerField(verbose_name=_('Код модели'))
+    object_id = models.BigIntegerField(verbose_name=_('Идентификатор'))
+    action = models.PositiveSmallIntegerField(choices=ACTION_CHOICES, verbose_name=_('Действие'))
+    group_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('Группа'))
+    assignment_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('Задание'))
+    student_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('Студент'))
+    teacher_id = models.BigIntegerField(null=True, blank=True, verbose_name=_('Преподаватель'))
+    created_at = models.DateTimeField(default=timezone.now, verbose_name=_('Время изменения'))
+
+    class Meta:
+        verbose_name = _('Запись журнала изменений')
+        verbose_name_plural = _('Журнал изменений')
+        indexes = [
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+            # Поиск более поздних записей того же объекта при уплотнении
+            models.Index(fields=['model', 'object_id', 'id'], name='changelog_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"#{self.pk} {self.get_action_display()} {self.model}:{self.object_id}"
+
+
+class ChangeLogCheckpoint(models.Model):
+    """Позиция, до которой потребитель журнала изменений обработал записи."""
+    consumer = models.CharField(max_length=100, unique=True, verbose_name=_('Потребитель'))
+    position = models.BigIntegerField(default=0, verbose_name=_('Позиция'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Дата обновления'))
+
+    class Meta:
+        verbose_name = _('Позиция потребителя журнала')
+        verbose_name_plural = _('Позиции потребителей журнала')
+
+    def __str__(self):
+        return f"{self.consumer}: {self.position}"
+
+
+class ChangeLoggedModel(models.Model):
+    """
+    Модель, изменения которой пишутся в журнал изменений.
+
+    save() сохраняет строку и запись журнала в одной транзакции. Удаления
+    записывают обработчики post_delete (удаление, в том числе каскадное,
+    выполняется в транзакции), изменения через QuerySet.update() и
+    bulk_create() - явный вызов record_changes(), без него они в журнал не
+    попадают. Подклассы задают неизменный change_log_code и change_log_scope().
+    """
+    change_log_code = None
+
+    class Meta:
+        abstract = True
+
+    def change_log_scope(self):
+        """Идентификаторы group_id, assignment_id, student_id, teacher_id, касающиеся объекта."""
+        return {}
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        action = ChangeLogEntry.CREATE if self._state.adding else ChangeLogEntry.UPDATE
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+            record_changes([self], action, using=using)
+
+
+def record_changes(instances, action, using=None):
+    """Записывает в журнал изменение объектов instances (одной или разных моделей)."""
+    ChangeLogEntry.objects.using(using).bulk_create([
+        ChangeLogEntry(
+            model=instance.change_log_code, object_id=instance.pk, action=action,
+            **instance.change_log_scope()
+        )
+        for instance in instances
+    ])
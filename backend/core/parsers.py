@@ -0,0 +1,29 @@
+"""
+Парсер JSON на orjson.
+
+Разбирает тела в UTF-8 через orjson; остальные кодировки, числа вне
+64-битного диапазона и ошибки разбора передаются стандартному JSONParser,
+поэтому результат и сообщения об ошибках те же, что у DRF.
+"""
+import io
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from .renderers import OrjsonRenderer, orjson
+
+
+class OrjsonParser(JSONParser):
+    renderer_class = OrjsonRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
@@ -0,0 +1,26 @@
+from rest_framework import permissions
+from rest_framework.filters import BaseFilterBackend
+
+
+class ScopedPermission(permissions.BasePermission):
+    """
+    Разрешение, правило которого можно применить ко всему queryset сразу.
+
+    filter_queryset() сужает queryset до объектов, доступных пользователю,
+    поэтому списки не проверяют права для каждого объекта отдельно.
+    has_object_permission() должен проверять объект по данным AccessContext,
+    не обращаясь к БД.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return queryset
+
+
+class ScopedPermissionFilter(BaseFilterBackend):
+    """Применяет filter_queryset() всех ScopedPermission представления."""
+
+    def filter_queryset(self, request, queryset, view):
+        for permission in view.get_permissions():
+            if isinstance(permission, ScopedPermission):
+                queryset = permission.filter_queryset(request, queryset, view)
+        return queryset
@@ -0,0 +1,230 @@
+"""
+Сбор статистики SQL-запросов по эндпоинтам API.
+
+Для каждого запроса считается количество SQL-запросов, суммарное время в БД,
+повторяющиеся запросы (сигнатуры N+1), время сериализации (построения
+serializer.data, включая выполненные при этом SQL-запросы) и время
+рендеринга ответа. Результаты агрегируются по имени URL в скользящем окне
+последних запросов.
+"""
+import re
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from time import perf_counter
+
+# Списки параметров IN (%s, %s, ...) разной длины сводятся к одной сигнатуре
+_IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+
+# Границы корзин гистограмм
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+DURATION_MS_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500)
+
+# Сколько сигнатур повторяющихся запросов хранить для одного эндпоинта
+MAX_SIGNATURES_PER_ENDPOINT = 50
+
+# Профиль текущего запроса для замера времени сериализации
+current_profile = ContextVar('current_profile', default=None)
+
+
+def fingerprint(sql):
+    """Возвращает сигнатуру SQL-запроса без учета значений параметров."""
+    return _IN_LIST_RE.sub('IN (...)', sql)
+
+
+def percentile(sorted_values, fraction):
+    """Возвращает перцентиль (0..1) по заранее отсортированному списку."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def histogram(values, buckets):
+    """Распределяет значения по корзинам с верхними границами buckets."""
+    counts = [0] * (len(buckets) + 1)
+    for value in values:
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+    labels = [f'<={bound}' for bound in buckets] + [f'>{buckets[-1]}']
+    return dict(zip(labels, counts))
+
+
+class RequestProfile:
+    """
+    Профиль одного HTTP-запроса.
+
+    Экземпляр используется как execute_wrapper соединения с БД, поэтому
+    на каждый SQL-запрос приходится только пара операций со счетчиками.
+    """
+    __slots__ = (
+        'started_at', 'queries', 'db_time', 'signatures', 'render_started_at', 'render_time',
+        'serialization_time', 'serializing',
+    )
+
+    def __init__(self):
+        self.started_at = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.signatures = Counter()
+        self.render_started_at = None
+        self.render_time = 0.0
+        self.serialization_time = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - start
+            self.queries += 1
+            self.signatures[sql] += 1
+
+    def start_render(self):
+        self.render_started_at = perf_counter()
+
+    def finish_render(self, response=None):
+        if self.render_started_at is not None:
+            self.render_time = perf_counter() - self.render_started_at
+
+    def measure_serialization(self, build):
+        """Выполняет build() (serializer.data) и прибавляет его время к времени сериализации."""
+        # Вложенные serializer.data (например, в SerializerMethodField) уже входят во внешний
+        if self.serializing:
+            return build()
+        self.serializing = True
+        start = perf_counter()
+        try:
+            return build()
+        finally:
+            self.serialization_time += perf_counter() - start
+            self.serializing = False
+
+    def duplicates(self):
+        """Возвращает сигнатуры запросов, выполненных более одного раза."""
+        result = Counter()
+        for sql, count in self.signatures.items():
+            if count > 1:
+                result[fingerprint(sql)] += count
+        return result
+
+
+class EndpointStats:
+    """Скользящая статистика одного эндпоинта."""
+
+    def __init__(self, window):
+        self.requests = 0
+        self.samples = deque(maxlen=window)
+        self.duplicate_signatures = Counter()
+
+    def add(self, duration, profile, status_code, duplicates):
+        self.requests += 1
+        self.samples.append((
+            duration * 1000,
+            profile.queries,
+            profile.db_time * 1000,
+            profile.render_time * 1000,
+            status_code,
+            profile.serialization_time * 1000,
+        ))
+        if duplicates:
+            self.duplicate_signatures.update(duplicates)
+            if len(self.duplicate_signatures) > MAX_SIGNATURES_PER_ENDPOINT * 2:
+                self.duplicate_signatures = Counter(
+                    dict(self.duplicate_signatures.most_common(MAX_SIGNATURES_PER_ENDPOINT))
+                )
+
+    def summary(self):
+        samples = list(self.samples)
+        durations = sorted(s[0] for s in samples)
+        queries = sorted(s[1] for s in samples)
+        db_times = sorted(s[2] for s in samples)
+        render_times = sorted(s[3] for s in samples)
+        serialization_times = sorted(s[5] for s in samples)
+
+        def describe(values, digits=2):
+            if not values:
+                return {}
+            return {
+                'avg': round(sum(values) / len(values), digits),
+                'p50': round(percentile(values, 0.50), digits),
+                'p95': round(percentile(values, 0.95), digits),
+                'p99': round(percentile(values, 0.99), digits),
+                'max': round(values[-1], digits),
+            }
+
+        return {
+            'requests': self.requests,
+            'window': len(samples),
+            'errors': sum(1 for s in samples if s[4] >= 500),
+            'duration_ms': describe(durations),
+            'queries': describe(queries, 1),
+            'db_time_ms': describe(db_times),
+            'serialization_ms': describe(serialization_times),
+            'render_ms': describe(render_times),
+            'duration_histogram': histogram(durations, DURATION_MS_BUCKETS),
+            'query_histogram': histogram(queries, QUERY_COUNT_BUCKETS),
+            'duplicate_queries': [
+                {'sql': sql, 'count': count}
+                for sql, count in self.duplicate_signatures.most_common(10)
+            ],
+        }
+
+
+class QueryStatsRegistry:
+    """Потокобезопасное хранилище статистики по эндпоинтам внутри процесса."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, duration, profile, status_code):
+        duplicates = profile.duplicates()
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(self.window)
+            stats.add(duration, profile, status_code, duplicates)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: stats.summary()
+                for name, stats in sorted(self._endpoints.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+
+registry = QueryStatsRegistry()
+
+
+def install_serialization_timing():
+    """
+    Оборачивает Serializer.data и ListSerializer.data DRF замером времени в
+    профиле текущего запроса (current_profile). Вне профилируемого запроса
+    обёртка лишь читает ContextVar.
+    """
+    from rest_framework import serializers
+
+    for cls in (serializers.Serializer, serializers.ListSerializer):
+        data = cls.__dict__['data']
+        if getattr(data.fget, 'profiled', False):
+            continue
+
+        def fget(self, _fget=data.fget):
+            profile = current_profile.get()
+            if profile is None:
+                return _fget(self)
+            return profile.measure_serialization(lambda: _fget(self))
+
+        fget.profiled = True
+        cls.data = property(fget, doc=data.__doc__)
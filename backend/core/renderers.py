@@ -0,0 +1,69 @@
+"""
+Рендереры API.
+
+OrjsonRenderer выдаёт тот же JSON, что и JSONRenderer DRF, но кодирует его
+orjson. Типы, которые orjson записал бы иначе (datetime, Decimal, ленивые
+строки и т. п.), передаются в encoders.JSONEncoder DRF. Отступы, ASCII-вывод
+и числа вне 64-битного диапазона обрабатываются стандартным JSONRenderer;
+без установленного orjson используется только он.
+
+MessagePackRenderer выбирается клиентом заголовком
+Accept: application/msgpack (или ?format=msgpack) и доступен при
+установленном msgpack.
+"""
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+_encoder = JSONEncoder()
+
+if orjson is not None:
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def encode_default(obj):
+    """Преобразует значения, которые orjson и msgpack не кодируют так же, как JSONEncoder DRF."""
+    return _encoder.default(obj)
+
+
+class OrjsonRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=encode_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Например, целые числа больше 64 бит
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как и JSONRenderer, экранируем U+2028 и U+2029 (в UTF-8 начинаются с E2 80)
+        if b'\xe2\x80' in ret:
+            ret = ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+        return ret
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
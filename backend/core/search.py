@@ -0,0 +1,374 @@
+"""
+Полнотекстовый поиск по группам, заданиям и студентам.
+
+Для каждого индекса создаётся отдельная таблица search_<имя>, которую
+поддерживают в актуальном состоянии триггеры на исходных таблицах:
+
+- PostgreSQL: столбец tsvector с GIN-индексом; документ строится сразу для
+  русской и английской конфигураций, поэтому работает стемминг обоих языков;
+- SQLite: виртуальная таблица FTS5 (токенизатор porter поверх unicode61:
+  стемминг английского, регистронезависимый поиск по кириллице).
+
+Каждое слово запроса ищется как префикс, результаты сортируются по
+релевантности. Для других СУБД FullTextSearchFilter работает как обычный
+SearchFilter DRF.
+"""
+import re
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+# Максимальное число слов поискового запроса
+MAX_SEARCH_TERMS = 8
+
+# Веса столбцов a, b, c для bm25() в SQLite (аналог весов A, B, C в PostgreSQL)
+SQLITE_WEIGHTS = (10.0, 4.0, 1.0)
+
+PG_CONFIGS = ('russian', 'english')
+
+_TERM_RE = re.compile(r'\w+')
+
+
+class SearchIndex:
+    """
+    Описание поискового индекса.
+
+    source - SELECT, возвращающий столбцы (id, a, b, c) для объектов, id которых
+    входят в подзапрос {keys}; a, b, c - тексты в порядке убывания веса.
+    dependencies - таблицы, изменения которых обновляют индекс:
+    (таблица, SELECT id объектов индекса по строке {row}, отслеживаемые столбцы,
+    реагировать ли на вставку и удаление строк).
+    """
+
+    def __init__(self, name, source, dependencies):
+        self.name = name
+        self.table = f'search_{name}'
+        self.source = source
+        self.dependencies = dependencies
+
+    def source_sql(self, keys):
+        return self.source.format(keys=keys)
+
+
+SEARCH_INDEXES = {
+    'group': SearchIndex(
+        'group',
+        source="""
+            SELECT g.id,
+                   COALESCE(g.name, '') || ' ' || COALESCE(g.code, ''),
+                   COALESCE(g.description, ''),
+                   ''
+            FROM groups_group g
+            WHERE g.id IN ({keys})
+        """,
+        dependencies=[
+            ('groups_group', 'SELECT {row}.id', ['name', 'code', 'description'], True),
+        ],
+    ),
+    'assignment': SearchIndex(
+        'assignment',
+        source="""
+            SELECT a.id,
+                   COALESCE(a.title, ''),
+                   COALESCE(a.description, ''),
+                   ''
+            FROM assignments_assignment a
+            WHERE a.id IN ({keys})
+        """,
+        dependencies=[
+            ('assignments_assignment', 'SELECT {row}.id', ['title', 'description'], True),
+        ],
+    ),
+    'student': SearchIndex(
+        'student',
+        source="""
+            SELECT p.id,
+                   COALESCE(u.first_name, '') || ' ' || COALESCE(u.last_name, '') || ' '
+                       || COALESCE(u.username, ''),
+                   COALESCE(u.email, '') || ' ' || COALESCE(p.student_id, ''),
+                   COALESCE(p.major, '')
+            FROM authentication_studentprofile p
+            JOIN authentication_customuser u ON u.id = p.user_id
+            WHERE p.id IN ({keys})
+        """,
+        dependencies=[
+            ('authentication_studentprofile', 'SELECT {row}.id',
+             ['user_id', 'student_id', 'major'], True),
+            ('authentication_customuser',
+             'SELECT id FROM authentication_studentprofile WHERE user_id = {row}.id',
+             ['username', 'first_name', 'last_name', 'email'], False),
+        ],
+    ),
+}
+
+
+class SQLiteBackend:
+    """Индексы на FTS5."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def _triggers(self, index):
+        events = []
+        for table, key, columns, row_events in index.dependencies:
+            if row_events:
+                events += [(table, key, 'INSERT', 'NEW'), (table, key, 'DELETE', 'OLD')]
+            events.append((table, key, 'UPDATE OF ' + ', '.join(columns), 'OLD'))
+            events.append((table, key, 'UPDATE OF ' + ', '.join(columns), 'NEW'))
+        for table, key, event, row in events:
+            kind = event.split()[0].lower()
+            name = f'{index.table}__{table}_{kind}_{row.lower()}'
+            keys = key.format(row=row)
+            yield name, f"""
+                CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table}
+                BEGIN
+                    DELETE FROM {index.table} WHERE rowid IN ({keys});
+                    INSERT INTO {index.table} (rowid, a, b, c) {index.source_sql(keys)};
+                END
+            """
+
+    def installed_triggers(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            return {row[0] for row in cursor.fetchall()}
+
+    def ensure(self, index):
+        """Создаёт таблицу и недостающие триггеры; возвращает True, если что-то создано."""
+        existing = self.installed_triggers()
+        triggers = list(self._triggers(index))
+        missing = [sql for name, sql in triggers if name not in existing]
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.table} USING fts5("
+                f"a, b, c, tokenize = 'porter unicode61 remove_diacritics 2')"
+            )
+            for sql in missing:
+                cursor.execute(sql)
+        return bool(missing)
+
+    def rebuild(self, index, keys):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {index.table}')
+            cursor.execute(f'INSERT INTO {index.table} (rowid, a, b, c) {index.source_sql(keys)}')
+
+    def drop(self, index):
+        with self.connection.cursor() as cursor:
+            for name, sql in self._triggers(index):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+    def match(self, index, terms):
+        """SQL и параметры для отбора id и для оценки релевантности."""
+        query = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in SQLITE_WEIGHTS)
+        ids = f'SELECT rowid FROM {index.table} WHERE {index.table} MATCH %s'
+        # bm25() тем меньше, чем релевантнее строка
+        rank = (
+            f'SELECT -bm25({index.table}, {weights}) FROM {index.table} '
+            f'WHERE {index.table} MATCH %s AND rowid = {{outer}}'
+        )
+        return ids, [query], rank, [query]
+
+
+class PostgreSQLBackend:
+    """Индексы на tsvector с GIN-индексом."""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    @staticmethod
+    def _document(column, weight):
+        return ' || '.join(
+            f"setweight(to_tsvector('{config}', {column}), '{weight}')" for config in PG_CONFIGS
+        )
+
+    def _refresh_function(self, index):
+        document = ' || '.join(
+            self._document(column, weight) for column, weight in (('s.a', 'A'), ('s.b', 'B'), ('s.c', 'C'))
+        )
+        return f"""
+            CREATE OR REPLACE FUNCTION {index.table}_refresh(keys bigint[]) RETURNS void AS $$
+            BEGIN
+                DELETE FROM {index.table} WHERE id = ANY(keys);
+                INSERT INTO {index.table} (id, document)
+                SELECT s.id, {document}
+                FROM ({index.source_sql('SELECT unnest(keys)')}) AS s(id, a, b, c);
+            END;
+            $$ LANGUAGE plpgsql
+        """
+
+    def _triggers(self, index):
+        for table, key, columns, row_events in index.dependencies:
+            name = f'{index.table}__{table}'
+            events = ['UPDATE OF ' + ', '.join(columns)]
+            if row_events:
+                events = ['INSERT', 'DELETE'] + events
+            function = f"""
+                CREATE OR REPLACE FUNCTION {name}() RETURNS trigger AS $$
+                BEGIN
+                    IF TG_OP <> 'INSERT' THEN
+                        PERFORM {index.table}_refresh(ARRAY({key.format(row='OLD')}));
+                    END IF;
+                    IF TG_OP <> 'DELETE' THEN
+                        PERFORM {index.table}_refresh(ARRAY({key.format(row='NEW')}));
+                    END IF;
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql
+            """
+            trigger = (
+                f'CREATE TRIGGER {name} AFTER {" OR ".join(events)} ON {table} '
+                f'FOR EACH ROW EXECUTE PROCEDURE {name}()'
+            )
+            yield name, table, function, trigger
+
+    def installed_triggers(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute('SELECT tgname FROM pg_trigger WHERE NOT tgisinternal')
+            return {row[0] for row in cursor.fetchall()}
+
+    def ensure(self, index):
+        existing = self.installed_triggers()
+        created = False
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {index.table} ('
+                f'id bigint PRIMARY KEY, document tsvector NOT NULL)'
+            )
+            # Индексы, созданные с id integer (первичные ключи моделей - BigAutoField)
+            cursor.execute(
+                "SELECT data_type FROM information_schema.columns "
+                "WHERE table_name = %s AND column_name = 'id' AND table_schema = current_schema()",
+                [index.table],
+            )
+            if cursor.fetchone()[0] == 'integer':
+                cursor.execute(f'ALTER TABLE {index.table} ALTER COLUMN id TYPE bigint')
+                cursor.execute(f'DROP FUNCTION IF EXISTS {index.table}_refresh(integer[])')
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {index.table}_document_gin '
+                f'ON {index.table} USING gin (document)'
+            )
+            cursor.execute(self._refresh_function(index))
+            for name, table, function, trigger in self._triggers(index):
+                cursor.execute(function)
+                if name not in existing:
+                    cursor.execute(trigger)
+                    created = True
+        return created
+
+    def rebuild(self, index, keys):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'SELECT {index.table}_refresh(ARRAY({keys}))')
+
+    def drop(self, index):
+        with self.connection.cursor() as cursor:
+            for name, table, function, trigger in self._triggers(index):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name} ON {table}')
+                cursor.execute(f'DROP FUNCTION IF EXISTS {name}()')
+            cursor.execute(f'DROP FUNCTION IF EXISTS {index.table}_refresh(bigint[])')
+            cursor.execute(f'DROP TABLE IF EXISTS {index.table}')
+
+    def match(self, index, terms):
+        tsquery = ' && '.join(
+            '(' + ' || '.join(f"to_tsquery('{config}', %s)" for config in PG_CONFIGS) + ')'
+            for _ in terms
+        )
+        params = [f'{term}:*' for term in terms for _ in PG_CONFIGS]
+        ids = f'SELECT id FROM {index.table} WHERE document @@ ({tsquery})'
+        rank = (
+            f'SELECT ts_rank(document, {tsquery}) FROM {index.table} '
+            f'WHERE id = {{outer}}'
+        )
+        return ids, params, rank, params
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'postgresql': PostgreSQLBackend,
+}
+
+
+def get_backend(connection):
+    """Возвращает реализацию поиска для соединения или None, если СУБД не поддерживается."""
+    backend_class = BACKENDS.get(connection.vendor)
+    return backend_class(connection) if backend_class else None
+
+
+def ensure_search_indexes(connection, rebuild=False):
+    """
+    Создаёт недостающие таблицы и триггеры поисковых индексов.
+
+    Индекс заполняется заново, если были созданы триггеры (например, после
+    пересоздания исходной таблицы миграцией в SQLite) или если rebuild=True.
+    Возвращает имена перестроенных индексов.
+    """
+    backend = get_backend(connection)
+    if backend is None:
+        return []
+    rebuilt = []
+    for index in SEARCH_INDEXES.values():
+        if backend.ensure(index) or rebuild:
+            table = index.dependencies[0][0]
+            backend.rebuild(index, f'SELECT id FROM {table}')
+            rebuilt.append(index.name)
+    return rebuilt
+
+
+def drop_search_indexes(connection):
+    backend = get_backend(connection)
+    if backend is not None:
+        for index in SEARCH_INDEXES.values():
+            backend.drop(index)
+
+
+class FullTextSearchFilter(SearchFilter):
+    """
+    Полнотекстовый поиск по параметру ?search= с сортировкой по релевантности.
+
+    Представление указывает индекс в атрибуте search_index. Найденные объекты
+    получают аннотацию search_rank. Если СУБД не поддерживает полнотекстовый
+    поиск, используются search_fields представления, как в SearchFilter.
+    """
+
+    def get_search_terms(self, request):
+        terms = []
+        for term in super().get_search_terms(request):
+            terms += _TERM_RE.findall(term)
+        return terms[:MAX_SEARCH_TERMS]
+
+    def filter_queryset(self, request, queryset, view):
+        index = SEARCH_INDEXES.get(getattr(view, 'search_index', None))
+        backend = get_backend(connections[queryset.db])
+        if index is None or backend is None:
+            return super().filter_queryset(request, queryset, view)
+
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        connection = connections[queryset.db]
+        outer = '{}.{}'.format(
+            connection.ops.quote_name(queryset.model._meta.db_table),
+            connection.ops.quote_name(queryset.model._meta.pk.column),
+        )
+        ids_sql, ids_params, rank_sql, rank_params = backend.match(index, terms)
+        return (
+            queryset.filter(pk__in=RawSQL(ids_sql, ids_params))
+            .annotate(search_rank=RawSQL(rank_sql.format(outer=outer), rank_params))
+            .order_by('-search_rank', 'pk')
+        )
+
+
+class RankedOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter, который не переопределяет сортировку по релевантности.
+
+    Если запрос отфильтрован FullTextSearchFilter и параметр ?ordering= не
+    указан, результаты остаются отсортированными по search_rank.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
@@ -0,0 +1,294 @@
+"""
+Быстрая сериализация списков только для чтения.
+
+ListSerializer вызывает для каждого объекта Serializer.to_representation(),
+который для каждого поля заново обходит source_attrs, проверяет типы и
+перехватывает исключения. CompiledListSerializer один раз на ответ
+«компилирует» дочерний сериализатор в список шагов извлечения полей и
+применяет его ко всем объектам. Результат совпадает с результатом
+стандартного ListSerializer байт в байт: значения по-прежнему преобразуются
+методами to_representation() полей, а в редких случаях (исключение при
+чтении атрибута, нестандартные поля) используется стандартный путь DRF.
+
+compile_values() строит такое же представление из строк queryset.values()
+без создания экземпляров моделей - для сериализаторов, все поля которых
+читают столбцы модели и её внешних ключей.
+
+Подключается через Meta.list_serializer_class = CompiledListSerializer.
+"""
+import datetime
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ObjectDoesNotExist
+from django.db.models.manager import BaseManager
+from rest_framework import ISO_8601, relations, serializers
+from rest_framework.fields import SkipField, is_simple_callable
+from rest_framework.settings import api_settings
+
+# Функции чтения атрибутов по source_attrs, общие для всех сериализаторов процесса
+_getters = {}
+
+
+def _attribute_getter(source_attrs):
+    key = tuple(source_attrs)
+    getter = _getters.get(key)
+    if getter is None:
+        getter = _getters[key] = _build_getter(key)
+    return getter
+
+
+def _build_getter(attrs):
+    """
+    Повторяет fields.get_attribute() DRF для обычного случая.
+
+    AttributeError и KeyError не перехватываются: в этом случае поле
+    читается стандартным Field.get_attribute(), который решает, пропустить
+    поле, вернуть None или значение по умолчанию.
+    """
+    if len(attrs) == 1:
+        attr = attrs[0]
+
+        def getter(instance):
+            try:
+                value = instance[attr] if _is_mapping(instance) else getattr(instance, attr)
+            except ObjectDoesNotExist:
+                return None
+            if callable(value) and is_simple_callable(value):
+                value = value()
+            return value
+        return getter
+
+    def getter(instance):
+        try:
+            for attr in attrs:
+                instance = instance[attr] if _is_mapping(instance) else getattr(instance, attr)
+                if callable(instance) and is_simple_callable(instance):
+                    instance = instance()
+        except ObjectDoesNotExist:
+            return None
+        return instance
+    return getter
+
+
+# isinstance(obj, Mapping) проверяется через ABC и заметно медленнее поиска в словаре
+_mapping_types = {dict: True, OrderedDict: True}
+
+
+def _is_mapping(instance):
+    cls = type(instance)
+    result = _mapping_types.get(cls)
+    if result is None:
+        result = _mapping_types[cls] = isinstance(instance, Mapping)
+    return result
+
+
+def _value_converter(field):
+    """
+    Возвращает функцию value -> представление для непустого значения поля.
+
+    Для самых частых полей повторяет их to_representation() без лишних
+    вызовов; часовой пояс DateTimeField определяется один раз при компиляции.
+    """
+    field_type = type(field)
+    if field_type.to_representation is serializers.CharField.to_representation:
+        return str
+    if field_type.to_representation is serializers.IntegerField.to_representation:
+        return int
+    if (
+        field_type.to_representation is serializers.DateTimeField.to_representation
+        and field_type.enforce_timezone is serializers.DateTimeField.enforce_timezone
+    ):
+        output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+        field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+        if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+            return field.to_representation
+        to_representation = field.to_representation
+
+        def convert(value):
+            if not isinstance(value, datetime.datetime) or value.tzinfo is None:
+                return to_representation(value)
+            value = value.astimezone(field_timezone).isoformat()
+            if value.endswith('+00:00'):
+                value = value[:-6] + 'Z'
+            return value
+        return convert
+    return field.to_representation
+
+
+def _has_standard_representation(serializer):
+    return type(serializer).to_representation is serializers.Serializer.to_representation
+
+
+def _has_standard_list_representation(serializer):
+    return type(serializer).to_representation in (
+        serializers.ListSerializer.to_representation,
+        CompiledListSerializer.to_representation,
+    ) and _has_standard_representation(serializer.child)
+
+
+def _generic_extractor(field):
+    """Стандартный путь Serializer.to_representation() для одного поля."""
+    get_attribute = field.get_attribute
+    to_representation = field.to_representation
+
+    def extract(instance):
+        attribute = get_attribute(instance)
+        check_for_none = attribute.pk if isinstance(attribute, relations.PKOnlyObject) else attribute
+        if check_for_none is None:
+            return None
+        return to_representation(attribute)
+    return extract
+
+
+def _attribute_extractor(field, convert):
+    """Читает атрибут по source_attrs и передаёт его в convert()."""
+    getter = _attribute_getter(field.source_attrs)
+    get_attribute = field.get_attribute
+
+    def extract(instance):
+        try:
+            attribute = getter(instance)
+        except (AttributeError, KeyError):
+            attribute = get_attribute(instance)
+        if attribute is None:
+            return None
+        return convert(attribute)
+    return extract
+
+
+def _field_extractor(field):
+    if isinstance(field, serializers.SerializerMethodField):
+        method = getattr(field.parent, field.method_name)
+        return method
+
+    if field.source == '*' or type(field).get_attribute is not serializers.Field.get_attribute:
+        return _generic_extractor(field)
+
+    if isinstance(field, serializers.ListSerializer):
+        if not _has_standard_list_representation(field):
+            return _generic_extractor(field)
+        represent = compile_serializer(field.child)
+
+        def convert(value):
+            iterable = value.all() if isinstance(value, BaseManager) else value
+            return [represent(item) for item in iterable]
+        return _attribute_extractor(field, convert)
+
+    if isinstance(field, serializers.BaseSerializer):
+        if not _has_standard_representation(field):
+            return _generic_extractor(field)
+        return _attribute_extractor(field, compile_serializer(field))
+
+    if isinstance(field, (relations.RelatedField, relations.ManyRelatedField)):
+        return _generic_extractor(field)
+
+    return _attribute_extractor(field, _value_converter(field))
+
+
+def _build_representation(steps):
+    def represent(instance):
+        ret = OrderedDict()
+        for name, extract in steps:
+            try:
+                ret[name] = extract(instance)
+            except SkipField:
+                continue
+        return ret
+    return represent
+
+
+def compile_serializer(serializer):
+    """
+    Возвращает функцию instance -> OrderedDict, эквивалентную
+    serializer.to_representation(instance).
+
+    Результат сохраняется на экземпляре сериализатора: методы
+    SerializerMethodField и поля связаны с его контекстом.
+    """
+    represent = serializer.__dict__.get('_compiled_representation')
+    if represent is not None:
+        return represent
+    if not _has_standard_representation(serializer):
+        represent = serializer.to_representation
+    else:
+        represent = _build_representation([
+            (field.field_name, _field_extractor(field)) for field in serializer._readable_fields
+        ])
+    serializer._compiled_representation = represent
+    return represent
+
+
+def compile_values(serializer):
+    """
+    Возвращает (paths, represent): поля для queryset.values(*paths) и функцию,
+    строящую из такой строки то же, что serializer.to_representation(instance).
+
+    Подходит для сериализаторов, поля которых читают столбцы модели или
+    моделей по внешним ключам (в том числе вложенными сериализаторами).
+    Иначе - ImproperlyConfigured.
+    """
+    model = serializer.Meta.model
+    paths = []
+    represent = _build_representation(_values_steps(serializer, model, '', paths))
+    return paths, represent
+
+
+def _values_steps(serializer, model, prefix, paths):
+    steps = []
+    for field in serializer._readable_fields:
+        path, target = _column_path(model, field)
+        key = prefix + path
+        if isinstance(field, serializers.BaseSerializer) and not isinstance(field, serializers.ListSerializer):
+            if target is None or not target.is_relation or not _has_standard_representation(field):
+                raise ImproperlyConfigured(f'{field.field_name}: only nested serializers of foreign keys are supported')
+            paths.append(key)
+            nested = _build_representation(_values_steps(field, target.related_model, key + '__', paths))
+            steps.append((field.field_name, _nullable(key, nested)))
+        elif isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None:
+            paths.append(key)
+            steps.append((field.field_name, _nullable(key, lambda value: value, pass_row=False)))
+        elif (
+            isinstance(field, (serializers.SerializerMethodField, serializers.ListSerializer,
+                               relations.RelatedField, relations.ManyRelatedField))
+            or target is None or target.many_to_many or target.one_to_many
+        ):
+            raise ImproperlyConfigured(f'{field.field_name}: field cannot be read from values() rows')
+        else:
+            paths.append(key)
+            steps.append((field.field_name, _nullable(key, _value_converter(field), pass_row=False)))
+    return steps
+
+
+def _nullable(key, convert, pass_row=True):
+    def extract(row):
+        value = row[key]
+        if value is None:
+            return None
+        return convert(row) if pass_row else convert(value)
+    return extract
+
+
+def _column_path(model, field):
+    """Путь lookup для values() по source поля и модельное поле, на которое он указывает."""
+    if field.source == '*':
+        return None, None
+    target = None
+    for attr in field.source_attrs:
+        if model is None:
+            return None, None
+        try:
+            target = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return None, None
+        model = target.related_model if target.is_relation else None
+    return '__'.join(field.source_attrs), target
+
+
+class CompiledListSerializer(serializers.ListSerializer):
+    """ListSerializer, сериализующий элементы скомпилированным представлением дочернего сериализатора."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, BaseManager) else data
+        represent = compile_serializer(self.child)
+        return [represent(item) for item in iterable]
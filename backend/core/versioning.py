@@ -0,0 +1,60 @@
+"""
+Версии данных в кеше для инвалидации производных ответов.
+
+Закешированный ответ (календарь, сводка) запоминает версии данных, из которых
+он построен, например ('group', 12) или ('student', 7). Сигналы моделей
+меняют версию при изменении данных, и при следующем запросе ответ строится
+заново. Проверка актуальности - одно чтение кеша (get_many), без запросов к БД.
+
+Версии должны храниться в кеше, общем для всех процессов (REDIS_URL): с
+локальным кешем процесса другие процессы не узнают о смене версии (проверка
+core.E003).
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+KEY_PREFIX = 'version'
+
+
+def version_key(scope, pk):
+    return f'{KEY_PREFIX}:{scope}:{pk}'
+
+
+def _new_version():
+    # Случайное значение, а не счётчик: после вытеснения ключа из кеша новая
+    # версия не совпадёт ни с одной из запомненных ранее
+    return uuid.uuid4().hex[:16]
+
+
+def get_versions(keys):
+    """
+    Возвращает {(scope, pk): версия} для переданных ключей.
+
+    Отсутствующим в кеше ключам назначается новая версия.
+    """
+    cache_keys = {version_key(scope, pk): (scope, pk) for scope, pk in keys}
+    versions = cache.get_many(list(cache_keys))
+    missing = {key: _new_version() for key in cache_keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {cache_keys[key]: value for key, value in versions.items()}
+
+
+def bump_versions(keys, using=None):
+    """
+    Меняет версии ключей после фиксации текущей транзакции.
+
+    До фиксации другие запросы ещё видят старые данные и могли бы
+    закешировать их под новой версией.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+
+    def bump():
+        cache.set_many({version_key(scope, pk): _new_version() for scope, pk in keys}, timeout=None)
+
+    transaction.on_commit(bump, using=using)
@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.urls import reverse
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import batch as batch_requests
+from .db.pool import pool_stats, reset_pool_stats
+from .db_routing import read_only_view
+from .profiling import registry
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def query_stats(request):
+    """
+    Статистика SQL-запросов по эндпоинтам (только для персонала).
+
+    GET возвращает агрегированные данные профилировщика текущего процесса,
+    DELETE сбрасывает накопленную статистику.
+    """
+    if request.method == 'DELETE':
+        registry.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    return Response({
+        'enabled': getattr(settings, 'QUERY_PROFILER_ENABLED', False),
+        'sample_rate': getattr(settings, 'QUERY_PROFILER_SAMPLE_RATE', 1.0),
+        'window': registry.window,
+        'endpoints': registry.snapshot(),
+    })
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAdminUser])
+def connection_stats(request):
+    """
+    Статистика соединений с БД текущего процесса (только для персонала).
+
+    Для каждой БД: настройки переиспользования соединений, открытые, занятые
+    и свободные соединения, число созданных/закрытых соединений и время
+    ожидания соединения. DELETE сбрасывает счётчики.
+    """
+    if request.method == 'DELETE':
+        reset_pool_stats()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    stats = pool_stats()
+    return Response({
+        alias: {
+            'conn_max_age': database.get('CONN_MAX_AGE', 0),
+            'conn_health_checks': database.get('CONN_HEALTH_CHECKS', False),
+            'pool': database.get('POOL'),
+            'stats': stats.get(alias),
+        }
+        for alias, database in settings.DATABASES.items()
+    })
+
+
+@read_only_view
+@api_view(['POST'])
+def batch(request):
+    """
+    Выполняет несколько GET-запросов к API за один HTTP-запрос.
+
+    Тело: {"requests": ["/api/groups/groups", "/api/auth/profile/?fields=id"]}.
+    Подзапросы выполняются по порядку от имени текущего пользователя с общим
+    контекстом доступа (см. core.batch); ответ содержит статус и тело каждого
+    из них. Размер пакета ограничен настройкой API_BATCH_MAX_REQUESTS.
+    """
+    paths = request.data.get('requests') if isinstance(request.data, dict) else None
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        raise ValidationError({'requests': 'Ожидается список путей.'})
+    if not paths:
+        raise ValidationError({'requests': 'Список запросов пуст.'})
+    if len(paths) > settings.API_BATCH_MAX_REQUESTS:
+        raise ValidationError({
+            'requests': f'Не более {settings.API_BATCH_MAX_REQUESTS} запросов в пакете.'
+        })
+
+    excluded = {reverse('api_batch')}
+    responses = []
+    for path in paths:
+        status_code, body = batch_requests.execute(request, path, excluded)
+        responses.append({'path': path, 'status': status_code, 'body': body})
+    return Response({'responses': responses})
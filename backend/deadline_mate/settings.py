@@ -1,4 +1,5 @@
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 
@@ -37,9 +38,13 @@ INSTALLED_APPS = [
     'progress',
     'notifications',
     'analytics',
+    'archive',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryProfilerMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -71,12 +76,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'deadline_mate.wsgi.application'
 
+# Процессы и потоки gunicorn (см. gunicorn.conf.py); от них зависит размер пула соединений
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', 2))
+WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))
+
 # Database
+# Бэкенды core.db.backends ведут статистику соединений (/api/status/db-connections)
 # Для локальной разработки используем SQLite
 if os.environ.get('USE_SQLITE', 'True') == 'True':
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.sqlite3',
+            'ENGINE': 'core.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
@@ -84,12 +94,72 @@ else:
     # PostgreSQL для продакшн окружения
     DATABASES = {
         'default': {
-            'ENGINE': 'django.db.backends.postgresql',
+            'ENGINE': 'core.db.backends.postgresql',
             'NAME': os.environ.get('DB_NAME', 'deadline_mate'),
             'USER': os.environ.get('DB_USER', 'postgres'),
             'PASSWORD': os.environ.get('DB_PASSWORD', 'postgres'),
             'HOST': os.environ.get('DB_HOST', 'db'),
             'PORT': os.environ.get('DB_PORT', '5432'),
+            # Постоянные соединения: поток переиспользует соединение между запросами
+            # и проверяет его перед первым запросом после простоя
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('DB_POOL', 'False') == 'True':
+        # Пул соединений процесса (core.db.pool): Django возвращает соединение в пул
+        # в конце запроса, поэтому CONN_MAX_AGE = 0. Потоку нужно одно соединение,
+        # так что пул размером WEB_THREADS не заставляет запросы ждать, а всего
+        # процессы держат не больше WEB_CONCURRENCY * DB_POOL_MAX_SIZE соединений
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['POOL'] = {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', WEB_THREADS)),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', 300)),
+        }
+
+# Лимит соединений сервера БД: проверка core.W001 предупреждает, если процессы
+# с пулами могут его превысить
+DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS', 100))
+
+# Реплики для чтения (core.db_routing). Реплики получают те же параметры, что и
+# основная БД, кроме хоста (PostgreSQL) или файла (SQLite, для локальной проверки;
+# копии файла обновляет команда sync_sqlite_replicas)
+if DATABASES['default']['ENGINE'].endswith('sqlite3'):
+    _replica_settings = [
+        {'NAME': path} for path in os.environ.get('SQLITE_REPLICAS', '').split(',') if path
+    ]
+else:
+    _replica_settings = [
+        {'HOST': host} for host in os.environ.get('DB_REPLICA_HOSTS', '').split(',') if host
+    ]
+DATABASE_REPLICAS = []
+for _number, _overrides in enumerate(_replica_settings, start=1):
+    _alias = f'replica_{_number}'
+    # В тестах реплики указывают на тестовую основную БД
+    DATABASES[_alias] = {**DATABASES['default'], **_overrides, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICAS.append(_alias)
+
+DATABASE_ROUTERS = ['core.db_routing.ReplicaRouter'] if DATABASE_REPLICAS else []
+
+# Время (в секундах), за которое реплики догоняют основную БД: столько после своей
+# записи пользователь читает данные из основной БД
+DATABASE_REPLICA_LAG = float(os.environ.get('DATABASE_REPLICA_LAG', 5))
+
+# Cache
+# Общий кеш для всех процессов (Redis) или локальный кеш процесса. Локальный кеш
+# допустим только с одним процессом gunicorn (проверка core.E003)
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
 
@@ -145,7 +215,7 @@ AUTH_USER_MODEL = 'authentication.CustomUser'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'authentication.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -155,9 +225,25 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
-    'TRAILING_SLASH': False  # Отключаем слеш в конце URL
+    'TRAILING_SLASH': False,  # Отключаем слеш в конце URL
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.OrjsonRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.OrjsonParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# MessagePack отдаётся клиентам, запросившим Accept: application/msgpack
+if find_spec('msgpack') is not None:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('core.renderers.MessagePackRenderer')
+
+# Браузерный API только для разработки
+if DEBUG:
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].append('rest_framework.renderers.BrowsableAPIRenderer')
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=int(os.environ.get('JWT_ACCESS_TOKEN_LIFETIME', 1))),
@@ -165,6 +251,61 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Время (в секундах), в течение которого кешируется метка отзыва токенов пользователя
+JWT_REVOCATION_CACHE_TTL = int(os.environ.get('JWT_REVOCATION_CACHE_TTL', 60))
+
+# Время (в секундах) хранения собранного календаря дедлайнов (assignments.calendar).
+# Изменения заданий и групп сбрасывают кеш сразу, таймаут лишь освобождает память
+CALENDAR_FEED_CACHE_TIMEOUT = int(os.environ.get('CALENDAR_FEED_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Время (в секундах) хранения сводки главного экрана (assignments.dashboard).
+# Изменения данных сбрасывают кеш сразу, таймаут лишь освобождает память
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 60 * 60))
+
+# Лента изменений (assignments.sync): наибольшее число строк полного снимка или записей
+# журнала изменений в одном ответе. Клиенты с курсором старше срока хранения журнала
+# изменений получают полный снимок
+SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 1000))
+
+# Журнал изменений (core.changelog): срок хранения записей (в днях), возраст (в часах),
+# после которого промежуточные изменения объекта удаляются командой compact_changelog,
+# и время (в секундах), после которого пропуск позиций журнала считается окончательным:
+# дольше не должна длиться ни одна пишущая журнал транзакция
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', 30))
+CHANGE_LOG_COMPACT_AFTER_HOURS = int(os.environ.get('CHANGE_LOG_COMPACT_AFTER_HOURS', 24))
+CHANGE_LOG_GAP_TIMEOUT = float(os.environ.get('CHANGE_LOG_GAP_TIMEOUT', 300))
+
+# Архив заданий (archive.archival): даты начала учебных периодов (ММ-ДД через запятую)
+# и число дней после окончания периода, через которое его задания переносятся в архив
+ARCHIVE_TERM_STARTS = os.environ.get('ARCHIVE_TERM_STARTS', '09-01,02-01')
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 30))
+
+# Секционирование таблицы ответов в PostgreSQL (assignments.partitioning): число секций
+# по хешу задания и число месячных секций, создаваемых заранее
+SUBMISSION_HASH_PARTITIONS = int(os.environ.get('SUBMISSION_HASH_PARTITIONS', 16))
+SUBMISSION_PARTITION_MONTHS_AHEAD = int(os.environ.get('SUBMISSION_PARTITION_MONTHS_AHEAD', 3))
+
+# Сжатие ответов gzip/brotli (core.middleware.CompressionMiddleware). Ответы с
+# секретами не сжимаются (BREACH): JWT-токены, ссылка на календарь с подписанным
+# токеном и пакеты /api/batch, которые могут содержать такие ответы
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'True') == 'True'
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+COMPRESSION_EXCLUDE_PATHS = [
+    '/api/auth/token/',
+    '/api/assignments/assignments/calendar-feed',
+    '/api/batch',
+]
+
+# Максимальное число подзапросов в пакете /api/batch
+API_BATCH_MAX_REQUESTS = int(os.environ.get('API_BATCH_MAX_REQUESTS', 20))
+
+# Профилирование SQL-запросов по эндпоинтам (core.middleware.QueryProfilerMiddleware)
+QUERY_PROFILER_ENABLED = os.environ.get('QUERY_PROFILER_ENABLED', 'False') == 'True'
+QUERY_PROFILER_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILER_SAMPLE_RATE', '1.0'))
+QUERY_PROFILER_WINDOW = int(os.environ.get('QUERY_PROFILER_WINDOW', 1000))
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # For debugging only - don't use in production
 CORS_ALLOW_CREDENTIALS = True
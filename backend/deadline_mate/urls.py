@@ -8,6 +8,8 @@ from drf_yasg import openapi
 from django.views.decorators.http import require_GET
 from django.http import JsonResponse
 
+from core.views import batch, connection_stats, query_stats
+
 # Ensure this setting is set to False in settings.py:
 # APPEND_SLASH = False
 
@@ -45,6 +47,9 @@ urlpatterns = [
          
     # Diagnostic endpoint
     path('api/status', api_status, name='api_status'),
+    path('api/status/queries', query_stats, name='api_query_stats'),
+    path('api/status/db-connections', connection_stats, name='api_connection_stats'),
+    path('api/batch', batch, name='api_batch'),
     
     # API endpoints для каждого приложения
     path('api/auth/', include('authentication.urls')),
@@ -53,6 +58,7 @@ urlpatterns = [
     path('api/progress/', include('progress.urls')),
     path('api/notifications/', include('notifications.urls')),
     path('api/analytics/', include('analytics.urls')),
+    path('api/archive/', include('archive.urls')),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0002_groupteacher'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='groupmembership',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата обновления'),
+        ),
+        migrations.AddIndex(
+            model_name='groupmembership',
+            index=models.Index(fields=['updated_at'], name='membership_updated_idx'),
+        ),
+    ]
@@ -1,11 +1,42 @@
-from django.db import models
+from django.db import IntegrityError, connections, models, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django.utils.crypto import get_random_string
 from authentication.models import TeacherProfile, StudentProfile
+from core.models import ChangeLogEntry, ChangeLoggedModel, record_changes
+from core.versioning import bump_versions
 
+CODE_LENGTH = 6
+CODE_ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+# Число попыток вставки группы со случайным кодом
+CODE_ALLOCATION_ATTEMPTS = 10
 
-class Group(models.Model):
+
+def generate_group_code(length=None):
+    """Генерирует случайный код группы (без проверки уникальности)."""
+    return get_random_string(length=length or CODE_LENGTH, allowed_chars=CODE_ALPHABET)
+
+
+def _is_code_collision(error, using):
+    """Нарушено ли при вставке группы ограничение уникальности её кода."""
+    table = Group._meta.db_table
+    column = Group._meta.get_field('code').column
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        # PostgreSQL сообщает имя нарушенного ограничения
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            constraint = connection.introspection.get_constraints(cursor, table).get(diag.constraint_name)
+        return bool(constraint and constraint['unique'] and constraint['columns'] == [column])
+    # SQLite перечисляет столбцы нарушенного ограничения
+    return str(error) == f'UNIQUE constraint failed: {table}.{column}'
+
+
+class Group(ChangeLoggedModel):
     """Модель для учебных групп студентов."""
+    change_log_code = 4
+
     name = models.CharField(max_length=100, verbose_name=_('Название группы'))
     code = models.CharField(max_length=10, unique=True, verbose_name=_('Код группы'))
     description = models.TextField(blank=True, verbose_name=_('Описание'))
@@ -27,18 +58,25 @@ class Group(models.Model):
     def __str__(self):
         return self.name
 
+    def change_log_scope(self):
+        return {'group_id': self.pk, 'teacher_id': self.created_by_id}
+
     def save(self, *args, **kwargs):
         # Автоматически генерировать код группы, если он не указан
-        if not self.code:
-            self.code = self._generate_unique_code()
-        super().save(*args, **kwargs)
-
-    def _generate_unique_code(self):
-        """Генерирует уникальный код для группы."""
-        code = get_random_string(length=6, allowed_chars='ABCDEFGHJKLMNPQRSTUVWXYZ23456789')
-        while Group.objects.filter(code=code).exists():
-            code = get_random_string(length=6, allowed_chars='ABCDEFGHJKLMNPQRSTUVWXYZ23456789')
-        return code
+        if self.code:
+            return super().save(*args, **kwargs)
+        
+        # Код выбирается случайно, а его уникальность проверяет ограничение
+        # UNIQUE при вставке: при совпадении вставка повторяется с новым кодом
+        using = kwargs.get('using') or router.db_for_write(Group, instance=self)
+        for attempt in range(CODE_ALLOCATION_ATTEMPTS):
+            self.code = generate_group_code()
+            try:
+                with transaction.atomic(using=using):
+                    return super().save(*args, **kwargs)
+            except IntegrityError as e:
+                if not _is_code_collision(e, using) or attempt == CODE_ALLOCATION_ATTEMPTS - 1:
+                    raise
     
     @property
     def get_member_count(self):
@@ -51,8 +89,10 @@ class Group(models.Model):
         return self.teachers.filter(is_active=True).count()
 
 
-class GroupMembership(models.Model):
+class GroupMembership(ChangeLoggedModel):
     """Модель для связи студентов с группами."""
+    change_log_code = 5
+
     ROLE_MEMBER = 'member'
     ROLE_MONITOR = 'monitor'  # староста группы
     
@@ -80,6 +120,7 @@ class GroupMembership(models.Model):
         verbose_name=_('Роль в группе')
     )
     joined_at = models.DateTimeField(auto_now_add=True, verbose_name=_('Дата присоединения'))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_('Дата обновления'))
     is_active = models.BooleanField(default=True, verbose_name=_('Активен'))
 
     class Meta:
@@ -87,13 +128,21 @@ class GroupMembership(models.Model):
         verbose_name_plural = _('Участия в группах')
         unique_together = ['group', 'student']
         ordering = ['group', 'joined_at']
+        indexes = [
+            models.Index(fields=['updated_at'], name='membership_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.group}"
 
+    def change_log_scope(self):
+        return {'group_id': self.group_id, 'student_id': self.student_id}
+
 
-class GroupTeacher(models.Model):
+class GroupTeacher(ChangeLoggedModel):
     """Модель для связи преподавателей с группами."""
+    change_log_code = 6
+
     group = models.ForeignKey(
         Group,
         on_delete=models.CASCADE,
@@ -116,4 +165,36 @@ class GroupTeacher(models.Model):
         ordering = ['group', 'joined_at']
 
     def __str__(self):
-        return f"{self.teacher} - {self.group}" 
\ No newline at end of file
+        return f"{self.teacher} - {self.group}"
+
+    def change_log_scope(self):
+        return {'group_id': self.group_id, 'teacher_id': self.teacher_id}
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def bump_group_version(sender, instance, using, **kwargs):
+    """Сбрасывает закешированные данные, построенные по группе."""
+    bump_versions([('group', instance.pk)], using=using)
+
+
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def bump_student_version(sender, instance, using, **kwargs):
+    """Состав групп студента и состав студентов группы изменились."""
+    bump_versions([('student', instance.student_id), ('group_members', instance.group_id)], using=using)
+
+
+@receiver(post_save, sender=GroupTeacher)
+@receiver(post_delete, sender=GroupTeacher)
+def bump_teacher_version(sender, instance, using, **kwargs):
+    """Состав групп преподавателя изменился."""
+    bump_versions([('teacher', instance.teacher_id)], using=using)
+
+
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=GroupMembership)
+@receiver(post_delete, sender=GroupTeacher)
+def record_deletion(sender, instance, using, **kwargs):
+    """Удаление (в том числе каскадное) выполняется в транзакции вместе с записью в журнал."""
+    record_changes([instance], ChangeLogEntry.DELETE, using=using)
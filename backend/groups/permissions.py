@@ -1,5 +1,8 @@
 from rest_framework import permissions
 
+from core.access import get_access_context
+from core.permissions import ScopedPermission
+
 
 class IsTeacherOrReadOnly(permissions.BasePermission):
     """
@@ -31,23 +34,25 @@ class IsTeacherGroupOwnerOrReadOnly(permissions.BasePermission):
         return (request.user.is_authenticated and request.user.is_teacher())
 
 
-class IsGroupMember(permissions.BasePermission):
+class IsGroupMember(ScopedPermission):
     """
-    Разрешает доступ участникам группы, а также всем преподавателям.
+    Разрешает доступ участникам группы, а также всем преподавателям
+    и администраторам.
+    
+    Членство проверяется по группам студента из AccessContext, которые
+    загружаются одним запросом на весь запрос API.
     """
     
     def has_object_permission(self, request, view, obj):
-        # Всегда разрешаем любому преподавателю
-        if (request.user.is_authenticated and request.user.is_teacher()):
+        access = get_access_context(request)
+        if access.is_teacher or request.user.is_staff:
             return True
-        
-        # Для студентов проверяем членство в группе
-        if (request.user.is_authenticated and 
-            request.user.is_student() and 
-            hasattr(request.user, 'student_profile')):
-            return obj.memberships.filter(
-                student=request.user.student_profile,
-                is_active=True
-            ).exists()
-        
-        return False 
\ No newline at end of file
+        return access.belongs_to_group(obj.pk)
+    
+    def filter_queryset(self, request, queryset, view):
+        access = get_access_context(request)
+        if access.is_teacher or request.user.is_staff:
+            return queryset
+        if access.student_profile:
+            return queryset.filter(pk__in=access.student_group_ids)
+        return queryset.none()
@@ -1,8 +1,25 @@
+from django.db.models import Count, F, Q
 from rest_framework import serializers
+
+from authentication.serializers import StudentProfileSerializer, TeacherProfileSerializer
+from core.fieldsets import SparseFieldsetMixin, optimize_queryset
+from core.serializers import CompiledListSerializer
 from .models import Group, GroupMembership, GroupTeacher
+from .pagination import GroupMemberPagination
+
+# Счётчики полей member_count и teacher_count одним запросом (core.fieldsets);
+# distinct не даёт соединениям участников и преподавателей перемножить строки
+GROUP_COUNT_ANNOTATIONS = {
+    'member_count': {
+        '_member_count': Count('memberships', filter=Q(memberships__is_active=True), distinct=True),
+    },
+    'teacher_count': {
+        '_teacher_count': Count('teachers', filter=Q(teachers__is_active=True), distinct=True),
+    },
+}
 
 
-class GroupSerializer(serializers.ModelSerializer):
+class GroupSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для модели Group с базовой информацией."""
     member_count = serializers.SerializerMethodField()
     created_by_name = serializers.SerializerMethodField()
@@ -10,12 +27,16 @@ class GroupSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Group
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'name', 'code', 'description', 'created_by', 
             'created_by_name', 'created_at', 'is_active', 'member_count',
             'teacher_count'
         ]
         read_only_fields = ['code', 'created_by', 'created_at', 'member_count', 'teacher_count']
+        expandable_fields = {'created_by': TeacherProfileSerializer}
+        field_relations = {'created_by_name': ['created_by__user']}
+        field_annotations = GROUP_COUNT_ANNOTATIONS
 
     def get_member_count(self, obj):
         """Возвращает количество участников группы."""
@@ -49,17 +70,20 @@ class GroupSerializer(serializers.ModelSerializer):
         )
 
 
-class GroupMembershipSerializer(serializers.ModelSerializer):
+class GroupMembershipSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Базовый сериализатор для модели GroupMembership."""
     student_name = serializers.SerializerMethodField()
     
     class Meta:
         model = GroupMembership
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'group', 'student', 'student_name', 
             'role', 'joined_at', 'is_active'
         ]
         read_only_fields = ['joined_at']
+        expandable_fields = {'group': GroupSerializer, 'student': StudentProfileSerializer}
+        field_relations = {'student_name': ['student__user']}
 
     def get_student_name(self, obj):
         """Возвращает имя студента."""
@@ -69,17 +93,20 @@ class GroupMembershipSerializer(serializers.ModelSerializer):
         return user.username
 
 
-class GroupTeacherSerializer(serializers.ModelSerializer):
+class GroupTeacherSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Сериализатор для модели GroupTeacher."""
     teacher_name = serializers.SerializerMethodField()
     
     class Meta:
         model = GroupTeacher
+        list_serializer_class = CompiledListSerializer
         fields = [
             'id', 'group', 'teacher', 'teacher_name', 
             'joined_at', 'is_active'
         ]
         read_only_fields = ['joined_at']
+        expandable_fields = {'group': GroupSerializer, 'teacher': TeacherProfileSerializer}
+        field_relations = {'teacher_name': ['teacher__user']}
 
     def get_teacher_name(self, obj):
         """Возвращает имя преподавателя."""
@@ -89,7 +116,7 @@ class GroupTeacherSerializer(serializers.ModelSerializer):
         return user.username
 
 
-class GroupDetailSerializer(serializers.ModelSerializer):
+class GroupDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Расширенный сериализатор группы с информацией об участниках."""
     member_count = serializers.SerializerMethodField()
     created_by_name = serializers.SerializerMethodField()
@@ -109,6 +136,9 @@ class GroupDetailSerializer(serializers.ModelSerializer):
             'code', 'created_by', 'created_at', 'updated_at', 
             'member_count', 'members', 'teacher_count', 'teachers'
         ]
+        expandable_fields = {'created_by': TeacherProfileSerializer}
+        field_relations = {'created_by_name': ['created_by__user']}
+        field_annotations = GROUP_COUNT_ANNOTATIONS
 
     def get_member_count(self, obj):
         """Возвращает количество участников группы."""
@@ -129,11 +159,41 @@ class GroupDetailSerializer(serializers.ModelSerializer):
         return user.username
 
     def get_members(self, obj):
-        """Возвращает список активных участников группы."""
-        memberships = obj.memberships.filter(is_active=True)
+        """
+        Возвращает первую страницу активных участников группы.
+        
+        Полный список с поиском и сортировкой доступен по /groups/{id}/members.
+        """
+        memberships = optimize_queryset(group_members(obj), GroupMembershipSerializer())
+        memberships = memberships[:GroupMemberPagination.page_size]
         return GroupMembershipSerializer(memberships, many=True).data
     
     def get_teachers(self, obj):
-        """Возвращает список преподавателей группы."""
-        teachers = obj.teachers.filter(is_active=True)
-        return GroupTeacherSerializer(teachers, many=True).data 
\ No newline at end of file
+        """
+        Возвращает первую страницу преподавателей группы.
+        
+        Полный список с поиском и сортировкой доступен по /groups/{id}/teachers.
+        """
+        teachers = optimize_queryset(group_teachers(obj), GroupTeacherSerializer())
+        teachers = teachers[:GroupMemberPagination.page_size]
+        return GroupTeacherSerializer(teachers, many=True).data
+
+
+def group_members(group):
+    """Активные участники группы с данными пользователей для сортировки."""
+    # Не через group.memberships: менеджер связи подставляет в строки сам объект
+    # group, и Prefetch с аннотированной группой (?expand=group) не выполняется
+    return GroupMembership.objects.filter(group=group, is_active=True).annotate(
+        username=F('student__user__username'),
+        first_name=F('student__user__first_name'),
+        last_name=F('student__user__last_name'),
+    ).order_by('joined_at', 'id')
+
+
+def group_teachers(group):
+    """Активные преподаватели группы с данными пользователей для сортировки (см. group_members)."""
+    return GroupTeacher.objects.filter(group=group, is_active=True).annotate(
+        username=F('teacher__user__username'),
+        first_name=F('teacher__user__first_name'),
+        last_name=F('teacher__user__last_name'),
+    ).order_by('joined_at', 'id') 
\ No newline at end of file
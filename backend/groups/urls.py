@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import GroupViewSet
+from .views import GroupViewSet, GroupMemberViewSet, GroupTeacherViewSet
 
 # Create a custom router that doesn't enforce trailing slashes
 class NoTrailingSlashRouter(DefaultRouter):
@@ -10,6 +10,8 @@ class NoTrailingSlashRouter(DefaultRouter):
 
 router = NoTrailingSlashRouter()
 router.register(r'groups', GroupViewSet)
+router.register(r'groups/(?P<group_pk>[^/.]+)/members', GroupMemberViewSet, basename='group-members')
+router.register(r'groups/(?P<group_pk>[^/.]+)/teachers', GroupTeacherViewSet, basename='group-teachers')
 
 urlpatterns = [
     path('', include(router.urls)),
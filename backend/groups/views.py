@@ -1,16 +1,22 @@
-from rest_framework import viewsets, permissions, status, filters
+from rest_framework import mixins, viewsets, permissions, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Q
 from django.shortcuts import get_object_or_404
 
 from authentication.models import StudentProfile, TeacherProfile
+from core.fieldsets import SparseFieldsetViewMixin
+from core.permissions import ScopedPermissionFilter
+from core.search import FullTextSearchFilter, RankedOrderingFilter
 from .models import Group, GroupMembership, GroupTeacher
+from .pagination import GroupMemberPagination
 from .serializers import (
+    GROUP_COUNT_ANNOTATIONS,
     GroupSerializer,
     GroupDetailSerializer,
     GroupMembershipSerializer,
-    GroupTeacherSerializer
+    GroupTeacherSerializer,
+    group_members,
+    group_teachers,
 )
 from .permissions import (
     IsTeacherOrReadOnly,
@@ -19,7 +25,7 @@ from .permissions import (
 )
 
 
-class GroupViewSet(viewsets.ModelViewSet):
+class GroupViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     """
     ViewSet для операций с группами.
     
@@ -29,13 +35,11 @@ class GroupViewSet(viewsets.ModelViewSet):
     update/partial_update: Обновление группы (только для создателя)
     destroy: Удаление группы (только для создателя)
     """
-    queryset = Group.objects.annotate(
-        _member_count=Count('memberships', filter=Q(memberships__is_active=True)),
-        _teacher_count=Count('teachers', filter=Q(teachers__is_active=True))
-    )
+    queryset = Group.objects.all()
     serializer_class = GroupSerializer
     permission_classes = [permissions.IsAuthenticated, IsTeacherOrReadOnly]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [ScopedPermissionFilter, FullTextSearchFilter, RankedOrderingFilter]
+    search_index = 'group'
     search_fields = ['name', 'code', 'description']
     ordering_fields = ['name', 'created_at', '_member_count']
     ordering = ['-created_at']
@@ -48,28 +52,14 @@ class GroupViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """
-        Фильтрация списка групп в зависимости от роли пользователя:
-        - Преподаватели видят все группы
-        - Студенты видят группы, в которых они состоят
-        - Администраторы видят все группы
+        Группы со связями и счётчиками, которые нужны полям ответа (см. ?fields=,
+        GROUP_COUNT_ANNOTATIONS), и счётчиком для сортировки по ?ordering=_member_count.
         """
-        user = self.request.user
-        queryset = super().get_queryset()
-
-        if user.is_staff:
-            return queryset
-        
-        if user.is_teacher():
-            # Преподаватели видят все группы
-            return queryset
-        
-        if user.is_student() and hasattr(user, 'student_profile'):
-            return queryset.filter(
-                memberships__student=user.student_profile,
-                memberships__is_active=True
-            )
-        
-        return Group.objects.none()
+        queryset = self.optimize_queryset(super().get_queryset())
+        ordering = self.request.query_params.get(RankedOrderingFilter.ordering_param, '')
+        if '_member_count' in ordering and '_member_count' not in queryset.query.annotations:
+            queryset = queryset.annotate(**GROUP_COUNT_ANNOTATIONS['member_count'])
+        return queryset
 
     def get_permissions(self):
         """Настройка прав доступа в зависимости от действия."""
@@ -77,7 +67,9 @@ class GroupViewSet(viewsets.ModelViewSet):
             self.permission_classes = [
                 permissions.IsAuthenticated, IsTeacherGroupOwnerOrReadOnly
             ]
-        elif self.action == 'retrieve':
+        elif self.action in ['list', 'retrieve']:
+            # Студенты видят только свои группы: правило IsGroupMember применяется
+            # к queryset фильтром ScopedPermissionFilter
             self.permission_classes = [permissions.IsAuthenticated, IsGroupMember]
         else:
             self.permission_classes = [permissions.IsAuthenticated, IsTeacherOrReadOnly]
@@ -313,4 +305,63 @@ class GroupViewSet(viewsets.ModelViewSet):
         )
             
         serializer = GroupTeacherSerializer(teacher_membership)
-        return Response(serializer.data, status=status.HTTP_201_CREATED) 
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class GroupSubresourceViewSet(SparseFieldsetViewMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+    """
+    Базовый ViewSet для постраничных списков участников группы.
+    
+    Доступ проверяется по группе из URL тем же разрешением, что и для
+    детальной информации о группе.
+    """
+    permission_classes = [permissions.IsAuthenticated, IsGroupMember]
+    pagination_class = GroupMemberPagination
+    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    ordering_fields = ['last_name', 'first_name', 'username', 'joined_at']
+    ordering = ['joined_at', 'id']
+
+    def get_group(self):
+        """Возвращает группу из URL, проверив права доступа к ней."""
+        group = get_object_or_404(Group.objects.only('id'), pk=self.kwargs['group_pk'])
+        self.check_object_permissions(self.request, group)
+        return group
+
+
+class GroupMemberViewSet(GroupSubresourceViewSet):
+    """
+    Участники группы: /groups/{id}/members
+    
+    Поддерживает поиск (?search=), сортировку (?ordering=last_name, -joined_at, ...)
+    и пагинацию (?page=, ?page_size=).
+    """
+    serializer_class = GroupMembershipSerializer
+    search_fields = [
+        'student__user__username', 'student__user__first_name',
+        'student__user__last_name', 'student__student_id'
+    ]
+    ordering_fields = GroupSubresourceViewSet.ordering_fields + ['role']
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return GroupMembership.objects.none()
+        return self.optimize_queryset(group_members(self.get_group()))
+
+
+class GroupTeacherViewSet(GroupSubresourceViewSet):
+    """
+    Преподаватели группы: /groups/{id}/teachers
+    
+    Поддерживает поиск (?search=), сортировку (?ordering=last_name, -joined_at, ...)
+    и пагинацию (?page=, ?page_size=).
+    """
+    serializer_class = GroupTeacherSerializer
+    search_fields = [
+        'teacher__user__username', 'teacher__user__first_name',
+        'teacher__user__last_name', 'teacher__department'
+    ]
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return GroupTeacher.objects.none()
+        return self.optimize_queryset(group_teachers(self.get_group()))
@@ -0,0 +1,5 @@
+import os
+
+# Те же переменные окружения задают размер пула соединений с БД (deadline_mate/settings.py)
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+threads = int(os.environ.get('WEB_THREADS', 4))